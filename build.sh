@@ -22,10 +22,18 @@ python manage.py migrate
 # Tentar atualizar relevância
 echo "🎯 Atualizando relevância das notícias..."
 if python manage.py atualizar_relevancia --help > /dev/null 2>&1; then
-    python manage.py atualizar_relevancia
+    python manage.py atualizar_relevancia --incremental
     echo "✅ Relevância atualizada com sucesso!"
 else
     echo "⚠️  Comando de relevância não disponível"
 fi
 
+# Recalcular notícias relacionadas
+echo "🔗 Calculando notícias relacionadas..."
+python manage.py calcular_relacionadas
+
+# Gerar derivadas das imagens que ainda não têm
+echo "🖼️  Gerando derivadas das imagens..."
+python manage.py gerar_derivados_imagens
+
 echo "🎉 Build concluído com sucesso!"
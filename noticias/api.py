@@ -0,0 +1,222 @@
+"""
+API JSON somente leitura para os aplicativos (lista, detalhe e busca).
+
+Usa os mesmos querysets das páginas (filtrar_noticias e NoticiaDetailView),
+carrega do banco só as colunas dos campos pedidos em ?fields=, pagina a lista
+por cursor e serializa com orjson. As respostas passam pelo cache de página e
+pelo GET condicional das páginas públicas e saem comprimidas (brotli, se o
+pacote estiver instalado, ou gzip).
+"""
+import re
+from functools import wraps
+
+import orjson
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.views.decorators.http import require_safe
+
+from .cache import TAG_LISTAS, cache_publico, condicional_publico, tag_noticia
+from .imagens import TAMANHOS, url_imagem
+from .models import NoticiaPalavraChave
+from .paginacao import PaginadorCursor
+from .views import NoticiaDetailView, filtrar_noticias
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Campo da API -> colunas carregadas do banco
+CAMPOS = {
+    'id': ('id',),
+    'url': ('id',),
+    'titulo': ('titulo',),
+    'resumo': ('resumo',),
+    'conteudo': ('conteudo',),
+    'imagem': ('imagem', 'imagem_derivados'),
+    'destaque': ('destaque',),
+    'relevancia': ('relevancia_score',),
+    'palavras': (),
+    'data_publicacao': ('data_publicacao',),
+    'data_atualizacao': ('data_atualizacao',),
+}
+CAMPOS_LISTA = ('id', 'url', 'titulo', 'resumo', 'imagem', 'data_publicacao')
+CAMPOS_DETALHE = CAMPOS_LISTA + ('conteudo', 'palavras', 'data_atualizacao')
+
+LIMITE_MAXIMO = 100
+# Respostas menores que isso não compensam a compressão
+TAMANHO_MINIMO_COMPRESSAO = 200
+
+_ACEITA_BROTLI = re.compile(r'\bbr\b')
+_ACEITA_GZIP = re.compile(r'\bgzip\b')
+
+
+class ErroApi(Exception):
+    """Parâmetro inválido: vira uma resposta 400 com a mensagem"""
+
+
+def _json(dados, status=200):
+    return HttpResponse(orjson.dumps(dados), content_type='application/json', status=status)
+
+
+def _comprimir(request, response):
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    if len(response.content) < TAMANHO_MINIMO_COMPRESSAO:
+        return response
+    aceitas = request.headers.get('Accept-Encoding', '')
+    if brotli and _ACEITA_BROTLI.search(aceitas):
+        corpo, codificacao = brotli.compress(response.content, quality=5), 'br'
+    elif _ACEITA_GZIP.search(aceitas):
+        corpo, codificacao = compress_string(response.content), 'gzip'
+    else:
+        return response
+    response.content = corpo
+    response['Content-Encoding'] = codificacao
+    response['Content-Length'] = str(len(corpo))
+    return response
+
+
+def api(view):
+    """Converte erros em JSON e comprime a resposta conforme o Accept-Encoding"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            response = view(request, *args, **kwargs)
+        except Http404:
+            response = _json({'erro': 'Não encontrado'}, status=404)
+        except ErroApi as erro:
+            response = _json({'erro': str(erro)}, status=400)
+        return _comprimir(request, response)
+    return wrapper
+
+
+def _campos(request, padrao):
+    if not request.GET.get('fields'):
+        return padrao
+    campos = tuple(dict.fromkeys(campo.strip() for campo in request.GET['fields'].split(',') if campo.strip()))
+    desconhecidos = [campo for campo in campos if campo not in CAMPOS]
+    if desconhecidos or not campos:
+        raise ErroApi(f"Campos inválidos: {', '.join(desconhecidos)}. Disponíveis: {', '.join(CAMPOS)}")
+    return campos
+
+
+def _inteiro(request, nome, padrao, minimo, maximo):
+    try:
+        valor = int(request.GET.get(nome, padrao))
+    except ValueError:
+        raise ErroApi(f'{nome} deve ser um número inteiro')
+    if not minimo <= valor <= maximo:
+        raise ErroApi(f'{nome} deve estar entre {minimo} e {maximo}')
+    return valor
+
+
+def _tamanho(request, padrao):
+    tamanho = request.GET.get('tamanho', padrao)
+    if tamanho not in TAMANHOS:
+        raise ErroApi(f"tamanho deve ser um de: {', '.join(TAMANHOS)}")
+    return tamanho
+
+
+def _projetar(queryset, campos):
+    """Carrega só as colunas dos campos pedidos (e as que a paginação usa)"""
+    colunas = {'id', 'data_publicacao'}
+    for campo in campos:
+        colunas.update(CAMPOS[campo])
+    queryset = queryset.only(*colunas)
+    if 'palavras' in campos:
+        queryset = queryset.prefetch_related(
+            Prefetch('palavras', queryset=NoticiaPalavraChave.objects.select_related('palavra'))
+        )
+    return queryset
+
+
+def _serializar(request, noticia, campos, tamanho):
+    dados = {}
+    for campo in campos:
+        if campo == 'url':
+            dados[campo] = request.build_absolute_uri(noticia.get_absolute_url())
+        elif campo == 'imagem':
+            url = url_imagem(noticia, tamanho)
+            dados[campo] = request.build_absolute_uri(url) if url else None
+        elif campo == 'relevancia':
+            dados[campo] = noticia.relevancia_score
+        elif campo == 'palavras':
+            dados[campo] = [item.palavra.rotulo for item in noticia.palavras.all()]
+        else:
+            dados[campo] = getattr(noticia, campo)
+    return dados
+
+
+def _url_pagina(request, **parametros):
+    query = request.GET.copy()
+    for nome, valor in parametros.items():
+        query[nome] = valor
+    return request.build_absolute_uri('?' + query.urlencode())
+
+
+def _tags_listas(request, **kwargs):
+    return [TAG_LISTAS]
+
+
+def _tags_detalhe(request, pk, **kwargs):
+    return [tag_noticia(pk)]
+
+
+@require_safe
+@condicional_publico(_tags_listas)
+@api
+@cache_publico(_tags_listas)
+def lista(request):
+    """Notícias publicadas, das mais recentes, paginadas por ?cursor= (aceita ?palavra=)"""
+    campos = _campos(request, CAMPOS_LISTA)
+    tamanho = _tamanho(request, 'card')
+    limite = _inteiro(request, 'limite', getattr(settings, 'NOTICIAS_POR_PAGINA', 10), 1, LIMITE_MAXIMO)
+
+    queryset, _ = filtrar_noticias({'palavra': request.GET.get('palavra')})
+    pagina = PaginadorCursor(_projetar(queryset, campos), limite).pagina(request.GET.get('cursor'))
+    return _json({
+        'itens': [_serializar(request, noticia, campos, tamanho) for noticia in pagina],
+        'proxima': _url_pagina(request, cursor=pagina.token_proxima) if pagina.tem_proxima else None,
+        'anterior': _url_pagina(request, cursor=pagina.token_anterior) if pagina.tem_anterior else None,
+    })
+
+
+@require_safe
+@condicional_publico(_tags_listas)
+@api
+@cache_publico(_tags_listas)
+def busca(request):
+    """Busca full-text (?q=), ordenada por relevância e paginada por ?pagina="""
+    if not request.GET.get('q', '').strip():
+        raise ErroApi('Informe o termo da busca em q')
+    campos = _campos(request, CAMPOS_LISTA)
+    tamanho = _tamanho(request, 'card')
+    limite = _inteiro(request, 'limite', getattr(settings, 'NOTICIAS_POR_PAGINA', 10), 1, LIMITE_MAXIMO)
+    numero = _inteiro(request, 'pagina', 1, 1, 1000)
+
+    queryset, _ = filtrar_noticias(request.GET)
+    inicio = (numero - 1) * limite
+    noticias = list(_projetar(queryset, campos)[inicio:inicio + limite + 1])
+    return _json({
+        'itens': [_serializar(request, noticia, campos, tamanho) for noticia in noticias[:limite]],
+        'proxima': _url_pagina(request, pagina=numero + 1) if len(noticias) > limite else None,
+        'anterior': _url_pagina(request, pagina=numero - 1) if numero > 1 else None,
+    })
+
+
+@require_safe
+@condicional_publico(_tags_detalhe)
+@api
+@cache_publico(_tags_detalhe)
+def detalhe(request, pk):
+    campos = _campos(request, CAMPOS_DETALHE)
+    tamanho = _tamanho(request, 'hero')
+    queryset = _projetar(NoticiaDetailView().get_queryset(), campos)
+    noticia = get_object_or_404(queryset, pk=pk)
+    return _json(_serializar(request, noticia, campos, tamanho))
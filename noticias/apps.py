@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class NoticiasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'noticias'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .banco import ajustar_sqlite
+        from .busca import garantir_indice_apos_migracao
+
+        post_migrate.connect(garantir_indice_apos_migracao, sender=self)
+        connection_created.connect(ajustar_sqlite, dispatch_uid='noticias.ajustar_sqlite')
@@ -0,0 +1,123 @@
+"""
+Banco de dados: ajuste das conexões SQLite e divisão leitura/escrita.
+
+Cada conexão SQLite aberta recebe os PRAGMAs de SQLITE_PRAGMAS (por padrão
+WAL, synchronous=NORMAL, mmap, cache maior, busy_timeout e tabelas
+temporárias em memória): em WAL os leitores não esperam pelas escritas do
+painel e vários workers leem o mesmo arquivo sem 'database is locked'.
+
+Com uma réplica em BANCO_REPLICAS (outro handle do mesmo arquivo SQLite,
+aberto com query_only, ou uma réplica do Postgres) o RoteadorReplica manda
+para ela as leituras das requisições GET/HEAD públicas, marcadas pelo
+ReplicaMiddleware. Escritas, painel, admin, sessões e usuários ficam no
+banco principal.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRAGMAS_PADRAO = {
+    # Primeiro, para que a troca do journal_mode também espere por outros processos
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Negativo: em KiB (64 MB por conexão)
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Sempre lidos do banco principal: logo depois de um login ou de uma edição a
+# réplica do Postgres ainda pode não ter a sessão ou a permissão nova
+APPS_PRIMARIO = {'auth', 'sessions', 'admin', 'contenttypes'}
+
+_usar_replica = ContextVar('noticias_usar_replica', default=False)
+
+
+def replicas():
+    return [alias for alias in getattr(settings, 'BANCO_REPLICAS', []) if alias in settings.DATABASES]
+
+
+def pragmas():
+    """PRAGMAs aplicados: PRAGMAS_PADRAO com SQLITE_PRAGMAS por cima (None remove)"""
+    combinados = {**PRAGMAS_PADRAO, **getattr(settings, 'SQLITE_PRAGMAS', {})}
+    return {nome: valor for nome, valor in combinados.items() if valor is not None}
+
+
+def ajustar_sqlite(sender, connection, **kwargs):
+    """Handler de connection_created registrado em NoticiasConfig.ready"""
+    if connection.vendor != 'sqlite':
+        return
+    somente_leitura = connection.alias in replicas()
+    for nome, valor in pragmas().items():
+        # O journal_mode fica gravado no arquivo: quem muda é o banco principal
+        if nome == 'journal_mode' and (somente_leitura or connection.is_in_memory_db()):
+            continue
+        # Direto na conexão do sqlite3, fora dos execute_wrappers e do log de consultas
+        connection.connection.execute(f'PRAGMA {nome} = {valor}')
+    if somente_leitura:
+        connection.connection.execute('PRAGMA query_only = ON')
+
+
+class RoteadorReplica:
+    """Leituras das requisições públicas na réplica; o resto no banco principal"""
+
+    def db_for_read(self, model, **hints):
+        if not _usar_replica.get() or model._meta.app_label in APPS_PRIMARIO:
+            return DEFAULT_DB_ALIAS
+        # Dentro de uma transação a leitura precisa ver o que ela mesma escreveu
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        disponiveis = replicas()
+        return random.choice(disponiveis) if disponiveis else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sem isso o Django grava no banco de onde o objeto foi lido
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bancos = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """Marca as requisições GET/HEAD fora de BANCO_REPLICA_EXCLUIR para ler da réplica"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.excluir = tuple(getattr(settings, 'BANCO_REPLICA_EXCLUIR', ('/admin/', '/painel/')))
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _publica(self, request):
+        return request.method in ('GET', 'HEAD') and not request.path_info.startswith(self.excluir)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _usar_replica.set(self._publica(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _usar_replica.reset(token)
+
+    async def __acall__(self, request):
+        # A ContextVar acompanha a requisição até as threads do ORM assíncrono
+        token = _usar_replica.set(self._publica(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _usar_replica.reset(token)
@@ -0,0 +1,38 @@
+"""
+Cenários do benchmark do portal como testes do pytest-benchmark.
+
+Uso: DJANGO_SETTINGS_MODULE=portal_noticias.settings \
+     pytest noticias/benchmarks/bench_portal.py --benchmark-json=resultado.json
+
+BENCHMARK_NOTICIAS define quantas notícias são semeadas (padrão: 2000).
+"""
+import os
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portal_noticias.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from noticias.benchmarks import portal  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def ambiente():
+    with portal.ambiente(noticias=int(os.environ.get('BENCHMARK_NOTICIAS', 2000))) as amb:
+        yield amb
+
+
+@pytest.mark.parametrize('cenario', [nome for nome in portal.CENARIOS if nome != 'atualizar_relevancia_todas'])
+def test_cenario(benchmark, ambiente, cenario):
+    benchmark(getattr(ambiente, cenario))
+
+
+def test_atualizar_relevancia_todas(benchmark, ambiente):
+    benchmark.pedantic(
+        ambiente.atualizar_relevancia_todas, setup=ambiente.marcar_pendentes, rounds=3, iterations=1,
+    )
@@ -0,0 +1,155 @@
+"""
+Teste de carga HTTP contra um servidor em execução (WSGI ou ASGI).
+
+Abre `concorrencia` conexões keep-alive (HTTP/1.1, só biblioteca padrão) e
+distribui entre elas `requisicoes` GETs nos caminhos pedidos, em rodízio.
+Reporta p50/p95/p99 e vazão por caminho e no total, no mesmo formato do
+benchmark_portal (noticias.benchmarks.portal), para comparar com --comparar
+o gunicorn síncrono e o perfil ASGI (portal_noticias.asgi_render) na mesma carga.
+"""
+import asyncio
+import itertools
+import platform
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import django
+from django.utils import timezone
+
+from .portal import VERSAO_FORMATO, _commit, resumir
+
+CAMINHOS = ('/', '/noticias/', '/noticias/?q=governo', '/api/noticias/')
+
+
+class ErroHTTP(Exception):
+    pass
+
+
+async def _ler_resposta(leitor):
+    """(status, corpo, fechar) de uma resposta HTTP/1.1 com Content-Length ou chunked"""
+    linha = await leitor.readline()
+    if not linha:
+        raise ErroHTTP('conexão encerrada pelo servidor')
+    status = int(linha.split()[1])
+    cabecalhos = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    if cabecalhos.get('transfer-encoding', '').lower() == 'chunked':
+        partes = []
+        while True:
+            tamanho = int((await leitor.readline()).split(b';')[0], 16)
+            if not tamanho:
+                await leitor.readline()
+                break
+            partes.append(await leitor.readexactly(tamanho))
+            await leitor.readline()
+        corpo = b''.join(partes)
+    else:
+        corpo = await leitor.readexactly(int(cabecalhos.get('content-length', 0)))
+    return status, corpo, cabecalhos.get('connection', '').lower() == 'close'
+
+
+class Conexao:
+    """Uma conexão keep-alive, reaberta quando o servidor a fecha"""
+
+    def __init__(self, host, porta, cabecalho_host):
+        self.host = host
+        self.porta = porta
+        self.cabecalho_host = cabecalho_host
+        self.leitor = self.escritor = None
+
+    async def _abrir(self):
+        self.leitor, self.escritor = await asyncio.open_connection(self.host, self.porta)
+
+    def fechar(self):
+        if self.escritor:
+            self.escritor.close()
+        self.leitor = self.escritor = None
+
+    async def get(self, caminho):
+        if self.escritor is None:
+            await self._abrir()
+        self.escritor.write(
+            f'GET {caminho} HTTP/1.1\r\nHost: {self.cabecalho_host}\r\n'
+            f'Accept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n'.encode()
+        )
+        await self.escritor.drain()
+        try:
+            status, corpo, fechar = await _ler_resposta(self.leitor)
+        except (ErroHTTP, asyncio.IncompleteReadError, ConnectionError):
+            self.fechar()
+            raise
+        if fechar:
+            self.fechar()
+        return status, len(corpo)
+
+
+async def _executar(url, caminhos, concorrencia, requisicoes, aquecimento, tempo_limite):
+    partes = urlsplit(url)
+    if partes.scheme != 'http':
+        raise ValueError('Só http:// é suportado')
+    host, porta = partes.hostname, partes.port or 80
+    prefixo = partes.path.rstrip('/')
+    fila = itertools.cycle(caminhos)
+    sequencia = itertools.count()
+    amostras = defaultdict(list)
+    erros = defaultdict(int)
+
+    async def cliente():
+        conexao = Conexao(host, porta, partes.netloc)
+        try:
+            while (numero := next(sequencia)) < aquecimento + requisicoes:
+                caminho = next(fila)
+                inicio = time.perf_counter()
+                try:
+                    status, _ = await asyncio.wait_for(conexao.get(prefixo + caminho), tempo_limite)
+                except (OSError, ErroHTTP, asyncio.IncompleteReadError, asyncio.TimeoutError) as erro:
+                    conexao.fechar()
+                    erros[type(erro).__name__] += 1
+                    continue
+                # As primeiras respostas (cache frio, conexões novas) não entram na conta
+                if numero < aquecimento:
+                    continue
+                if status >= 400:
+                    erros[f'HTTP {status}'] += 1
+                else:
+                    amostras[caminho].append(time.perf_counter() - inicio)
+        finally:
+            conexao.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    return amostras, erros, time.perf_counter() - inicio
+
+
+def executar(url, caminhos=CAMINHOS, concorrencia=50, requisicoes=2000, aquecimento=100,
+             tempo_limite=30, rotulo=''):
+    """Roda a carga e retorna o resultado no formato do benchmark_portal"""
+    amostras, erros, duracao = asyncio.run(
+        _executar(url, caminhos, concorrencia, requisicoes, aquecimento, tempo_limite)
+    )
+    resultado = {
+        'versao': VERSAO_FORMATO,
+        'data': timezone.now().isoformat(),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'url': url,
+        'servidor': rotulo,
+        'concorrencia': concorrencia,
+        'requisicoes': requisicoes,
+        'erros': dict(erros),
+        'cenarios': {caminho: resumir(itens) for caminho, itens in amostras.items() if itens},
+    }
+    todas = [amostra for itens in amostras.values() for amostra in itens]
+    if todas:
+        resultado['cenarios']['total'] = resumir(todas)
+        # Com várias conexões simultâneas a vazão é a do servidor, não o inverso da latência
+        resultado['cenarios']['total']['por_segundo'] = (aquecimento + requisicoes) / duracao
+    return resultado
@@ -0,0 +1,238 @@
+"""
+Benchmark dos caminhos críticos do portal (páginas públicas, painel e relevância).
+
+Roda offline em um banco SQLite de teste criado para a execução (o banco
+configurado não é tocado), semeado com N notícias sintéticas (noticias.corpus). Cada cenário é
+medido `repeticoes` vezes depois de um aquecimento e reporta p50/p95/p99 e
+vazão. Usado pelo comando benchmark_portal e pelos testes de
+noticias/benchmarks/bench_portal.py (pytest-benchmark).
+"""
+import math
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from noticias.services import PALAVRAS_IMPORTANTES
+from noticias.tendencias import TENDENCIAS_PADRAO
+
+VERSAO_FORMATO = 1
+
+CENARIOS = (
+    'home', 'lista', 'lista_profunda', 'lista_profunda_offset', 'busca', 'detalhe',
+    'painel_admin', 'calcular_relevancia', 'atualizar_relevancia_todas',
+)
+
+_TERMOS = tuple(PALAVRAS_IMPORTANTES) + tuple(TENDENCIAS_PADRAO)
+
+
+def percentil(ordenadas, p):
+    """Percentil pelo método nearest-rank sobre amostras já ordenadas"""
+    posicao = math.ceil(p / 100 * len(ordenadas))
+    return ordenadas[min(max(posicao, 1), len(ordenadas)) - 1]
+
+
+def resumir(amostras):
+    """Estatísticas (em ms) de uma lista de durações em segundos"""
+    ordenadas = sorted(amostras)
+    total = sum(ordenadas)
+    return {
+        'amostras': len(ordenadas),
+        'p50_ms': percentil(ordenadas, 50) * 1000,
+        'p95_ms': percentil(ordenadas, 95) * 1000,
+        'p99_ms': percentil(ordenadas, 99) * 1000,
+        'media_ms': total / len(ordenadas) * 1000,
+        'min_ms': ordenadas[0] * 1000,
+        'max_ms': ordenadas[-1] * 1000,
+        'por_segundo': len(ordenadas) / total if total else 0.0,
+    }
+
+
+def medir(funcao, repeticoes, aquecimento=3, preparar=None):
+    """Durações (s) de `repeticoes` chamadas; `preparar` roda antes de cada uma, fora da medição"""
+    for _ in range(aquecimento):
+        if preparar:
+            preparar()
+        funcao()
+    amostras = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcao()
+        amostras.append(time.perf_counter() - inicio)
+    return amostras
+
+
+class Ambiente:
+    """Banco semeado, clientes HTTP e as funções medidas em cada cenário"""
+
+    def __init__(self, noticias, workers=1, semente=42):
+        from noticias.models import Noticia
+
+        self.quantidade = noticias
+        self.workers = workers
+        self.rng = random.Random(semente)
+        self.cliente = Client()
+        self.cliente_admin = Client()
+        self.cliente_admin.force_login(get_user_model().objects.create_user(
+            'benchmark', password=None, is_staff=True, is_superuser=True,
+        ))
+        publicadas = Noticia.objects.publicadas().order_by('-data_publicacao', '-id')
+        self.ids = list(publicadas.values_list('id', flat=True)[:200])
+        self.profunda = publicadas.values_list('data_publicacao', 'id')[int(publicadas.count() * 0.9)]
+        self.pagina_profunda = int(publicadas.count() * 0.9) // getattr(settings, 'NOTICIAS_POR_PAGINA', 10) + 1
+        self.amostra = list(Noticia.objects.filter(pk__in=self.ids[:50]))
+
+    def _get(self, cliente, url, **dados):
+        response = cliente.get(url, dados)
+        if response.status_code != 200:
+            raise RuntimeError(f'{url} respondeu {response.status_code}')
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def home(self):
+        self._get(self.cliente, reverse('noticias:home'))
+
+    def lista(self):
+        self._get(self.cliente, reverse('noticias:lista_noticias'))
+
+    def lista_profunda(self):
+        from noticias.paginacao import DEPOIS, codificar_cursor
+
+        self._get(self.cliente, reverse('noticias:lista_noticias'), cursor=codificar_cursor(DEPOIS, *self.profunda))
+
+    def lista_profunda_offset(self):
+        with override_settings(NOTICIAS_PAGINACAO='numerada'):
+            self._get(self.cliente, reverse('noticias:lista_noticias'), page=self.pagina_profunda)
+
+    def busca(self):
+        self._get(self.cliente, reverse('noticias:lista_noticias'), q=self.rng.choice(_TERMOS))
+
+    def detalhe(self):
+        self._get(self.cliente, reverse('noticias:noticia_detalhe', args=[self.rng.choice(self.ids)]))
+
+    def painel_admin(self):
+        self._get(self.cliente_admin, reverse('noticias:painel_admin'))
+
+    def calcular_relevancia(self):
+        from noticias.services import RelevanciaService
+
+        RelevanciaService().calcular_relevancia(self.rng.choice(self.amostra))
+
+    def atualizar_relevancia_todas(self):
+        from noticias.services import RelevanciaService
+
+        RelevanciaService().atualizar_relevancia_todas(workers=self.workers)
+
+    def marcar_pendentes(self):
+        from noticias.models import Noticia
+
+        Noticia.objects.update(relevancia_pendente=True)
+
+    def executar(self, nome, repeticoes, aquecimento=3):
+        """Mede um cenário; o recálculo completo marca tudo como pendente antes de cada rodada"""
+        if nome == 'atualizar_relevancia_todas':
+            return medir(self.atualizar_relevancia_todas, repeticoes, aquecimento, preparar=self.marcar_pendentes)
+        return medir(getattr(self, nome), repeticoes, aquecimento)
+
+
+@contextmanager
+def ambiente(noticias=2000, com_cache=False, workers=1, semente=42, arquivo_banco=None):
+    """Cria o banco de teste, a mídia temporária e as notícias; desfaz tudo ao sair"""
+    from noticias import contadores, corpus, relacionadas, tendencias
+    from noticias.services import RelevanciaService
+
+    midia = tempfile.mkdtemp(prefix='benchmark-midia-')
+    ajustes = {
+        'MEDIA_ROOT': midia,
+        # Relevância sem rede: tendências estáticas
+        'TENDENCIAS_PROVEDOR': 'estatico',
+    }
+    if not com_cache:
+        ajustes['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    if arquivo_banco:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = arquivo_banco
+
+    setup_test_environment()
+    nome_original = connection.settings_dict['NAME']
+    with override_settings(**ajustes):
+        tendencias._loja = None
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            corpus.gerar(noticias, semente=semente)
+            # Palavras-chave, relacionadas e contadores como em produção
+            RelevanciaService().atualizar_relevancia_todas(workers=workers)
+            relacionadas.reconstruir()
+            contadores.reconciliar()
+            yield Ambiente(noticias, workers=workers, semente=semente)
+        finally:
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+            tendencias._loja = None
+            shutil.rmtree(midia, ignore_errors=True)
+            teardown_test_environment()
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executar(noticias=2000, repeticoes=50, aquecimento=3, cenarios=CENARIOS, com_cache=False,
+             workers=1, semente=42, arquivo_banco=None, progresso=None):
+    """Roda os cenários e retorna o resultado no formato gravado em JSON"""
+    resultado = {
+        'versao': VERSAO_FORMATO,
+        'data': timezone.now().isoformat(),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'banco': connection.vendor,
+        'noticias': noticias,
+        'com_cache': com_cache,
+        'repeticoes': repeticoes,
+        'cenarios': {},
+    }
+    with ambiente(noticias, com_cache, workers, semente, arquivo_banco) as amb:
+        for nome in cenarios:
+            if nome == 'atualizar_relevancia_todas':
+                # O recálculo completo é caro: poucas rodadas bastam
+                amostras = amb.executar(nome, min(repeticoes, 5), min(aquecimento, 1))
+            else:
+                amostras = amb.executar(nome, repeticoes, aquecimento)
+            resultado['cenarios'][nome] = resumir(amostras)
+            if progresso:
+                progresso(nome, resultado['cenarios'][nome])
+    return resultado
+
+
+def comparar(anterior, atual):
+    """{cenario: {'p50': variação, 'p95': variação}} em fração (0.10 = 10% mais lento)"""
+    variacoes = {}
+    for nome, dados in atual['cenarios'].items():
+        antes = anterior.get('cenarios', {}).get(nome)
+        if not antes:
+            continue
+        variacoes[nome] = {
+            metrica: (dados[f'{metrica}_ms'] - antes[f'{metrica}_ms']) / antes[f'{metrica}_ms']
+            for metrica in ('p50', 'p95', 'p99') if antes[f'{metrica}_ms']
+        }
+    return variacoes
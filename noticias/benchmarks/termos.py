@@ -0,0 +1,100 @@
+"""
+Micro-benchmark do MatcherTermos contra os laços de substring anteriores.
+
+Uso: python -m noticias.benchmarks.termos [--repeticoes N]
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from noticias.termos import obter_matcher, preparar
+
+PALAVRAS_IMPORTANTES = (
+    'urgente', 'breaking', 'exclusivo', 'política', 'economia',
+    'tecnologia', 'saúde', 'educação', 'meio ambiente', 'cultura',
+    'esporte', 'entretenimento', 'internacional', 'nacional',
+)
+
+VOCABULARIO = (
+    'o governo anunciou hoje novas medidas para a área de infraestrutura e transporte '
+    'público nas grandes cidades brasileiras, segundo especialistas ouvidos pela reportagem. '
+    'a economia cresceu no trimestre e a política fiscal segue em debate no congresso'
+).split()
+
+
+def _noticia(rng, palavras_conteudo):
+    def texto(n):
+        return ' '.join(rng.choice(VOCABULARIO) for _ in range(n))
+    return SimpleNamespace(titulo=texto(10), resumo=texto(40), conteudo=texto(palavras_conteudo))
+
+
+def _tendencias(rng, quantidade):
+    letras = 'abcdefghijlmnoprstuv'
+    return tuple(
+        ''.join(rng.choice(letras) for _ in range(rng.randint(5, 12)))
+        for _ in range(quantidade)
+    )
+
+
+def laços_antigos(noticia, tendencias):
+    """Implementação anterior: um `in` por termo sobre o texto em minúsculas"""
+    texto_completo = f"{noticia.titulo} {noticia.resumo} {noticia.conteudo}".lower()
+    palavras = sum(1.0 for palavra in PALAVRAS_IMPORTANTES if palavra in texto_completo)
+    cabecalho = f"{noticia.titulo} {noticia.resumo}".lower()
+    trends = sum(2.0 for query in tendencias if query.lower() in cabecalho)
+    return palavras, trends
+
+
+def matcher_compilado(noticia, tendencias):
+    """Implementação atual (RelevanciaService._ocorrencias)"""
+    cabecalho = preparar(f"{noticia.titulo} {noticia.resumo}")
+    texto_completo = cabecalho + preparar(noticia.conteudo)
+    palavras = float(len(obter_matcher(PALAVRAS_IMPORTANTES).encontrar(texto_completo)))
+    encontradas = obter_matcher(tendencias).encontrar(cabecalho)
+    trends = sum(2.0 for query in tendencias if query in encontradas)
+    return palavras, trends
+
+
+def _medir(funcao, noticias, tendencias, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for noticia in noticias:
+            funcao(noticia, tendencias)
+    return (time.perf_counter() - inicio) / (repeticoes * len(noticias))
+
+
+def executar(repeticoes=5, cenarios=((10, 800), (100, 800), (500, 800), (10, 5000))):
+    """Retorna uma lista de dicts com o tempo médio por notícia (µs) de cada cenário"""
+    rng = random.Random(42)
+    resultados = []
+    for quantidade_tendencias, palavras_conteudo in cenarios:
+        noticias = [_noticia(rng, palavras_conteudo) for _ in range(50)]
+        tendencias = _tendencias(rng, quantidade_tendencias)
+        antigo = _medir(laços_antigos, noticias, tendencias, repeticoes)
+        novo = _medir(matcher_compilado, noticias, tendencias, repeticoes)
+        resultados.append({
+            'tendencias': quantidade_tendencias,
+            'palavras_conteudo': palavras_conteudo,
+            'lacos_us': antigo * 1e6,
+            'matcher_us': novo * 1e6,
+            'speedup': antigo / novo if novo else 0.0,
+        })
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tendências':>10} {'palavras':>9} {'laços (µs)':>11} {'matcher (µs)':>13} {'speedup':>8}")
+    for r in executar(args.repeticoes):
+        print(
+            f"{r['tendencias']:>10} {r['palavras_conteudo']:>9} {r['lacos_us']:>11.1f} "
+            f"{r['matcher_us']:>13.1f} {r['speedup']:>7.2f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
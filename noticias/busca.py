@@ -0,0 +1,207 @@
+import re
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .palavras import STOPWORDS
+from .termos import normalizar
+
+# Tabela virtual FTS5 (SQLite) e coluna tsvector (PostgreSQL) criadas na migração 0007
+TABELA_FTS = 'noticias_noticia_fts'
+COLUNA_VETOR = 'busca_vetor'
+CONFIG_PG = 'portuguese_unaccent'
+
+# Termos mais curtos são procurados inteiros: o prefixo 'a*' expande para boa
+# parte do vocabulário e cada busca percorreria o índice inteiro
+TAMANHO_MINIMO_PREFIXO = 3
+
+# SQL do índice, igual ao da migração 0007 (que tem a própria cópia): usado por
+# garantir_indice para recriar os triggers que o SQLite descarta
+# SQLite: tabela FTS5 de conteúdo externo, sem acentos, sincronizada por triggers
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS noticias_noticia_fts USING fts5(
+        titulo, resumo, conteudo,
+        content='noticias_noticia', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_ai AFTER INSERT ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_ad AFTER DELETE ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(noticias_noticia_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_au
+    AFTER UPDATE OF titulo, resumo, conteudo ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(noticias_noticia_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+        INSERT INTO noticias_noticia_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+    """,
+    "INSERT INTO noticias_noticia_fts(noticias_noticia_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_ai",
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_ad",
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_au",
+    "DROP TABLE IF EXISTS noticias_noticia_fts",
+]
+
+# PostgreSQL: configuração portuguesa sem acentos, coluna tsvector ponderada e índice GIN
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE noticias_noticia ADD COLUMN IF NOT EXISTS busca_vetor tsvector",
+    """
+    CREATE OR REPLACE FUNCTION noticias_noticia_busca_vetor() RETURNS trigger AS $$
+    BEGIN
+        NEW.busca_vetor :=
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.titulo, '')), 'A') ||
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.resumo, '')), 'B') ||
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.conteudo, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER noticias_noticia_busca_vetor_tg
+    BEFORE INSERT OR UPDATE OF titulo, resumo, conteudo ON noticias_noticia
+    FOR EACH ROW EXECUTE FUNCTION noticias_noticia_busca_vetor()
+    """,
+    "UPDATE noticias_noticia SET titulo = titulo",
+    """
+    CREATE INDEX IF NOT EXISTS noticias_noticia_busca_vetor_gin
+    ON noticias_noticia USING GIN (busca_vetor)
+    """,
+]
+
+POSTGRES_REMOVER = [
+    "DROP TRIGGER IF EXISTS noticias_noticia_busca_vetor_tg ON noticias_noticia",
+    "DROP FUNCTION IF EXISTS noticias_noticia_busca_vetor()",
+    "DROP INDEX IF EXISTS noticias_noticia_busca_vetor_gin",
+    "ALTER TABLE noticias_noticia DROP COLUMN IF EXISTS busca_vetor",
+]
+
+TRIGGERS_SQLITE = ('noticias_noticia_fts_ai', 'noticias_noticia_fts_ad', 'noticias_noticia_fts_au')
+
+
+def criar_indice(conexao):
+    """Cria o índice full-text (e os triggers de sincronização) para o banco da conexão"""
+    comandos = {'sqlite': SQLITE_CRIAR, 'postgresql': POSTGRES_CRIAR}.get(conexao.vendor, [])
+    with conexao.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def remover_indice(conexao):
+    comandos = {'sqlite': SQLITE_REMOVER, 'postgresql': POSTGRES_REMOVER}.get(conexao.vendor, [])
+    with conexao.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def garantir_indice(conexao):
+    """Recria os triggers do SQLite caso uma migração tenha reconstruído a tabela.
+
+    O SQLite reconstrói noticias_noticia em várias alterações de schema e os
+    triggers da tabela antiga são descartados junto com ela.
+    """
+    if conexao.vendor != 'sqlite':
+        return
+    with conexao.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'noticias_noticia_fts%'")
+        existentes = {linha[0] for linha in cursor.fetchall()}
+    # Índice ainda não criado (migração 0007 não aplicada): nada a fazer
+    if TABELA_FTS not in existentes:
+        return
+    if not set(TRIGGERS_SQLITE) <= existentes:
+        criar_indice(conexao)
+
+
+def garantir_indice_apos_migracao(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Handler de post_migrate registrado em NoticiasConfig.ready"""
+    garantir_indice(connections[using])
+
+
+class BuscaService:
+    """Serviço de busca textual das notícias usando o índice full-text do banco"""
+
+    def termos(self, consulta):
+        """Quebra a consulta em termos seguros para o índice (sem operadores e sem stopwords)"""
+        palavras = re.findall(r'\w+', (consulta or '').lower())
+        return [palavra for palavra in palavras if normalizar(palavra) not in STOPWORDS][:10]
+
+    def _prefixo(self, termo, formato, formato_prefixo):
+        modelo = formato_prefixo if len(termo) >= TAMANHO_MINIMO_PREFIXO else formato
+        return modelo.format(termo)
+
+    def buscar(self, queryset, consulta):
+        """Filtra o queryset pela consulta e anota a relevância da busca (busca_rank)"""
+        termos = self.termos(consulta)
+        if not termos:
+            # Anotado mesmo vazio: quem chama ordena por busca_rank
+            return queryset.annotate(busca_rank=Value(0.0, output_field=FloatField())).none()
+
+        # Usa o banco em que o queryset será executado
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            return self._buscar_sqlite(queryset, termos)
+        if vendor == 'postgresql':
+            return self._buscar_postgres(queryset, termos)
+        return self._buscar_icontains(queryset, consulta)
+
+    def _buscar_sqlite(self, queryset, termos):
+        # Cada termo entre aspas (prefixo a partir de 3 letras); separados por espaço = AND
+        expressao = ' '.join(self._prefixo(termo, '"{}"', '"{}"*') for termo in termos)
+        tabela = queryset.model._meta.db_table
+
+        # Junção com a tabela FTS: o MATCH roda uma vez e o bm25 sai da mesma
+        # varredura (uma subconsulta correlacionada repetiria o MATCH por linha).
+        # bm25 é negativo: quanto menor, mais relevante. Pesos: título, resumo, conteúdo
+        return queryset.extra(
+            select={'busca_rank': f'-bm25({TABELA_FTS}, 10.0, 4.0, 1.0)'},
+            tables=[TABELA_FTS],
+            where=[f'{TABELA_FTS}.rowid = {tabela}.id', f'{TABELA_FTS} MATCH %s'],
+            params=[expressao],
+        )
+
+    def _buscar_postgres(self, queryset, termos):
+        expressao = ' & '.join(self._prefixo(termo, '{}', '{}:*') for termo in termos)
+        tabela = queryset.model._meta.db_table
+        tsquery = f"to_tsquery('{CONFIG_PG}', %s)"
+
+        ids = RawSQL(
+            f'SELECT id FROM {tabela} WHERE {COLUNA_VETOR} @@ {tsquery}',
+            (expressao,),
+        )
+        rank = RawSQL(
+            f'ts_rank_cd({tabela}.{COLUNA_VETOR}, {tsquery})',
+            (expressao,),
+        )
+        return queryset.filter(id__in=ids).annotate(busca_rank=rank)
+
+    def _buscar_icontains(self, queryset, consulta):
+        """Fallback para bancos sem índice full-text configurado"""
+        return queryset.filter(
+            Q(titulo__icontains=consulta) |
+            Q(resumo__icontains=consulta) |
+            Q(conteudo__icontains=consulta)
+        ).annotate(busca_rank=RawSQL('0', ()))
@@ -0,0 +1,277 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+# Tags de dependência das páginas públicas. Cada tag tem um número de versão no
+# cache; incrementar a versão invalida todas as páginas que dependem dela.
+TAG_LISTAS = 'listas'
+
+
+def tag_noticia(pk):
+    return f'noticia:{pk}'
+
+
+def _chave_versao(tag):
+    return f'paginas:versao:{tag}'
+
+
+def _chave_modificacao(tag):
+    return f'paginas:modificada:{tag}'
+
+
+def _timeout():
+    return getattr(settings, 'CACHE_PAGINAS_TIMEOUT', 60 * 15)
+
+
+def versoes(tags):
+    """Retorna a versão atual de cada tag (uma única ida ao cache)"""
+    chaves = {_chave_versao(tag): tag for tag in tags}
+    atuais = cache.get_many(chaves.keys())
+    return [atuais.get(chave, 0) for chave in sorted(chaves)]
+
+
+def versao_por_tag(tags):
+    """{tag: versão} (uma única ida ao cache)"""
+    atuais = cache.get_many([_chave_versao(tag) for tag in tags])
+    return {tag: atuais.get(_chave_versao(tag), 0) for tag in tags}
+
+
+def invalidar(*tags):
+    """Incrementa a versão das tags, tornando obsoletas as páginas dependentes"""
+    for tag in tags:
+        chave = _chave_versao(tag)
+        # add cria a chave sem expiração; se já existir, incrementa
+        if not cache.add(chave, 1, timeout=None):
+            try:
+                cache.incr(chave)
+            except ValueError:
+                cache.set(chave, 1, timeout=None)
+    cache.set_many({_chave_modificacao(tag): time.time() for tag in tags}, timeout=None)
+
+
+def estado(tags):
+    """(versão, momento da última modificação) das tags, com uma ida ao cache.
+
+    Serve de ETag/Last-Modified das páginas públicas sem consultar o banco. Se
+    o cache foi limpo, o momento recomeça agora: os clientes revalidam uma vez.
+    """
+    versoes = {_chave_versao(tag): 0 for tag in tags}
+    momentos = {_chave_modificacao(tag): None for tag in tags}
+    atuais = cache.get_many(list(versoes) + list(momentos))
+    faltando = [chave for chave in momentos if chave not in atuais]
+    if faltando:
+        agora = time.time()
+        for chave in faltando:
+            if not cache.add(chave, agora, timeout=None):
+                atuais[chave] = cache.get(chave, agora)
+            else:
+                atuais[chave] = agora
+    valores = [atuais.get(chave, 0) for chave in sorted(versoes)]
+    valores += [atuais[chave] for chave in sorted(momentos)]
+    versao = hashlib.md5(repr(valores).encode()).hexdigest()[:16]
+    return versao, max(atuais[chave] for chave in momentos)
+
+
+def invalidar_noticia(pk):
+    invalidar(TAG_LISTAS, tag_noticia(pk))
+
+
+def _chave_pagina(request):
+    caminho = request.get_host() + request.get_full_path()
+    return hashlib.md5(caminho.encode('utf-8')).hexdigest()
+
+
+def _cacheavel(request):
+    return request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+
+
+def _chaves(request, tags):
+    """(página, cópia obsoleta, lock) da página no cache"""
+    base = _chave_pagina(request)
+    versao = '.'.join(str(v) for v in versoes(tags))
+    return f'paginas:{base}:{versao}', f'paginas:obsoleta:{base}', f'paginas:lock:{base}'
+
+
+def _consultar(chaves):
+    """(response, regenerar): a página guardada ou se esta requisição deve gerá-la"""
+    chave, chave_obsoleta, chave_lock = chaves
+    response = cache.get(chave)
+    if response is not None:
+        response['X-Cache'] = 'HIT'
+        return response, False
+
+    timeout_lock = getattr(settings, 'CACHE_PAGINAS_LOCK_TIMEOUT', 10)
+    if not cache.add(chave_lock, 1, timeout=timeout_lock):
+        # Outra requisição já está regenerando esta página
+        response = cache.get(chave_obsoleta)
+        if response is None:
+            response = _aguardar(chave)
+        if response is not None:
+            response['X-Cache'] = 'STALE'
+        return response, False
+    return None, True
+
+
+def _procurar(request, tags):
+    chaves = _chaves(request, tags)
+    return chaves, _consultar(chaves)
+
+
+def _guardar(chaves, response):
+    """Grava a página gerada (se puder ser compartilhada) e libera o lock"""
+    chave, chave_obsoleta, chave_lock = chaves
+    try:
+        if response is not None and response.status_code == 200 and not response.cookies:
+            timeout = _timeout()
+            cache.set(chave, response, timeout)
+            # A cópia obsoleta vive mais para cobrir regenerações futuras
+            cache.set(chave_obsoleta, response, timeout * 4)
+    finally:
+        cache.delete(chave_lock)
+
+
+def _renderizar(response):
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    return response
+
+
+async def _acacheavel(request):
+    # Resolve o usuário (e a sessão) fora do event loop uma única vez: daqui em
+    # diante request.user, inclusive nos templates, não toca mais o banco
+    request.user = await request.auser()
+    return _cacheavel(request)
+
+
+def cache_publico(tags):
+    """Cache de página inteira para visitantes anônimos.
+
+    ``tags`` é uma função (request, **kwargs) -> lista de tags das quais a página
+    depende. A chave combina host, caminho, query string e a versão das tags, de
+    modo que os signals de Noticia invalidam apenas as páginas afetadas.
+
+    Em uma falha de cache só uma requisição regenera a página (lock via
+    cache.add); as demais recebem a última versão conhecida, se existir, ou
+    aguardam a regeneração por alguns instantes. Aceita views assíncronas: as
+    idas ao cache saem do event loop em uma thread por etapa.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_async(request, *args, **kwargs):
+                if not await _acacheavel(request):
+                    return await view(request, *args, **kwargs)
+
+                chaves, (response, regenerar) = await sync_to_async(_procurar)(request, tags(request, **kwargs))
+                if response is not None:
+                    return response
+                if not regenerar:
+                    return await view(request, *args, **kwargs)
+
+                response = None
+                try:
+                    response = await view(request, *args, **kwargs)
+                    if hasattr(response, 'render'):
+                        response = await sync_to_async(_renderizar)(response)
+                finally:
+                    await sync_to_async(_guardar)(chaves, response)
+                response['X-Cache'] = 'MISS'
+                return response
+            return wrapper_async
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheavel(request):
+                return view(request, *args, **kwargs)
+
+            chaves, (response, regenerar) = _procurar(request, tags(request, **kwargs))
+            if response is not None:
+                return response
+            if not regenerar:
+                return view(request, *args, **kwargs)
+
+            response = None
+            try:
+                response = _renderizar(view(request, *args, **kwargs))
+            finally:
+                _guardar(chaves, response)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def _validadores(versao, modificada):
+    # Fraca: o corpo pode mudar de codificação (gzip) no caminho
+    return f'W/"{versao}"', int(modificada)
+
+
+def _marcar(response, etag, ultima_modificacao):
+    # Uma cópia obsoleta (X-Cache: STALE) não pode receber a ETag atual
+    if response.status_code in (200, 304) and response.get('X-Cache') != 'STALE':
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(ultima_modificacao))
+    return response
+
+
+def condicional_publico(tags):
+    """GET condicional (ETag/Last-Modified) para visitantes anônimos.
+
+    Usa as mesmas tags de ``cache_publico``: a ETag vem das versões e o
+    Last-Modified do momento da última invalidação. Um If-None-Match ou
+    If-Modified-Since em dia recebe 304 antes de buscar ou renderizar a página.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper_async(request, *args, **kwargs):
+                if not await _acacheavel(request):
+                    return await view(request, *args, **kwargs)
+
+                etag, ultima_modificacao = _validadores(*await sync_to_async(estado)(tags(request, **kwargs)))
+                response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacao)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _marcar(response, etag, ultima_modificacao)
+            return wrapper_async
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheavel(request):
+                return view(request, *args, **kwargs)
+
+            etag, ultima_modificacao = _validadores(*estado(tags(request, **kwargs)))
+            response = get_conditional_response(request, etag=etag, last_modified=ultima_modificacao)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _marcar(response, etag, ultima_modificacao)
+        return wrapper
+    return decorator
+
+
+def gravar_ao_final(partes, chave, timeout=None):
+    """Repassa as partes de uma resposta em streaming e grava o documento completo no cache.
+
+    Se o envio for interrompido (cliente desconectou) nada é gravado.
+    """
+    documento = []
+    for parte in partes:
+        documento.append(parte)
+        yield parte
+    cache.set(chave, b''.join(documento), _timeout() if timeout is None else timeout)
+
+
+def _aguardar(chave, espera=0.05, tentativas=20):
+    """Aguarda (até ~1s) outra requisição gravar a página no cache"""
+    for _ in range(tentativas):
+        time.sleep(espera)
+        response = cache.get(chave)
+        if response is not None:
+            return response
+    return None
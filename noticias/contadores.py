@@ -0,0 +1,144 @@
+"""
+Estatísticas do painel materializadas na tabela ContadorPainel.
+
+Cada save/delete de Noticia aplica a diferença entre o estado anterior e o
+novo (veja signals.py); o painel lê tudo com uma consulta pequena, sem COUNT
+sobre o acervo. O comando reconciliar_contadores recalcula os valores a partir
+de um único aggregate condicional e corrige qualquer desvio (por exemplo após
+bulk_update ou update() em massa, que não disparam sinais).
+
+Para uma nova estatística basta incluí-la em `contribuicao` e em `agregar`.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ContadorPainel, Noticia
+
+TOTAL = 'total'
+PUBLICADAS = 'publicadas'
+DESTAQUES = 'destaques'
+SOMA_RELEVANCIA = 'soma_relevancia'
+# Volume diário de publicação: 'publicadas:2025-08-18'
+PREFIXO_DIA = 'publicadas:'
+
+# Campos da notícia que afetam os contadores
+CAMPOS = ('publicada', 'destaque', 'relevancia_score', 'data_publicacao')
+
+
+def _chave_dia(data):
+    return PREFIXO_DIA + timezone.localdate(data).isoformat()
+
+
+def contribuicao(publicada, destaque, relevancia_score, data_publicacao):
+    """Quanto uma notícia soma em cada contador"""
+    valores = {TOTAL: 1}
+    if publicada:
+        valores[PUBLICADAS] = 1
+        valores[SOMA_RELEVANCIA] = relevancia_score or 0.0
+        if destaque:
+            valores[DESTAQUES] = 1
+        if data_publicacao:
+            valores[_chave_dia(data_publicacao)] = 1
+    return valores
+
+
+def estado(noticia):
+    return tuple(getattr(noticia, campo) for campo in CAMPOS)
+
+
+def estado_salvo(pk):
+    """Estado gravado no banco (antes do save em andamento)"""
+    return Noticia.objects.filter(pk=pk).values_list(*CAMPOS).first()
+
+
+def aplicar(anterior, atual):
+    """Aplica nos contadores a diferença entre dois estados (None = notícia inexistente)"""
+    deltas = defaultdict(float)
+    for valores, sinal in ((anterior, -1), (atual, 1)):
+        if valores:
+            for nome, valor in contribuicao(*valores).items():
+                deltas[nome] += sinal * valor
+    deltas = {nome: delta for nome, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        ContadorPainel.objects.bulk_create(
+            [ContadorPainel(nome=nome) for nome in deltas], ignore_conflicts=True,
+        )
+        for nome, delta in deltas.items():
+            # Incremento atômico no banco: saves concorrentes não se sobrescrevem
+            ContadorPainel.objects.filter(nome=nome).update(valor=F('valor') + delta)
+
+
+def agregar():
+    """Valores corretos dos contadores, calculados sobre a tabela de notícias"""
+    publicada = Q(publicada=True)
+    totais = Noticia.objects.aggregate(
+        total=Count('id'),
+        publicadas=Count('id', filter=publicada),
+        destaques=Count('id', filter=publicada & Q(destaque=True)),
+        soma_relevancia=Sum('relevancia_score', filter=publicada),
+    )
+    valores = {
+        TOTAL: totais['total'],
+        PUBLICADAS: totais['publicadas'],
+        DESTAQUES: totais['destaques'],
+        SOMA_RELEVANCIA: totais['soma_relevancia'] or 0.0,
+    }
+    por_dia = (
+        Noticia.objects.filter(publicada).annotate(dia=TruncDate('data_publicacao'))
+        .values('dia').annotate(quantidade=Count('id')).values_list('dia', 'quantidade')
+    )
+    for dia, quantidade in por_dia:
+        valores[PREFIXO_DIA + dia.isoformat()] = quantidade
+    return valores
+
+
+def reconciliar():
+    """Regrava os contadores a partir de `agregar`. Retorna {nome: (antes, depois)} do que mudou."""
+    corretos = agregar()
+    with transaction.atomic():
+        atuais = dict(ContadorPainel.objects.select_for_update().values_list('nome', 'valor'))
+        ContadorPainel.objects.all().delete()
+        ContadorPainel.objects.bulk_create(
+            [ContadorPainel(nome=nome, valor=valor) for nome, valor in corretos.items()]
+        )
+    return {
+        nome: (atuais.get(nome, 0), corretos.get(nome, 0))
+        for nome in set(atuais) | set(corretos)
+        if abs(atuais.get(nome, 0) - corretos.get(nome, 0)) > 1e-6
+    }
+
+
+def estatisticas(dias=7):
+    """Estatísticas do painel com uma consulta à tabela de contadores"""
+    hoje = timezone.localdate()
+    primeiro = hoje - timedelta(days=dias - 1)
+    linhas = dict(ContadorPainel.objects.filter(
+        Q(nome__in=(TOTAL, PUBLICADAS, DESTAQUES, SOMA_RELEVANCIA))
+        | Q(nome__gte=PREFIXO_DIA + primeiro.isoformat(), nome__lte=PREFIXO_DIA + hoje.isoformat())
+    ).values_list('nome', 'valor'))
+    if TOTAL not in linhas:
+        # Tabela ainda vazia (primeiro acesso após a migração)
+        reconciliar()
+        return estatisticas(dias)
+
+    total = int(linhas.get(TOTAL, 0))
+    publicadas = int(linhas.get(PUBLICADAS, 0))
+    return {
+        'total': total,
+        'publicadas': publicadas,
+        'rascunhos': total - publicadas,
+        'destaques': int(linhas.get(DESTAQUES, 0)),
+        'relevancia_media': linhas.get(SOMA_RELEVANCIA, 0.0) / publicadas if publicadas else 0.0,
+        'volume_diario': [
+            (dia, int(linhas.get(PREFIXO_DIA + dia.isoformat(), 0)))
+            for dia in (primeiro + timedelta(days=n) for n in range(dias))
+        ],
+    }
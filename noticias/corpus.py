@@ -0,0 +1,216 @@
+"""
+Gerador de acervo sintético para testes de carga e de escala.
+
+Os textos imitam o português jornalístico: vocabulário com frequência de Zipf,
+frases e parágrafos com comprimentos log-normais, palavras importantes e
+termos de tendência inseridos nas frequências pedidas, datas espalhadas com
+mais densidade nos dias recentes e poucas imagens de placeholder (com as
+derivadas já geradas) compartilhadas por todas as notícias.
+
+A geração do texto é o trabalho pesado e pode rodar em um pool de processos
+(gerar_lote recebe só tipos simples); a gravação é sempre feita pelo processo
+principal com bulk_create, uma transação por lote.
+"""
+import math
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db import transaction
+from django.utils import timezone
+
+# Palavras funcionais primeiro: com pesos de Zipf elas dominam o texto, como no português real
+_FUNCIONAIS = (
+    'de a o que e do da em um para com não uma os no se na por mais as dos como mas ao '
+    'das à seu sua ou quando muito nos já também só pelo pela até isso entre depois sem '
+    'mesmo aos seus quem nas esse eles essa num nem suas às numa pelos elas qual nós '
+    'este dele deles essas esses pelas foi são está ser tem ter segundo após sobre'
+).split()
+_CONTEUDO = (
+    'governo presidente ministro ministério projeto lei congresso senado câmara deputados '
+    'prefeitura prefeito estado município cidade capital país brasil brasileiros população '
+    'mercado empresas setor investimento investimentos crescimento inflação juros banco '
+    'central dólar real bolsa exportações importações indústria comércio serviços emprego '
+    'desemprego trabalhadores salário renda impostos reforma tributária orçamento gastos '
+    'pesquisa estudo dados levantamento especialistas professor universidade escola alunos '
+    'estudantes ensino hospital pacientes médicos vacina doença tratamento atendimento '
+    'polícia operação investigação justiça tribunal decisão processo acusação defesa '
+    'eleição eleições candidato candidatos partido campanha votos eleitores debate '
+    'clube time jogo partida campeonato temporada técnico jogadores torcida gols vitória '
+    'festival show filme série música artista artistas exposição museu livro teatro '
+    'chuva temperatura calor frio previsão seca enchente rio floresta desmatamento energia '
+    'transporte ônibus metrô trânsito rodovia obras infraestrutura moradia saneamento água '
+    'internet aplicativo plataforma inteligência artificial dados digital redes usuários '
+    'anunciou afirmou informou declarou aprovou divulgou registrou apresentou lançou '
+    'deve pode vai teve fez disse ficou chegou começou continua aumentou caiu subiu '
+    'novo nova novos novas grande grandes maior menor principal primeiro primeira último '
+    'última importante público pública federal estadual municipal nacional regional '
+    'ano anos mês meses semana dia dias hoje ontem amanhã período semestre trimestre '
+    'milhões bilhões mil cerca quase mais de menos parte total número valor índice taxa'
+).split()
+VOCABULARIO = tuple(_FUNCIONAIS + _CONTEUDO)
+# Pesos cumulativos de Zipf (frequência ~ 1/posição)
+_PESOS = tuple(accumulate(1 / (posicao + 1) for posicao in range(len(VOCABULARIO))))
+
+# Cores dos placeholders compartilhados
+_CORES = ((44, 62, 80), (192, 57, 43), (39, 174, 96), (41, 128, 185), (142, 68, 173), (243, 156, 18))
+
+PARAMETROS_PADRAO = {
+    # Fração das notícias com ao menos uma palavra importante / um termo de tendência
+    'freq_palavras': 0.35,
+    'freq_tendencias': 0.2,
+    'fracao_publicadas': 0.92,
+    'dias': 3 * 365,
+}
+
+
+def _lognormal(rng, mediana, dispersao, minimo, maximo):
+    return int(min(maximo, max(minimo, round(rng.lognormvariate(math.log(mediana), dispersao)))))
+
+
+def _frase(rng, palavras):
+    texto = rng.choices(VOCABULARIO, cum_weights=_PESOS, k=palavras)
+    if palavras > 12 and rng.random() < 0.4:
+        # Uma vírgula no meio das frases longas
+        meio = rng.randint(4, palavras - 4)
+        texto[meio] += ','
+    return ' '.join(texto).capitalize()
+
+
+def _inserir(rng, texto, termos):
+    """Insere os termos em posições aleatórias entre as palavras do texto"""
+    palavras = texto.split(' ')
+    for termo in termos:
+        palavras.insert(rng.randint(1, len(palavras)), termo)
+    return ' '.join(palavras)
+
+
+def gerar_textos(rng, palavras_importantes, tendencias, parametros):
+    """(titulo, resumo, conteudo) de uma notícia"""
+    titulo = _frase(rng, _lognormal(rng, 9, 0.3, 4, 20))
+    resumo = '. '.join(
+        _frase(rng, _lognormal(rng, 16, 0.35, 6, 35)) for _ in range(rng.randint(1, 3))
+    ) + '.'
+    paragrafos = []
+    for _ in range(_lognormal(rng, 6, 0.5, 2, 30)):
+        frases = [_frase(rng, _lognormal(rng, 18, 0.4, 5, 45)) for _ in range(rng.randint(2, 6))]
+        paragrafos.append('. '.join(frases) + '.')
+    conteudo = '\n\n'.join(paragrafos)
+
+    if palavras_importantes and rng.random() < parametros['freq_palavras']:
+        escolhidas = rng.sample(palavras_importantes, min(len(palavras_importantes), rng.randint(1, 3)))
+        conteudo = _inserir(rng, conteudo, escolhidas)
+        if rng.random() < 0.3:
+            titulo = _inserir(rng, titulo, escolhidas[:1])
+    if tendencias and rng.random() < parametros['freq_tendencias']:
+        # Tendências contam no título e no resumo (RelevanciaService._ocorrencias)
+        resumo = _inserir(rng, resumo, [rng.choice(tendencias)])
+    return titulo[:200], resumo[:500], conteudo
+
+
+def gerar_lote(indice, quantidade, semente, palavras_importantes, tendencias, parametros, referencia):
+    """Linhas (titulo, resumo, conteudo, data_publicacao, publicada, imagem) de um lote.
+
+    A semente depende do índice do lote: o acervo é o mesmo com qualquer número de processos.
+    """
+    rng = random.Random(f'{semente}:{indice}')
+    segundos = parametros['dias'] * 86400
+    linhas = []
+    for _ in range(quantidade):
+        titulo, resumo, conteudo = gerar_textos(rng, palavras_importantes, tendencias, parametros)
+        # Mais notícias nos dias recentes: a idade cresce com o quadrado de um uniforme
+        idade = timedelta(seconds=int(segundos * rng.random() ** 2))
+        linhas.append((
+            titulo, resumo, conteudo, referencia - idade,
+            rng.random() < parametros['fracao_publicadas'], rng.randrange(len(_CORES)),
+        ))
+    return linhas
+
+
+def _gerar_lote_pool(argumentos):
+    return gerar_lote(*argumentos)
+
+
+def preparar_imagens(quantidade=len(_CORES)):
+    """Grava os placeholders no storage (uma vez) e retorna [(nome, derivados)]"""
+    import io
+
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from PIL import Image, ImageDraw
+
+    from .imagens import gerar_derivados
+    from .models import Noticia
+
+    imagens = []
+    for numero, cor in enumerate(_CORES[:quantidade]):
+        nome = f'noticias/corpus/placeholder-{numero}.jpg'
+        if not default_storage.exists(nome):
+            imagem = Image.new('RGB', (1600, 900), cor)
+            desenho = ImageDraw.Draw(imagem)
+            desenho.rectangle((100, 600, 1500, 800), fill=tuple(min(255, c + 60) for c in cor))
+            saida = io.BytesIO()
+            imagem.save(saida, 'JPEG', quality=85)
+            default_storage.save(nome, ContentFile(saida.getvalue()))
+        arquivo = Noticia(imagem=nome).imagem
+        imagens.append((nome, gerar_derivados(arquivo)))
+    return imagens
+
+
+def gerar(quantidade, lote=5000, workers=1, semente=42, parametros=None, progresso=None):
+    """Grava `quantidade` notícias sintéticas. Retorna a quantidade gravada.
+
+    bulk_create não dispara sinais: os contadores do painel são reconciliados
+    e o cache de páginas e do sitemap invalidado no final; a relevância e as palavras-chave
+    ficam pendentes para o atualizar_relevancia --incremental.
+    """
+    from . import contadores, sitemaps
+    from .cache import TAG_LISTAS, invalidar
+    from .models import Noticia
+    from .services import PALAVRAS_IMPORTANTES, RelevanciaService, _inicializar_processo
+
+    parametros = {**PARAMETROS_PADRAO, **(parametros or {})}
+    palavras_importantes = tuple(PALAVRAS_IMPORTANTES)
+    tendencias = tuple(RelevanciaService().tendencias.termos())
+    imagens = preparar_imagens()
+    referencia = timezone.now()
+    tarefas = [
+        (indice, min(lote, quantidade - inicio), semente, palavras_importantes, tendencias, parametros, referencia)
+        for indice, inicio in enumerate(range(0, quantidade, lote))
+    ]
+
+    meses = set()
+
+    def gravar(linhas):
+        meses.update(sitemaps.particao(linha[3]) for linha in linhas)
+        noticias = [
+            Noticia(
+                titulo=titulo, resumo=resumo, conteudo=conteudo, data_publicacao=data,
+                publicada=publicada, imagem=imagens[imagem][0], imagem_derivados=imagens[imagem][1],
+            )
+            for titulo, resumo, conteudo, data, publicada, imagem in linhas
+        ]
+        with transaction.atomic():
+            Noticia.objects.bulk_create(noticias, batch_size=1000)
+        return len(noticias)
+
+    gravadas = 0
+    if workers <= 1:
+        for tarefa in tarefas:
+            gravadas += gravar(gerar_lote(*tarefa))
+            if progresso:
+                progresso(gravadas, quantidade)
+    else:
+        from multiprocessing import get_all_start_methods, get_context
+
+        contexto = get_context('fork' if 'fork' in get_all_start_methods() else 'spawn')
+        with contexto.Pool(workers, initializer=_inicializar_processo) as pool:
+            # imap mantém a ordem e gera os próximos lotes enquanto este é gravado
+            for linhas in pool.imap(_gerar_lote_pool, tarefas):
+                gravadas += gravar(linhas)
+                if progresso:
+                    progresso(gravadas, quantidade)
+
+    contadores.reconciliar()
+    invalidar(TAG_LISTAS, *(sitemaps.tag_particao(ano, mes) for ano, mes in meses))
+    return gravadas
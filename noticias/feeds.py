@@ -0,0 +1,200 @@
+"""
+Feeds RSS 2.0, Atom e JSON Feed das notícias publicadas.
+
+O documento é gerado a partir de uma projeção de card (sem o conteúdo), enviado
+em partes (StreamingHttpResponse) e guardado inteiro no cache ao final do envio.
+A chave usa a versão da tag de listagens: qualquer gravação de Noticia gera um
+documento novo. O GET condicional (condicional_publico) responde 304 aos
+agregadores que já têm a versão atual sem consultar o banco.
+"""
+import hashlib
+import io
+import json
+import mimetypes
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import require_safe
+
+from .cache import TAG_LISTAS, condicional_publico, estado, gravar_ao_final, versoes
+from .imagens import url_imagem
+from .models import Noticia, PalavraChave
+from .palavras import buscar_palavra
+
+# Projeção de card: o conteúdo completo nunca sai do banco
+CAMPOS_FEED = ('id', 'titulo', 'resumo', 'imagem', 'imagem_derivados', 'data_publicacao', 'data_atualizacao')
+
+
+class _FeedEmPartes:
+    """Escreve o documento XML em partes: abertura, um item por vez e fechamento"""
+
+    elemento_item = None
+
+    def __init__(self, *args, atualizado=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.atualizado = atualizado
+
+    def latest_post_date(self):
+        # Os itens não ficam em self.items: a data vem do estado das tags
+        return self.atualizado or super().latest_post_date()
+
+    def item(self, **kwargs):
+        """Dict do item no formato do feedgenerator (sem acumular em self.items)"""
+        self.add_item(**kwargs)
+        return self.items.pop()
+
+    def partes(self, itens):
+        saida = io.StringIO()
+        handler = SimplerXMLGenerator(saida, 'utf-8', short_empty_elements=True)
+
+        def descarregar():
+            texto = saida.getvalue()
+            saida.seek(0)
+            saida.truncate()
+            return texto.encode('utf-8')
+
+        handler.startDocument()
+        self.abrir(handler)
+        self.add_root_elements(handler)
+        yield descarregar()
+        for item in itens:
+            handler.startElement(self.elemento_item, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.elemento_item)
+            yield descarregar()
+        self.fechar(handler)
+        yield descarregar()
+
+
+class FeedRss(_FeedEmPartes, feedgenerator.Rss201rev2Feed):
+    elemento_item = 'item'
+
+    def abrir(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+
+    def fechar(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class FeedAtom(_FeedEmPartes, feedgenerator.Atom1Feed):
+    elemento_item = 'entry'
+
+    def abrir(self, handler):
+        handler.startElement('feed', self.root_attributes())
+
+    def fechar(self, handler):
+        handler.endElement('feed')
+
+
+class FeedJson(_FeedEmPartes, feedgenerator.SyndicationFeed):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1)"""
+
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def partes(self, itens):
+        cabecalho = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+        }
+        # Abre a lista de itens no próprio JSON do cabeçalho: '..., "items": ['
+        yield json.dumps({**cabecalho, 'items': []}, ensure_ascii=False)[:-2].encode('utf-8')
+        separador = ''
+        for item in itens:
+            dados = {
+                'id': item['unique_id'],
+                'url': item['link'],
+                'title': item['title'],
+                'summary': item['description'],
+                'content_text': item['description'],
+                'date_published': item['pubdate'].isoformat(),
+                'date_modified': item['updateddate'].isoformat(),
+            }
+            if item['enclosures']:
+                dados['image'] = item['enclosures'][0].url
+            yield (separador + json.dumps(dados, ensure_ascii=False)).encode('utf-8')
+            separador = ','
+        yield b']}'
+
+
+FORMATOS = {'rss': FeedRss, 'atom': FeedAtom, 'json': FeedJson}
+
+
+def _tags_feed(request, **kwargs):
+    return [TAG_LISTAS]
+
+
+def _limite():
+    return getattr(settings, 'FEED_ITENS', 30)
+
+
+def _itens(gerador, request, palavra):
+    noticias = Noticia.objects.publicadas().only(*CAMPOS_FEED)
+    if palavra:
+        noticias = noticias.filter(palavras__palavra=palavra)
+    noticias = noticias.order_by('-data_publicacao', '-id')[:_limite()]
+    for noticia in noticias.iterator(chunk_size=100):
+        link = request.build_absolute_uri(noticia.get_absolute_url())
+        enclosures = []
+        if noticia.imagem:
+            url = url_imagem(noticia, 'card', formatos=('jpeg',))
+            tipo = mimetypes.guess_type(url)[0] or 'image/jpeg'
+            # O tamanho não é conhecido sem ler o arquivo; 0 é aceito pelos leitores
+            enclosures.append(feedgenerator.Enclosure(request.build_absolute_uri(url), '0', tipo))
+        yield gerador.item(
+            title=noticia.titulo, link=link, description=noticia.resumo,
+            unique_id=link, unique_id_is_permalink=True,
+            pubdate=noticia.data_publicacao, updateddate=noticia.data_atualizacao,
+            enclosures=enclosures,
+        )
+
+
+@require_safe
+@condicional_publico(_tags_feed)
+def feed(request, formato):
+    """Feed das notícias publicadas (?palavra= filtra por palavra-chave)"""
+    classe = FORMATOS.get(formato)
+    if classe is None:
+        raise Http404('Formato de feed desconhecido')
+
+    base = hashlib.md5((request.get_host() + request.get_full_path()).encode('utf-8')).hexdigest()
+    versao = '.'.join(str(v) for v in versoes(_tags_feed(request)))
+    chave = f'feeds:{base}:{versao}'
+    documento = cache.get(chave)
+    if documento is not None:
+        response = HttpResponse(documento, content_type=classe.content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    palavra = None
+    titulo = getattr(settings, 'FEED_TITULO', 'Portal de Notícias')
+    link = reverse('noticias:home')
+    if request.GET.get('palavra'):
+        palavra = get_object_or_404(PalavraChave, radical=buscar_palavra(request.GET['palavra']))
+        titulo = f'{titulo} - {palavra.rotulo}'
+        link = f"{reverse('noticias:lista_noticias')}?palavra={palavra.radical}"
+
+    _, modificada = estado(_tags_feed(request))
+    gerador = classe(
+        title=titulo,
+        link=request.build_absolute_uri(link),
+        description=getattr(settings, 'FEED_DESCRICAO', 'Últimas notícias publicadas'),
+        language='pt-br',
+        feed_url=request.build_absolute_uri(),
+        atualizado=datetime.fromtimestamp(modificada, tz=dt_timezone.utc),
+    )
+    partes = gravar_ao_final(gerador.partes(_itens(gerador, request, palavra)), chave)
+    response = StreamingHttpResponse(partes, content_type=classe.content_type)
+    response['X-Cache'] = 'MISS'
+    return response
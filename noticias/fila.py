@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import relacionadas
+from .models import Noticia, TarefaRelevancia
+
+# Tempo que uma tarefa fica reservada para o worker que a pegou
+RESERVA = timedelta(minutes=5)
+MAX_TENTATIVAS = 5
+
+
+def enfileirar(noticia_id):
+    """Agenda o recálculo de relevância da notícia.
+
+    Tarefas repetidas da mesma notícia são agrupadas em uma só; a data da
+    solicitação é renovada para que um worker em andamento não descarte a
+    edição mais recente. Sem RELEVANCIA_WORKER (nenhum processo rodando
+    processar_relevancia) a tarefa é processada ao fim da transação que a criou.
+    """
+    agora = timezone.now()
+    if not TarefaRelevancia.objects.filter(noticia_id=noticia_id).update(solicitada_em=agora, tentativas=0):
+        TarefaRelevancia.objects.bulk_create(
+            [TarefaRelevancia(noticia_id=noticia_id, solicitada_em=agora)],
+            ignore_conflicts=True,
+        )
+    if not getattr(settings, 'RELEVANCIA_WORKER', False):
+        transaction.on_commit(lambda: processar(noticia_id=noticia_id))
+
+
+def _reservar(limite, noticia_id=None):
+    """Reserva até `limite` tarefas disponíveis; seguro com vários workers"""
+    agora = timezone.now()
+    disponiveis = TarefaRelevancia.objects.filter(
+        Q(reservada_ate__isnull=True) | Q(reservada_ate__lt=agora),
+        tentativas__lt=MAX_TENTATIVAS,
+    )
+    if noticia_id is not None:
+        disponiveis = disponiveis.filter(noticia_id=noticia_id)
+    disponiveis = disponiveis.values_list('id', 'noticia_id', 'solicitada_em', 'reservada_ate')[:limite]
+
+    reservadas = []
+    for id, noticia_id, solicitada_em, reservada_ate in disponiveis:
+        # Update condicional: só um worker consegue trocar a reserva
+        if TarefaRelevancia.objects.filter(pk=id, reservada_ate=reservada_ate).update(reservada_ate=agora + RESERVA):
+            reservadas.append((id, noticia_id, solicitada_em))
+    return reservadas
+
+
+def processar(limite=50, noticia_id=None):
+    """Processa um lote de tarefas (ou só a da notícia informada). Retorna (processadas, falhas)"""
+    processadas = falhas = 0
+    for id, noticia_id, solicitada_em in _reservar(limite, noticia_id):
+        try:
+            noticia = Noticia.objects.get(pk=noticia_id)
+            noticia.calcular_relevancia()
+            # As palavras-chave podem ter mudado
+            relacionadas.atualizar_noticia(noticia_id)
+        except Exception as e:
+            falhas += 1
+            tarefa = TarefaRelevancia.objects.filter(pk=id)
+            tentativas = (tarefa.values_list('tentativas', flat=True).first() or 0) + 1
+            # Nova tentativa com espera crescente
+            tarefa.update(
+                tentativas=tentativas,
+                erro=str(e),
+                reservada_ate=timezone.now() + timedelta(seconds=30 * 2 ** tentativas),
+            )
+            continue
+
+        removidas, _ = TarefaRelevancia.objects.filter(pk=id, solicitada_em=solicitada_em).delete()
+        if not removidas:
+            # Notícia editada durante o cálculo: a tarefa volta para a fila
+            TarefaRelevancia.objects.filter(pk=id).update(reservada_ate=None)
+        processadas += 1
+    return processadas, falhas
+
+
+def pendentes():
+    return TarefaRelevancia.objects.filter(tentativas__lt=MAX_TENTATIVAS).count()
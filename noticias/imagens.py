@@ -0,0 +1,166 @@
+import base64
+import hashlib
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+# Larguras máximas das derivadas (nunca ampliamos a original)
+TAMANHOS = {
+    'thumb': 320,
+    'card': 640,
+    'hero': 1280,
+}
+FORMATOS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+LARGURA_PLACEHOLDER = 16
+# Dígitos hexadecimais do sha256 no nome das derivadas
+TAMANHO_HASH = 12
+
+
+def _formatos():
+    # Builds do Pillow sem libwebp geram só JPEG
+    return [f for f in FORMATOS if f != 'webp' or features.check('webp')]
+
+
+def caminho_derivada(origem, tamanho, formato, conteudo):
+    """noticias/foto.png -> noticias/derivados/foto-png-card.1a2b3c4d5e6f.webp
+
+    A extensão original entra no nome para que foto.png e foto.jpg não compartilhem derivadas.
+    O hash do conteúdo muda o nome quando os bytes mudam: o arquivo pode ser
+    servido como imutável (veja midia.PADRAO_IMUTAVEL).
+    """
+    pasta, arquivo = posixpath.split(origem)
+    nome, extensao_origem = posixpath.splitext(arquivo)
+    if extensao_origem:
+        nome = f'{nome}-{extensao_origem[1:].lower()}'
+    extensao = 'jpg' if formato == 'jpeg' else formato
+    resumo = hashlib.sha256(conteudo).hexdigest()[:TAMANHO_HASH]
+    return posixpath.join(pasta, 'derivados', f'{nome}-{tamanho}.{resumo}.{extensao}')
+
+
+def _sem_transparencia(imagem):
+    """JPEG não tem canal alfa: aplica a imagem sobre fundo branco"""
+    if imagem.mode in ('RGBA', 'LA') or (imagem.mode == 'P' and 'transparency' in imagem.info):
+        imagem = imagem.convert('RGBA')
+        fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+        fundo.paste(imagem, mask=imagem.getchannel('A'))
+        return fundo
+    return imagem.convert('RGB')
+
+
+def _codificar(imagem, formato):
+    nome_pil, opcoes = FORMATOS[formato]
+    if formato == 'jpeg':
+        imagem = _sem_transparencia(imagem)
+    elif imagem.mode not in ('RGB', 'RGBA'):
+        imagem = imagem.convert('RGBA' if 'A' in imagem.getbands() or 'transparency' in imagem.info else 'RGB')
+    buffer = io.BytesIO()
+    imagem.save(buffer, nome_pil, **opcoes)
+    return buffer.getvalue()
+
+
+def _redimensionar(imagem, largura):
+    if largura >= imagem.width:
+        return imagem
+    altura = max(1, round(imagem.height * largura / imagem.width))
+    return imagem.resize((largura, altura), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+def _placeholder(imagem):
+    """Miniatura borrada embutida como data URI (algumas centenas de bytes)"""
+    pequena = _redimensionar(imagem, LARGURA_PLACEHOLDER)
+    buffer = io.BytesIO()
+    _sem_transparencia(pequena).save(buffer, 'JPEG', quality=40)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _gravar(storage, caminho, conteudo):
+    # Mesmo nome, mesmo conteúdo: nunca sobrescreve um arquivo já servido como imutável
+    if storage.exists(caminho):
+        return caminho
+    return storage.save(caminho, ContentFile(conteudo))
+
+
+def gerar_derivados(arquivo):
+    """Gera as derivadas de um ImageField já salvo no storage.
+
+    Retorna o dict guardado em Noticia.imagem_derivados:
+    {'origem', 'largura', 'altura', 'placeholder', 'tamanhos': {nome: {'largura', 'altura', formato: caminho}}}
+    """
+    storage = arquivo.storage
+    with storage.open(arquivo.name, 'rb') as entrada:
+        imagem = Image.open(entrada)
+        imagem = ImageOps.exif_transpose(imagem)
+        imagem.load()
+
+    tamanhos = {}
+    # Da maior para a menor: cada redução parte da anterior, que já é menor
+    base = imagem
+    anterior = None
+    for nome, largura in sorted(TAMANHOS.items(), key=lambda item: -item[1]):
+        reduzida = _redimensionar(base, largura)
+        if reduzida is base and anterior is not None:
+            # Original menor que o tamanho: reaproveita os arquivos do tamanho acima
+            tamanhos[nome] = anterior
+            continue
+        base = reduzida
+        derivada = {'largura': base.width, 'altura': base.height}
+        for formato in _formatos():
+            conteudo = _codificar(base, formato)
+            derivada[formato] = _gravar(storage, caminho_derivada(arquivo.name, nome, formato, conteudo), conteudo)
+        tamanhos[nome] = anterior = derivada
+
+    return {
+        'origem': arquivo.name,
+        'largura': imagem.width,
+        'altura': imagem.height,
+        'placeholder': _placeholder(imagem),
+        'tamanhos': tamanhos,
+    }
+
+
+def _arquivos(derivados):
+    return {
+        derivada[formato]
+        for derivada in (derivados or {}).get('tamanhos', {}).values()
+        for formato in FORMATOS
+        if derivada.get(formato)
+    }
+
+
+def url_imagem(noticia, tamanho='card', formatos=FORMATOS):
+    """URL da derivada do tamanho no primeiro formato disponível (a original se não houver derivadas)"""
+    if not noticia.imagem:
+        return None
+    derivados = noticia.imagem_derivados or {}
+    derivada = derivados.get('tamanhos', {}).get(tamanho) or {}
+    if derivados.get('origem') == noticia.imagem.name:
+        for formato in formatos:
+            if derivada.get(formato):
+                return noticia.imagem.storage.url(derivada[formato])
+    return noticia.imagem.url
+
+
+def atualizar_derivados(noticia, forcar=False):
+    """Gera as derivadas da notícia se a imagem mudou. Retorna True se gerou."""
+    from .models import Noticia
+
+    if not noticia.imagem:
+        return False
+    atuais = noticia.imagem_derivados or {}
+    if not forcar and atuais.get('origem') == noticia.imagem.name:
+        return False
+
+    derivados = gerar_derivados(noticia.imagem)
+    # Apaga as derivadas da imagem anterior (exceto as que foram regravadas com o mesmo nome)
+    for caminho in _arquivos(atuais) - _arquivos(derivados):
+        noticia.imagem.storage.delete(caminho)
+    # update() em vez de save(): não dispara os sinais nem a fila de relevância de novo.
+    # data_atualizacao fica como está: derivadas não são edição (veja Noticia.save)
+    Noticia.objects.filter(pk=noticia.pk).update(imagem_derivados=derivados)
+    noticia.imagem_derivados = derivados
+    return True
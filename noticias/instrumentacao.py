@@ -0,0 +1,250 @@
+"""
+Instrumentação por requisição: consultas SQL, tempo de SQL, de template e da view.
+
+Em uma fração INSTRUMENTACAO_AMOSTRAGEM das requisições o middleware mede as
+consultas (por um execute_wrapper presente em todas as conexões, inerte fora
+das amostras) e as renderizações de template; no fim publica as medidas no
+cabeçalho Server-Timing e em uma linha de log JSON (logger
+'noticias.instrumentacao'). Requisições acima de
+INSTRUMENTACAO_LIMITE_CONSULTAS consultas ou INSTRUMENTACAO_LIMITE_MS saem
+como WARNING, com as consultas mais lentas.
+
+O tempo de SQL se sobrepõe aos de view e template (querysets preguiçosos são
+avaliados no template). Em respostas em streaming só é medido o que acontece
+até o início do envio. O middleware funciona em WSGI e ASGI: a medição fica
+em uma ContextVar, que acompanha a requisição até as threads do ORM assíncrono.
+"""
+import heapq
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from itertools import count
+
+import orjson
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('noticias.instrumentacao')
+
+# Medição da requisição em andamento (por thread/tarefa)
+_atual = ContextVar('noticias_instrumentacao', default=None)
+_sequencia = count()
+
+
+class Medicao:
+    """Contadores de uma requisição amostrada"""
+
+    def __init__(self, consultas_lentas=5):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.view = None
+        self._inicio_view = None
+        self._profundidade_template = 0
+        self._maximo_lentas = consultas_lentas
+        self._lentas = []
+        # Consultas de uma mesma requisição podem rodar em threads diferentes (asyncio.gather)
+        self._lock = threading.Lock()
+
+    def registrar_consulta(self, duracao, alias, sql):
+        with self._lock:
+            self.consultas += 1
+            self.sql += duracao
+            # Só o texto (sem parâmetros) das N consultas mais lentas
+            item = (duracao, next(_sequencia), alias, sql)
+            if len(self._lentas) < self._maximo_lentas:
+                heapq.heappush(self._lentas, item)
+            elif duracao > self._lentas[0][0]:
+                heapq.heapreplace(self._lentas, item)
+
+    def iniciar_view(self):
+        self._inicio_view = time.perf_counter()
+
+    def terminar_view(self):
+        if self._inicio_view is not None and self.view is None:
+            # Templates renderizados dentro da view (render()) contam só em tpl
+            self.view = time.perf_counter() - self._inicio_view - self.template
+
+    def lentas(self):
+        return [
+            {'ms': round(duracao * 1000, 2), 'banco': alias, 'sql': sql[:1000]}
+            for duracao, _, alias, sql in sorted(self._lentas, reverse=True)
+        ]
+
+
+def observar_consultas(wrapper):
+    """Instala o execute_wrapper em todas as conexões, atuais e futuras, de qualquer thread.
+
+    Fica no início da lista porque o execute_wrapper() do Django remove sempre o
+    último item; o wrapper decide sozinho (por uma ContextVar) se a consulta é medida.
+    """
+    def instalar(conexao):
+        if wrapper not in conexao.execute_wrappers:
+            conexao.execute_wrappers.insert(0, wrapper)
+
+    def conectada(sender, connection, **kwargs):
+        instalar(connection)
+
+    for conexao in connections.all(initialized_only=True):
+        instalar(conexao)
+    connection_created.connect(conectada, weak=False, dispatch_uid=f'observar_consultas:{id(wrapper)}')
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicao = _atual.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.registrar_consulta(time.perf_counter() - inicio, context['connection'].alias, sql)
+
+
+def _render_medido(render):
+    def wrapper(self, *args, **kwargs):
+        medicao = _atual.get()
+        if medicao is None:
+            return render(self, *args, **kwargs)
+        # render_to_string dentro de um template não conta duas vezes
+        medicao._profundidade_template += 1
+        inicio = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            medicao._profundidade_template -= 1
+            if not medicao._profundidade_template:
+                medicao.template += time.perf_counter() - inicio
+    wrapper._instrumentado = True
+    return wrapper
+
+
+def instrumentar_templates():
+    """Mede o Template.render do backend do Django (idempotente; sem custo fora das amostras)"""
+    from django.template.backends.django import Template
+
+    if not getattr(Template.render, '_instrumentado', False):
+        Template.render = _render_medido(Template.render)
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 2)
+
+
+def server_timing(medicao, total):
+    partes = [
+        f'db;dur={_ms(medicao.sql)};desc="{medicao.consultas} consultas"',
+        f'tpl;dur={_ms(medicao.template)}',
+    ]
+    if medicao.view is not None:
+        partes.append(f'view;dur={_ms(medicao.view)}')
+    partes.append(f'total;dur={_ms(total)}')
+    return ', '.join(partes)
+
+
+class InstrumentacaoMiddleware:
+    """Server-Timing e log estruturado das requisições amostradas.
+
+    Deve ficar no início de MIDDLEWARE para que o total inclua os demais middlewares.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'INSTRUMENTACAO_AMOSTRAGEM', 1.0)
+        self.limite_consultas = getattr(settings, 'INSTRUMENTACAO_LIMITE_CONSULTAS', 50)
+        self.limite_ms = getattr(settings, 'INSTRUMENTACAO_LIMITE_MS', 500)
+        self.consultas_lentas = getattr(settings, 'INSTRUMENTACAO_CONSULTAS_LENTAS', 5)
+        self.cabecalho = getattr(settings, 'INSTRUMENTACAO_SERVER_TIMING', True)
+        instrumentar_templates()
+        observar_consultas(_medir_consulta)
+
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Hooks síncronos seriam adaptados com sync_to_async (uma thread por chamada)
+            self.process_view = self._aprocess_view
+            self.process_template_response = self._aprocess_template_response
+
+    def _amostrar(self):
+        if self.amostragem < 1 and random.random() >= self.amostragem:
+            return None
+        return Medicao(self.consultas_lentas)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicao = self._amostrar()
+        if medicao is None:
+            return self.get_response(request)
+
+        token = _atual.set(medicao)
+        try:
+            response = self.get_response(request)
+        finally:
+            _atual.reset(token)
+        return self._concluir(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao = self._amostrar()
+        if medicao is None:
+            return await self.get_response(request)
+
+        token = _atual.set(medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _atual.reset(token)
+        return self._concluir(request, response, medicao)
+
+    def _concluir(self, request, response, medicao):
+        medicao.terminar_view()
+        total = time.perf_counter() - medicao.inicio
+        if self.cabecalho:
+            response['Server-Timing'] = server_timing(medicao, total)
+        self.registrar(request, response, medicao, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicao = _atual.get()
+        if medicao is not None:
+            medicao.iniciar_view()
+
+    def process_template_response(self, request, response):
+        # TemplateResponse é renderizada depois deste ponto: o template não entra no tempo da view
+        medicao = _atual.get()
+        if medicao is not None:
+            medicao.terminar_view()
+        return response
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return InstrumentacaoMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    async def _aprocess_template_response(self, request, response):
+        return InstrumentacaoMiddleware.process_template_response(self, request, response)
+
+    def registrar(self, request, response, medicao, total):
+        correspondencia = getattr(request, 'resolver_match', None)
+        dados = {
+            'metodo': request.method,
+            'caminho': request.path,
+            'view': correspondencia.view_name if correspondencia else None,
+            'status': response.status_code,
+            'consultas': medicao.consultas,
+            'sql_ms': _ms(medicao.sql),
+            'template_ms': _ms(medicao.template),
+            'view_ms': _ms(medicao.view) if medicao.view is not None else None,
+            'total_ms': _ms(total),
+        }
+        lenta = total * 1000 > self.limite_ms or medicao.consultas > self.limite_consultas
+        if lenta:
+            dados['consultas_lentas'] = medicao.lentas()
+            logger.warning(orjson.dumps(dados).decode())
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(orjson.dumps(dados).decode())
@@ -0,0 +1,76 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from noticias.models import Noticia
+from noticias.services import RelevanciaService
+
+
+class Command(BaseCommand):
+    help = 'Atualiza a relevância das notícias publicadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Recalcula apenas notícias com texto alterado ou que mudaram de faixa temporal (24h/7d/30d)',
+        )
+        parser.add_argument(
+            '--since',
+            help='Considera apenas notícias publicadas a partir desta data (AAAA-MM-DD ou ISO 8601)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de notícias lidas e gravadas por lote (padrão: 500)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Processos usados no cálculo (padrão: número de CPUs; 1 desativa o pool)',
+        )
+        parser.add_argument(
+            '--noticia-id',
+            type=int,
+            help='Atualiza apenas uma notícia específica',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Noticia.objects.filter(publicada=True)
+
+        if options['noticia_id']:
+            queryset = queryset.filter(pk=options['noticia_id'])
+            if not queryset.exists():
+                raise CommandError(f"Notícia com ID {options['noticia_id']} não encontrada")
+
+        if options['since']:
+            queryset = queryset.filter(data_publicacao__gte=self._parse_since(options['since']))
+
+        if options['incremental']:
+            queryset = queryset.pendentes_relevancia()
+
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero')
+
+        self.stdout.write('Iniciando atualização de relevância das notícias...')
+        resultado = RelevanciaService().atualizar_relevancia_todas(
+            queryset=queryset,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+        )
+        self.stdout.write(self.style.SUCCESS(resultado))
+
+    def _parse_since(self, valor):
+        data_hora = parse_datetime(valor)
+        if data_hora is None:
+            data = parse_date(valor)
+            if data is None:
+                raise CommandError(f'Data inválida para --since: {valor}')
+            data_hora = datetime.combine(data, time.min)
+        if timezone.is_naive(data_hora):
+            data_hora = timezone.make_aware(data_hora)
+        return data_hora
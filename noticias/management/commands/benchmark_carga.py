@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from noticias.benchmarks import carga, portal
+
+
+class Command(BaseCommand):
+    help = 'Teste de carga HTTP com conexões concorrentes contra um servidor em execução (WSGI ou ASGI)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Servidor testado (padrão: http://127.0.0.1:8000)')
+        parser.add_argument(
+            '--caminhos', help=f"Caminhos separados por vírgula (padrão: {', '.join(carga.CAMINHOS)})",
+        )
+        parser.add_argument('--concorrencia', type=int, default=50, help='Conexões simultâneas (padrão: 50)')
+        parser.add_argument('--requisicoes', type=int, default=2000, help='Requisições medidas (padrão: 2000)')
+        parser.add_argument('--aquecimento', type=int, default=100, help='Requisições descartadas no início (padrão: 100)')
+        parser.add_argument('--tempo-limite', type=float, default=30, help='Segundos por requisição (padrão: 30)')
+        parser.add_argument('--rotulo', default='', help='Identifica o servidor no JSON (ex.: gunicorn-wsgi, uvicorn-asgi)')
+        parser.add_argument('--saida', help='Grava o resultado em JSON neste arquivo')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar p50/p95/p99')
+
+    def handle(self, *args, **options):
+        caminhos = carga.CAMINHOS
+        if options['caminhos']:
+            caminhos = tuple(caminho.strip() for caminho in options['caminhos'].split(',') if caminho.strip())
+        if not caminhos or any(not caminho.startswith('/') for caminho in caminhos):
+            raise CommandError('Os caminhos devem começar com /')
+        if options['concorrencia'] < 1 or options['requisicoes'] < 1:
+            raise CommandError('Use --concorrencia >= 1 e --requisicoes >= 1')
+
+        anterior = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as arquivo:
+                anterior = json.load(arquivo)
+
+        self.stdout.write(
+            f"{options['requisicoes']} requisições em {options['concorrencia']} conexões contra {options['url']}..."
+        )
+        try:
+            resultado = carga.executar(
+                options['url'],
+                caminhos=caminhos,
+                concorrencia=options['concorrencia'],
+                requisicoes=options['requisicoes'],
+                aquecimento=options['aquecimento'],
+                tempo_limite=options['tempo_limite'],
+                rotulo=options['rotulo'],
+            )
+        except ValueError as erro:
+            raise CommandError(erro)
+
+        self.stdout.write(f"{'caminho':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for nome, dados in resultado['cenarios'].items():
+            self.stdout.write(
+                f"{nome:<28} {dados['p50_ms']:>9.2f} {dados['p95_ms']:>9.2f} "
+                f"{dados['p99_ms']:>9.2f} {dados['por_segundo']:>9.1f}"
+            )
+        if resultado['erros']:
+            texto = ', '.join(f'{tipo}: {quantidade}' for tipo, quantidade in sorted(resultado['erros'].items()))
+            self.stdout.write(self.style.WARNING(f'Erros: {texto}'))
+
+        if anterior:
+            self.stdout.write(f"\nComparação com {options['comparar']} ({anterior.get('servidor') or anterior.get('commit')}):")
+            for nome, variacoes in portal.comparar(anterior, resultado).items():
+                texto = '  '.join(f'{metrica} {variacao:+.1%}' for metrica, variacao in variacoes.items())
+                self.stdout.write(f'{nome:<28} {texto}')
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}"))
@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from noticias.benchmarks import portal
+
+
+class Command(BaseCommand):
+    help = 'Mede p50/p95/p99 e vazão dos caminhos críticos em um banco SQLite de teste semeado'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--noticias', type=int, default=2000, help='Notícias sintéticas semeadas (padrão: 2000)')
+        parser.add_argument('--repeticoes', type=int, default=50, help='Medições por cenário (padrão: 50)')
+        parser.add_argument('--aquecimento', type=int, default=3, help='Execuções descartadas por cenário (padrão: 3)')
+        parser.add_argument(
+            '--cenarios', help=f"Cenários separados por vírgula (padrão: todos: {', '.join(portal.CENARIOS)})",
+        )
+        parser.add_argument(
+            '--com-cache', action='store_true',
+            help='Mantém o cache configurado (padrão: DummyCache, mede a renderização)',
+        )
+        parser.add_argument('--workers', type=int, default=1, help='Processos do atualizar_relevancia_todas (padrão: 1)')
+        parser.add_argument('--semente', type=int, default=42, help='Semente dos dados sintéticos')
+        parser.add_argument('--arquivo-banco', help='Banco de teste em arquivo (padrão: SQLite em memória)')
+        parser.add_argument('--saida', help='Grava o resultado em JSON neste arquivo')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar p50/p95/p99')
+
+    def handle(self, *args, **options):
+        cenarios = portal.CENARIOS
+        if options['cenarios']:
+            cenarios = tuple(nome.strip() for nome in options['cenarios'].split(',') if nome.strip())
+            desconhecidos = set(cenarios) - set(portal.CENARIOS)
+            if desconhecidos:
+                raise CommandError(f"Cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+        if options['noticias'] < 10 or options['repeticoes'] < 1:
+            raise CommandError('Use --noticias >= 10 e --repeticoes >= 1')
+
+        anterior = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as arquivo:
+                anterior = json.load(arquivo)
+
+        self.stdout.write(f"Semeando {options['noticias']} notícias e medindo {len(cenarios)} cenários...")
+        self.stdout.write(f"{'cenário':<28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9}")
+        resultado = portal.executar(
+            noticias=options['noticias'],
+            repeticoes=options['repeticoes'],
+            aquecimento=options['aquecimento'],
+            cenarios=cenarios,
+            com_cache=options['com_cache'],
+            workers=options['workers'],
+            semente=options['semente'],
+            arquivo_banco=options['arquivo_banco'],
+            progresso=self._linha,
+        )
+
+        if anterior:
+            self.stdout.write(f"\nComparação com {options['comparar']} (commit {anterior.get('commit')}):")
+            for nome, variacoes in portal.comparar(anterior, resultado).items():
+                texto = '  '.join(f'{metrica} {variacao:+.1%}' for metrica, variacao in variacoes.items())
+                self.stdout.write(f'{nome:<28} {texto}')
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultado gravado em {options['saida']}"))
+
+    def _linha(self, nome, dados):
+        self.stdout.write(
+            f"{nome:<28} {dados['p50_ms']:>9.2f} {dados['p95_ms']:>9.2f} "
+            f"{dados['p99_ms']:>9.2f} {dados['por_segundo']:>9.1f}"
+        )
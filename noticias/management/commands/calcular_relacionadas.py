@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from noticias import relacionadas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a tabela de notícias relacionadas (TF-IDF das palavras-chave)'
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        pares = relacionadas.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'{pares} pares de notícias relacionadas gravados em {time.perf_counter() - inicio:.2f}s'
+        ))
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from noticias import corpus
+
+
+class Command(BaseCommand):
+    help = 'Gera notícias sintéticas em massa (bulk_create em lotes) para testes de carga e de escala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quantidade', type=int, help='Quantidade de notícias a gerar')
+        parser.add_argument(
+            '--lote', type=int, default=5000,
+            help='Notícias por lote/transação (padrão: 5000)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processos que geram o texto em paralelo (padrão: 1; a gravação fica no processo principal)',
+        )
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (acervo reprodutível)')
+        parser.add_argument(
+            '--freq-palavras', type=float, default=corpus.PARAMETROS_PADRAO['freq_palavras'],
+            help='Fração das notícias com palavras importantes (padrão: %(default)s)',
+        )
+        parser.add_argument(
+            '--freq-tendencias', type=float, default=corpus.PARAMETROS_PADRAO['freq_tendencias'],
+            help='Fração das notícias com um termo de tendência no resumo (padrão: %(default)s)',
+        )
+        parser.add_argument(
+            '--publicadas', type=float, default=corpus.PARAMETROS_PADRAO['fracao_publicadas'],
+            help='Fração das notícias publicadas (padrão: %(default)s)',
+        )
+        parser.add_argument(
+            '--dias', type=int, default=corpus.PARAMETROS_PADRAO['dias'],
+            help='As datas de publicação se espalham pelos últimos N dias (padrão: %(default)s)',
+        )
+
+    def handle(self, *args, **options):
+        if options['quantidade'] < 1 or options['lote'] < 1 or options['workers'] < 1 or options['dias'] < 1:
+            raise CommandError('quantidade, --lote, --workers e --dias devem ser maiores que zero')
+        for opcao in ('freq_palavras', 'freq_tendencias', 'publicadas'):
+            if not 0 <= options[opcao] <= 1:
+                raise CommandError(f"--{opcao.replace('_', '-')} deve estar entre 0 e 1")
+
+        inicio = time.perf_counter()
+
+        def progresso(gravadas, total):
+            decorrido = time.perf_counter() - inicio
+            self.stdout.write(f'{gravadas}/{total} notícias ({gravadas / decorrido:.0f}/s)')
+
+        gravadas = corpus.gerar(
+            options['quantidade'],
+            lote=options['lote'],
+            workers=options['workers'],
+            semente=options['semente'],
+            parametros={
+                'freq_palavras': options['freq_palavras'],
+                'freq_tendencias': options['freq_tendencias'],
+                'fracao_publicadas': options['publicadas'],
+                'dias': options['dias'],
+            },
+            progresso=progresso,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'{gravadas} notícias geradas em {time.perf_counter() - inicio:.1f}s. '
+            'Para calcular relevância, palavras-chave e relacionadas: '
+            'atualizar_relevancia --incremental e calcular_relacionadas'
+        ))
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from noticias.cache import TAG_LISTAS, invalidar, tag_noticia
+from noticias.imagens import atualizar_derivados
+from noticias.models import Noticia
+from noticias.sitemaps import particao, tag_particao
+
+
+class Command(BaseCommand):
+    help = 'Gera as derivadas responsivas (thumb/card/hero em WebP e JPEG) das imagens existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--forcar',
+            action='store_true',
+            help='Regera também as notícias que já têm derivadas da imagem atual',
+        )
+        parser.add_argument(
+            '--noticia-id',
+            type=int,
+            help='Processa apenas uma notícia específica',
+        )
+
+    def handle(self, *args, **options):
+        queryset = Noticia.objects.exclude(imagem='').only('id', 'imagem', 'imagem_derivados', 'data_publicacao')
+        if options['noticia_id']:
+            queryset = queryset.filter(pk=options['noticia_id'])
+            if not queryset.exists():
+                raise CommandError(f"Notícia com ID {options['noticia_id']} não encontrada ou sem imagem")
+
+        geradas = ignoradas = falhas = 0
+        particoes = set()
+        for noticia in queryset.order_by('id').iterator(chunk_size=200):
+            try:
+                if atualizar_derivados(noticia, forcar=options['forcar']):
+                    geradas += 1
+                    # update() não dispara os sinais: invalida como invalidar_cache_noticia
+                    invalidar(tag_noticia(noticia.pk))
+                    particoes.add(tag_particao(*particao(noticia.data_publicacao)))
+                else:
+                    ignoradas += 1
+            except Exception as e:
+                falhas += 1
+                self.stderr.write(f'Notícia {noticia.pk} ({noticia.imagem.name}): {e}')
+
+        if geradas:
+            invalidar(TAG_LISTAS, *particoes)
+        self.stdout.write(self.style.SUCCESS(
+            f'{geradas} imagens processadas, {ignoradas} já atualizadas, {falhas} falhas'
+        ))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from noticias import fila
+
+
+class Command(BaseCommand):
+    help = 'Worker da fila de relevância: calcula o score das notícias salvas no painel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Esvazia a fila e termina, em vez de continuar aguardando novas tarefas',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=50,
+            help='Tarefas reservadas por vez (padrão: 50)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 2)',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        self.stdout.write('Processando fila de relevância...')
+        try:
+            while True:
+                processadas, falhas = fila.processar(options['lote'])
+                total += processadas
+                if processadas or falhas:
+                    self.stdout.write(f'{processadas} processadas, {falhas} falhas')
+                if not processadas and not falhas:
+                    if options['once']:
+                        break
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'{total} notícias processadas'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from noticias import contadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os contadores do painel a partir da tabela de notícias (executar periodicamente)'
+
+    def handle(self, *args, **options):
+        diferencas = contadores.reconciliar()
+        for nome, (antes, depois) in sorted(diferencas.items()):
+            self.stdout.write(f'{nome}: {antes:g} -> {depois:g}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Contadores reconciliados ({len(diferencas)} corrigidos)'
+        ))
@@ -0,0 +1,62 @@
+import os
+import pstats
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from noticias import perfil
+
+
+class Command(BaseCommand):
+    help = 'Agrega os perfis gravados pelo PerfilMiddleware e lista as funções mais caras por view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--diretorio', help='Diretório dos perfis (padrão: PERFIL_DIRETORIO)')
+        parser.add_argument('--view', action='append', help='Só estas views (ex.: noticias.home); repetível')
+        parser.add_argument('--top', type=int, default=20, help='Funções por view (padrão: 20)')
+        parser.add_argument(
+            '--ordenar', choices=('tottime', 'cumulative', 'ncalls'), default='tottime',
+            help='tottime: tempo na própria função; cumulative: incluindo as chamadas (padrão: tottime)',
+        )
+        parser.add_argument('--limpar', action='store_true', help='Apaga os perfis depois do relatório')
+
+    def handle(self, *args, **options):
+        if options['top'] < 1:
+            raise CommandError('--top deve ser maior que zero')
+        por_view = defaultdict(list)
+        for _, arquivo in perfil.arquivos(options['diretorio']):
+            por_view[perfil.view_do_arquivo(arquivo)].append(arquivo)
+        if options['view']:
+            por_view = {view: itens for view, itens in por_view.items() if view in options['view']}
+        if not por_view:
+            self.stdout.write('Nenhum perfil encontrado')
+            return
+
+        # Views com mais tempo total primeiro
+        relatorios = []
+        for view, itens in por_view.items():
+            try:
+                estatisticas = pstats.Stats(*itens)
+            except (OSError, EOFError, TypeError, ValueError) as erro:
+                self.stderr.write(f'{view}: perfis ilegíveis ({erro})')
+                continue
+            relatorios.append((estatisticas.total_tt, view, len(itens), estatisticas))
+
+        for total, view, quantidade, estatisticas in sorted(relatorios, key=lambda item: -item[0]):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view}: {quantidade} requisições, {total / quantidade * 1000:.1f} ms por requisição'
+            ))
+            self.stdout.write(f"{'chamadas':>10} {'própria ms':>11} {'acumulada ms':>13}  função (médias por requisição)")
+            estatisticas.strip_dirs().sort_stats(options['ordenar'])
+            for funcao in estatisticas.fcn_list[:options['top']]:
+                _, chamadas, propria, acumulada, _ = estatisticas.stats[funcao]
+                self.stdout.write(
+                    f'{chamadas / quantidade:>10.1f} {propria / quantidade * 1000:>11.3f} '
+                    f'{acumulada / quantidade * 1000:>13.3f}  {pstats.func_std_string(funcao)}'
+                )
+            self.stdout.write('')
+
+        if options['limpar']:
+            for itens in por_view.values():
+                for arquivo in itens:
+                    os.remove(arquivo)
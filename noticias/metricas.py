@@ -0,0 +1,395 @@
+"""
+Métricas do portal no formato de exposição de texto do Prometheus.
+
+Cada processo acumula contadores e histogramas em memória. Com
+METRICAS_DIRETORIO definido, uma thread grava a cada METRICAS_INTERVALO
+segundos um instantâneo do processo nesse diretório (um arquivo por
+processo), e o /metrics de qualquer worker do gunicorn soma os arquivos de
+todos: os contadores são acumulados desde o início de cada processo, como no
+modo multiprocess do prometheus_client. O diretório deve ser esvaziado ao
+iniciar o servidor. Sem o diretório, /metrics mostra só o processo que atende.
+
+O endpoint só responde a staff, a quem envia `Authorization: Bearer
+<METRICAS_TOKEN>` (bearer_token do Prometheus) ou aos IPs de
+METRICAS_IPS_PERMITIDOS (vazio por padrão). A checagem por IP usa o
+REMOTE_ADDR: atrás de um proxy local (Nginx no mesmo host) toda requisição
+chega de 127.0.0.1, então nesse caso use o token.
+"""
+import atexit
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+import orjson
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_safe
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LIMITES_RELEVANCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+LIMITES_BYTES = (512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+# Métodos fora desta lista viram 'outro' (o rótulo não pode crescer sem limite)
+METODOS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(nomes, valores, extra=None):
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos):
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+
+    def instantaneo(self):
+        """[(rótulos, valor)] copiados sob o lock"""
+        with self._lock:
+            return [(chave, self._copiar(valor)) for chave, valor in self._valores.items()]
+
+    def _copiar(self, valor):
+        return valor
+
+    def limpar(self):
+        self._valores = {}
+        self._lock = threading.Lock()
+
+
+class Contador(Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+        registro.iniciar_gravacao()
+
+    def definir(self, valor, **rotulos):
+        """Para contadores mantidos em outro lugar e copiados no instantâneo (coletores)"""
+        with self._lock:
+            self._valores[self._chave(rotulos)] = valor
+
+    @staticmethod
+    def somar(a, b):
+        return a + b
+
+    def linhas(self, amostras):
+        for chave, valor in amostras:
+            yield f'{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}'
+
+
+class Histograma(Metrica):
+    """Histograma com limites fixos; guarda [contagem por faixa..., excedentes, soma]"""
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=LIMITES_LATENCIA):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(limites)
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        # Faixa `le` é inclusiva: o primeiro limite >= valor
+        faixa = bisect_left(self.limites, valor)
+        with self._lock:
+            dados = self._valores.get(chave)
+            if dados is None:
+                dados = self._valores[chave] = [0] * (len(self.limites) + 1) + [0.0]
+            dados[faixa] += 1
+            dados[-1] += valor
+        registro.iniciar_gravacao()
+
+    def _copiar(self, valor):
+        return list(valor)
+
+    def somar(self, a, b):
+        if len(a) != len(b):
+            # Arquivo de uma versão com outros limites
+            return a
+        return [x + y for x, y in zip(a, b)]
+
+    def linhas(self, amostras):
+        for chave, dados in amostras:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + (float('inf'),), dados[:-1]):
+                acumulado += quantidade
+                rotulo_le = f'le="{_numero(float(limite))}"'
+                yield f'{self.nome}_bucket{_rotulos(self.rotulos, chave, rotulo_le)} {acumulado}'
+            yield f'{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(float(dados[-1]))}'
+            yield f'{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}'
+
+
+class Registro:
+    """Métricas do processo, coletores e a gravação do instantâneo para os outros workers"""
+
+    def __init__(self):
+        self.metricas = {}
+        self.coletores = []
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._arquivo = f'{os.getpid()}-{time.time_ns()}.json'
+        self._gravando = False
+        self._lock = threading.Lock()
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador(nome, ajuda, rotulos))
+
+    def histograma(self, nome, ajuda, rotulos=(), limites=LIMITES_LATENCIA):
+        return self._registrar(Histograma(nome, ajuda, rotulos, limites))
+
+    def _registrar(self, metrica):
+        self.metricas[metrica.nome] = metrica
+        return metrica
+
+    def coletor(self, funcao):
+        """Registra uma função chamada antes de cada instantâneo (decorator)"""
+        self.coletores.append(funcao)
+        return funcao
+
+    def instantaneo(self):
+        for coletor in self.coletores:
+            coletor()
+        return {nome: metrica.instantaneo() for nome, metrica in self.metricas.items()}
+
+    def _diretorio(self):
+        diretorio = getattr(settings, 'METRICAS_DIRETORIO', None)
+        return str(diretorio) if diretorio else None
+
+    def gravar(self):
+        diretorio = self._diretorio()
+        if not diretorio:
+            return
+        os.makedirs(diretorio, exist_ok=True)
+        caminho = os.path.join(diretorio, self._arquivo)
+        temporario = f'{caminho}.tmp'
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(orjson.dumps(self.instantaneo()))
+        # Troca atômica: quem lê nunca vê um arquivo pela metade
+        os.replace(temporario, caminho)
+
+    def iniciar_gravacao(self):
+        """Inicia (uma vez por processo) a thread que grava o instantâneo periodicamente"""
+        if self._gravando:
+            return
+        with self._lock:
+            if self._gravando or not self._diretorio():
+                return
+            self._gravando = True
+        intervalo = getattr(settings, 'METRICAS_INTERVALO', 5)
+
+        def executar():
+            while True:
+                time.sleep(intervalo)
+                try:
+                    self.gravar()
+                except OSError as e:
+                    print(f"Erro ao gravar métricas: {e}")
+
+        threading.Thread(target=executar, name='gravar-metricas', daemon=True).start()
+
+    def combinado(self):
+        """Instantâneo deste processo somado aos arquivos dos demais"""
+        total = {nome: dict(amostras) for nome, amostras in self.instantaneo().items()}
+        diretorio = self._diretorio()
+        if not diretorio:
+            return total
+        try:
+            nomes = [nome for nome in os.listdir(diretorio) if nome.endswith('.json') and nome != self._arquivo]
+        except FileNotFoundError:
+            return total
+        for nome in nomes:
+            try:
+                with open(os.path.join(diretorio, nome), 'rb') as arquivo:
+                    dados = orjson.loads(arquivo.read())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+            for nome_metrica, amostras in dados.items():
+                metrica = self.metricas.get(nome_metrica)
+                if metrica is None:
+                    continue
+                valores = total.setdefault(nome_metrica, {})
+                for chave, valor in amostras:
+                    chave = tuple(chave)
+                    valores[chave] = metrica.somar(valores[chave], valor) if chave in valores else valor
+        return total
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus"""
+        linhas = []
+        for nome, amostras in self.combinado().items():
+            metrica = self.metricas[nome]
+            linhas.append(f'# HELP {nome} {metrica.ajuda}')
+            linhas.append(f'# TYPE {nome} {metrica.tipo}')
+            linhas.extend(metrica.linhas(sorted(amostras.items())))
+        return '\n'.join(linhas) + '\n'
+
+    def _apos_fork(self):
+        # O filho começa zerado, com arquivo e thread próprios (o pai continua contando os seus)
+        for metrica in self.metricas.values():
+            metrica.limpar()
+        self._reiniciar()
+
+
+registro = Registro()
+
+REQUISICOES = registro.contador(
+    'portal_requisicoes_total', 'Requisições atendidas por view, método e status',
+    ('view', 'metodo', 'status'),
+)
+LATENCIA = registro.histograma(
+    'portal_requisicao_duracao_segundos', 'Duração das requisições por view', ('view',),
+)
+TAMANHO_RESPOSTA = registro.histograma(
+    'portal_resposta_bytes', 'Tamanho do corpo das respostas (sem streaming) por view', ('view',),
+    limites=LIMITES_BYTES,
+)
+CONSULTAS = registro.contador(
+    'portal_consultas_sql_total', 'Consultas SQL executadas durante as requisições, por view e banco',
+    ('view', 'banco'),
+)
+RELEVANCIA = registro.histograma(
+    'portal_relevancia_duracao_segundos', 'Duração de RelevanciaService.calcular_relevancia',
+    limites=LIMITES_RELEVANCIA,
+)
+TENDENCIAS_CACHE = registro.contador(
+    'portal_tendencias_cache_total', 'Consultas ao cache de tendências (hit, miss) e atualizações',
+    ('resultado',),
+)
+
+
+@registro.coletor
+def _coletar_tendencias():
+    from . import tendencias
+
+    # Não cria a loja: um processo que nunca calculou relevância não tem o que reportar
+    loja = tendencias._loja
+    if loja is None:
+        return
+    estatisticas = loja.estatisticas()
+    for resultado in ('hits', 'misses', 'atualizacoes', 'erros'):
+        TENDENCIAS_CACHE.definir(estatisticas[resultado], resultado=resultado)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registro._apos_fork)
+
+
+@atexit.register
+def _gravar_ao_sair():
+    if registro._gravando:
+        try:
+            registro.gravar()
+        except OSError:
+            pass
+
+
+# Consultas SQL por banco da requisição em andamento (por thread/tarefa)
+_consultas = ContextVar('noticias_metricas_consultas', default=None)
+_lock_consultas = threading.Lock()
+
+
+def _contar_consulta(execute, sql, params, many, context):
+    """execute_wrapper que só conta (custo mínimo em todas as requisições)"""
+    por_banco = _consultas.get()
+    if por_banco is not None:
+        alias = context['connection'].alias
+        with _lock_consultas:
+            por_banco[alias] = por_banco.get(alias, 0) + 1
+    return execute(sql, params, many, context)
+
+
+class MetricasMiddleware:
+    """Latência, status, tamanho e consultas SQL de todas as requisições (primeiro em MIDDLEWARE)"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from .instrumentacao import observar_consultas
+
+        self.get_response = get_response
+        observar_consultas(_contar_consulta)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        token = _consultas.set({})
+        try:
+            response = self.get_response(request)
+        finally:
+            por_banco = _consultas.get()
+            _consultas.reset(token)
+        self.registrar(request, response, time.perf_counter() - inicio, por_banco)
+        return response
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        token = _consultas.set({})
+        try:
+            response = await self.get_response(request)
+        finally:
+            por_banco = _consultas.get()
+            _consultas.reset(token)
+        self.registrar(request, response, time.perf_counter() - inicio, por_banco)
+        return response
+
+    def registrar(self, request, response, duracao, por_banco):
+        correspondencia = getattr(request, 'resolver_match', None)
+        view = correspondencia.view_name if correspondencia else 'nao_resolvida'
+        metodo = request.method if request.method in METODOS else 'outro'
+        REQUISICOES.inc(view=view, metodo=metodo, status=response.status_code)
+        LATENCIA.observar(duracao, view=view)
+        if not response.streaming:
+            TAMANHO_RESPOSTA.observar(len(response.content), view=view)
+        for banco, quantidade in por_banco.items():
+            CONSULTAS.inc(quantidade, view=view, banco=banco)
+
+
+def _permitido(request):
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return True
+    if request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICAS_IPS_PERMITIDOS', ()):
+        return True
+    usuario = getattr(request, 'user', None)
+    return bool(usuario and usuario.is_staff)
+
+
+@require_safe
+def metricas(request):
+    """/metrics para o Prometheus (staff, METRICAS_TOKEN ou IPs permitidos)"""
+    if not _permitido(request):
+        return HttpResponseForbidden('Acesso restrito')
+    response = HttpResponse(registro.exportar(), content_type=CONTENT_TYPE)
+    response['Cache-Control'] = 'no-store'
+    return response
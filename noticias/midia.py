@@ -0,0 +1,198 @@
+import mimetypes
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+TAMANHO_BLOCO = 64 * 1024
+UM_ANO = 60 * 60 * 24 * 365
+
+# Só as derivadas levam o hash do conteúdo no nome (foto-png-card.1a2b3c4d5e6f.webp,
+# veja imagens.caminho_derivada); os uploads podem ser substituídos sob o mesmo nome
+PADRAO_IMUTAVEL = r'(?:^|/)derivados/[^/]+\.[0-9a-f]{12}\.[a-z]+$'
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class CacheStat:
+    """Cache LRU de os.stat() com validade curta, compartilhado pelas threads do processo"""
+
+    def __init__(self, ttl=60, maximo=2048):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, caminho):
+        """(tamanho, mtime_ns) do arquivo regular ou None se não existir"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(caminho)
+            if item and item[0] > agora:
+                self._itens.move_to_end(caminho)
+                return item[1]
+
+        try:
+            st = os.stat(caminho)
+            dados = (st.st_size, st.st_mtime_ns) if stat.S_ISREG(st.st_mode) else None
+        except OSError:
+            dados = None
+
+        with self._lock:
+            self._itens[caminho] = (agora + self.ttl, dados)
+            self._itens.move_to_end(caminho)
+            while len(self._itens) > self.maximo:
+                self._itens.popitem(last=False)
+        return dados
+
+    def esquecer(self, caminho):
+        with self._lock:
+            self._itens.pop(caminho, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+cache_stat = CacheStat(ttl=getattr(settings, 'MIDIA_STAT_TTL', 60))
+
+
+def _intervalo(cabecalho, tamanho):
+    """(inicio, fim) inclusivo de um Range de intervalo único.
+
+    Retorna None para ignorar o cabeçalho (resposta completa) e False se o
+    intervalo não puder ser atendido (416).
+    """
+    correspondencia = _RANGE.match(cabecalho.strip())
+    if not correspondencia:
+        # Vários intervalos ou unidade desconhecida: a RFC 9110 permite responder 200
+        return None
+    inicio, fim = correspondencia.groups()
+    if not inicio:
+        if not fim:
+            return None
+        # bytes=-500: os últimos 500 bytes
+        sufixo = int(fim)
+        if not sufixo:
+            return False
+        return max(0, tamanho - sufixo), tamanho - 1
+    inicio = int(inicio)
+    fim = min(int(fim), tamanho - 1) if fim else tamanho - 1
+    if inicio >= tamanho or fim < inicio:
+        return False
+    return inicio, fim
+
+
+def _tipo_conteudo(caminho):
+    tipo, codificacao = mimetypes.guess_type(caminho)
+    if codificacao:
+        # Como no FileResponse: foto.svg.gz é servido como gzip, sem Content-Encoding
+        return {'gzip': 'application/gzip', 'br': 'application/x-brotli'}.get(codificacao, 'application/octet-stream')
+    return tipo or 'application/octet-stream'
+
+
+def _ler(arquivo, inicio, quantidade):
+    with arquivo:
+        arquivo.seek(inicio)
+        while quantidade > 0:
+            bloco = arquivo.read(min(TAMANHO_BLOCO, quantidade))
+            if not bloco:
+                break
+            quantidade -= len(bloco)
+            yield bloco
+
+
+def _cache_control(caminho_relativo):
+    padrao = getattr(settings, 'MIDIA_PADRAO_IMUTAVEL', PADRAO_IMUTAVEL)
+    if padrao and re.search(padrao, caminho_relativo):
+        return f'public, max-age={UM_ANO}, immutable'
+    return f"public, max-age={getattr(settings, 'MIDIA_MAX_AGE', 60 * 60 * 24)}"
+
+
+@require_safe
+def servir_midia(request, path, document_root=None):
+    """Serve arquivos de MEDIA_ROOT em produção.
+
+    Responde 304/412 pelas condições de ETag e Last-Modified, atende Range de
+    um intervalo e, com MIDIA_OFFLOAD = 'x-accel-redirect' ou 'x-sendfile',
+    deixa o envio do corpo para o Nginx/Apache em vez do worker Python.
+    """
+    document_root = str(document_root or settings.MEDIA_ROOT)
+    try:
+        caminho = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404('Arquivo não encontrado')
+    dados = cache_stat.obter(caminho)
+    if dados is None:
+        raise Http404('Arquivo não encontrado')
+    tamanho, mtime_ns = dados
+
+    etag = f'"{mtime_ns:x}-{tamanho:x}"'
+    ultima_modificacao = mtime_ns // 1_000_000_000
+    resposta_condicional = get_conditional_response(
+        request, etag=etag, last_modified=ultima_modificacao,
+    )
+    if resposta_condicional is not None:
+        if resposta_condicional.status_code == 304:
+            resposta_condicional['ETag'] = etag
+            resposta_condicional['Last-Modified'] = http_date(ultima_modificacao)
+        resposta_condicional['Cache-Control'] = _cache_control(path)
+        return resposta_condicional
+
+    tipo = _tipo_conteudo(caminho)
+    offload = getattr(settings, 'MIDIA_OFFLOAD', None)
+    intervalo = None
+    if request.headers.get('Range') and not offload:
+        if_range = request.headers.get('If-Range')
+        # If-Range: só atende o intervalo se o arquivo não mudou desde a primeira parte
+        if not if_range or if_range == etag or parse_http_date_safe(if_range) == ultima_modificacao:
+            intervalo = _intervalo(request.headers['Range'], tamanho)
+
+    if intervalo is False:
+        resposta = HttpResponse(status=416)
+        resposta['Content-Range'] = f'bytes */{tamanho}'
+        return resposta
+
+    if offload or request.method == 'HEAD':
+        resposta = HttpResponse(content_type=tipo)
+        if offload == 'x-accel-redirect':
+            # Location "internal" do Nginx que aponta para MEDIA_ROOT
+            prefixo = getattr(settings, 'MIDIA_ACCEL_PREFIXO', '/_midia/')
+            resposta['X-Accel-Redirect'] = prefixo + quote(path)
+        elif offload == 'x-sendfile':
+            resposta['X-Sendfile'] = caminho
+        else:
+            resposta['Content-Length'] = str(tamanho)
+    else:
+        try:
+            arquivo = open(caminho, 'rb')
+        except OSError:
+            cache_stat.esquecer(caminho)
+            raise Http404('Arquivo não encontrado')
+        if intervalo:
+            inicio, fim = intervalo
+            resposta = StreamingHttpResponse(
+                _ler(arquivo, inicio, fim - inicio + 1), status=206, content_type=tipo,
+            )
+            resposta['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+            resposta['Content-Length'] = str(fim - inicio + 1)
+        else:
+            # FileResponse usa o wsgi.file_wrapper do servidor (sendfile no gunicorn)
+            resposta = FileResponse(arquivo, content_type=tipo)
+
+    resposta['ETag'] = etag
+    resposta['Last-Modified'] = http_date(ultima_modificacao)
+    resposta['Cache-Control'] = _cache_control(path)
+    resposta['Accept-Ranges'] = 'bytes'
+    return resposta
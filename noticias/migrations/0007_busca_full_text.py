@@ -0,0 +1,113 @@
+# Generated manually to add the full-text search index
+
+from django.db import migrations
+
+# SQL fixo desta migração: noticias/busca.py tem uma cópia (para recriar os
+# triggers depois de outras migrações) que pode mudar sem afetar o histórico
+
+# SQLite: tabela FTS5 de conteúdo externo, sem acentos, sincronizada por triggers
+SQLITE_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS noticias_noticia_fts USING fts5(
+        titulo, resumo, conteudo,
+        content='noticias_noticia', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_ai AFTER INSERT ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_ad AFTER DELETE ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(noticias_noticia_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS noticias_noticia_fts_au
+    AFTER UPDATE OF titulo, resumo, conteudo ON noticias_noticia BEGIN
+        INSERT INTO noticias_noticia_fts(noticias_noticia_fts, rowid, titulo, resumo, conteudo)
+        VALUES ('delete', old.id, old.titulo, old.resumo, old.conteudo);
+        INSERT INTO noticias_noticia_fts(rowid, titulo, resumo, conteudo)
+        VALUES (new.id, new.titulo, new.resumo, new.conteudo);
+    END
+    """,
+    "INSERT INTO noticias_noticia_fts(noticias_noticia_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REMOVER = [
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_ai",
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_ad",
+    "DROP TRIGGER IF EXISTS noticias_noticia_fts_au",
+    "DROP TABLE IF EXISTS noticias_noticia_fts",
+]
+
+# PostgreSQL: configuração portuguesa sem acentos, coluna tsvector ponderada e índice GIN
+POSTGRES_CRIAR = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE noticias_noticia ADD COLUMN IF NOT EXISTS busca_vetor tsvector",
+    """
+    CREATE OR REPLACE FUNCTION noticias_noticia_busca_vetor() RETURNS trigger AS $$
+    BEGIN
+        NEW.busca_vetor :=
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.titulo, '')), 'A') ||
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.resumo, '')), 'B') ||
+            setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.conteudo, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER noticias_noticia_busca_vetor_tg
+    BEFORE INSERT OR UPDATE OF titulo, resumo, conteudo ON noticias_noticia
+    FOR EACH ROW EXECUTE FUNCTION noticias_noticia_busca_vetor()
+    """,
+    "UPDATE noticias_noticia SET titulo = titulo",
+    """
+    CREATE INDEX IF NOT EXISTS noticias_noticia_busca_vetor_gin
+    ON noticias_noticia USING GIN (busca_vetor)
+    """,
+]
+
+POSTGRES_REMOVER = [
+    "DROP TRIGGER IF EXISTS noticias_noticia_busca_vetor_tg ON noticias_noticia",
+    "DROP FUNCTION IF EXISTS noticias_noticia_busca_vetor()",
+    "DROP INDEX IF EXISTS noticias_noticia_busca_vetor_gin",
+    "ALTER TABLE noticias_noticia DROP COLUMN IF EXISTS busca_vetor",
+]
+
+
+def _executar(schema_editor, comandos):
+    for sql in comandos.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=None)
+
+
+def criar_indice_busca(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE_CRIAR, 'postgresql': POSTGRES_CRIAR})
+
+
+def remover_indice_busca(apps, schema_editor):
+    _executar(schema_editor, {'sqlite': SQLITE_REMOVER, 'postgresql': POSTGRES_REMOVER})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0006_remove_categoria_field'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice_busca, remover_indice_busca),
+    ]
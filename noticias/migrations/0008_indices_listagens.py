@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0007_busca_full_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['publicada', 'data_publicacao'], name='noticia_pub_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['publicada', 'destaque', 'data_publicacao'], name='noticia_pub_dest_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['publicada', 'relevancia_score', 'data_publicacao'], name='noticia_pub_relev_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['data_publicacao'], name='noticia_data_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0008_indices_listagens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, max_length=40, verbose_name='Hash do Conteúdo'),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='relevancia_calculada_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Relevância Calculada em'),
+        ),
+        migrations.AddField(
+            model_name='noticia',
+            name='relevancia_pendente',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Relevância Pendente'),
+        ),
+    ]
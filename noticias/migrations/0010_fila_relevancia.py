@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0009_relevancia_incremental'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaRelevancia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('solicitada_em', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Solicitada em')),
+                ('reservada_ate', models.DateTimeField(blank=True, null=True, verbose_name='Reservada até')),
+                ('tentativas', models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')),
+                ('erro', models.TextField(blank=True, verbose_name='Último erro')),
+                ('noticia', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tarefa_relevancia', to='noticias.noticia')),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Relevância',
+                'verbose_name_plural': 'Tarefas de Relevância',
+                'ordering': ['solicitada_em'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0010_fila_relevancia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='imagem_derivados',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Derivadas da Imagem'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0011_imagem_derivados'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='noticia',
+            name='noticia_pub_data_idx',
+        ),
+        migrations.AddIndex(
+            model_name='noticia',
+            index=models.Index(fields=['publicada', 'data_publicacao', 'id'], name='noticia_pub_data_id_idx'),
+        ),
+    ]
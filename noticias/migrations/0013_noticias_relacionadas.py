@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0012_indice_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticiaRelacionada',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('similaridade', models.FloatField(verbose_name='Similaridade')),
+                ('posicao', models.PositiveSmallIntegerField(verbose_name='Posição')),
+                ('destino', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionada_a', to='noticias.noticia')),
+                ('origem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionadas', to='noticias.noticia')),
+            ],
+            options={
+                'verbose_name': 'Notícia Relacionada',
+                'verbose_name_plural': 'Notícias Relacionadas',
+                'ordering': ['origem', 'posicao'],
+                'indexes': [models.Index(fields=['origem', 'posicao'], name='relacionada_origem_pos_idx')],
+                'constraints': [models.UniqueConstraint(fields=('origem', 'destino'), name='relacionada_origem_destino_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def marcar_pendentes(apps, schema_editor):
+    # A extração mudou: o próximo atualizar_relevancia --incremental
+    # recalcula todas as notícias e preenche a nova tabela
+    Noticia = apps.get_model('noticias', 'Noticia')
+    Noticia.objects.update(relevancia_pendente=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0013_noticias_relacionadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PalavraChave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('radical', models.CharField(max_length=100, unique=True, verbose_name='Radical')),
+                ('rotulo', models.CharField(max_length=100, verbose_name='Rótulo')),
+            ],
+            options={
+                'verbose_name': 'Palavra-chave',
+                'verbose_name_plural': 'Palavras-chave',
+                'ordering': ['rotulo'],
+            },
+        ),
+        migrations.CreateModel(
+            name='NoticiaPalavraChave',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('peso', models.FloatField(verbose_name='Peso')),
+                ('noticia', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='palavras', to='noticias.noticia')),
+                ('palavra', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='noticias', to='noticias.palavrachave')),
+            ],
+            options={
+                'verbose_name': 'Palavra-chave da Notícia',
+                'verbose_name_plural': 'Palavras-chave das Notícias',
+                'ordering': ['-peso'],
+                'constraints': [models.UniqueConstraint(fields=('palavra', 'noticia'), name='palavra_noticia_uniq')],
+            },
+        ),
+        migrations.RunPython(marcar_pendentes, migrations.RunPython.noop),
+    ]
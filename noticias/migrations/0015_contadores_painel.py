@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0014_palavras_chave_normalizadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorPainel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=50, unique=True, verbose_name='Nome')),
+                ('valor', models.FloatField(default=0, verbose_name='Valor')),
+            ],
+            options={
+                'verbose_name': 'Contador do Painel',
+                'verbose_name_plural': 'Contadores do Painel',
+                'ordering': ['nome'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def preencher_data_atualizacao(apps, schema_editor):
+    # Sem histórico de edições: parte da data de criação
+    Noticia = apps.get_model('noticias', 'Noticia')
+    Noticia.objects.update(data_atualizacao=F('data_criacao'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0015_contadores_painel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='noticia',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Data de Atualização'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(preencher_data_atualizacao, migrations.RunPython.noop),
+    ]
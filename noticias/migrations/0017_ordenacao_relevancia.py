@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('noticias', '0016_data_atualizacao'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='noticia',
+            options={'ordering': ['-relevancia_score', '-data_publicacao'], 'verbose_name': 'Notícia', 'verbose_name_plural': 'Notícias'},
+        ),
+    ]
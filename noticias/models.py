@@ -1,18 +1,56 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import F, Q
 from django.urls import reverse
 from django.utils import timezone
 
+
+# Campos cuja alteração conta como atualização da notícia (data_atualizacao)
+CAMPOS_EDITORIAIS = frozenset({'titulo', 'resumo', 'conteudo', 'imagem'})
+
+
+class NoticiaQuerySet(models.QuerySet):
+    def publicadas(self):
+        return self.filter(publicada=True)
+
+    def cards(self):
+        """Projeção para listagens: não carrega os campos de texto longos"""
+        return self.defer('conteudo', 'palavras_chave')
+
+    def pendentes_relevancia(self, agora=None):
+        """Notícias cujo texto mudou ou cuja faixa temporal virou desde o último cálculo"""
+        from .services import FAIXAS_TEMPORAIS
+
+        agora = agora or timezone.now()
+        condicao = Q(relevancia_pendente=True) | Q(relevancia_calculada_em__isnull=True)
+        for dias, _ in FAIXAS_TEMPORAIS:
+            # O limite data_publicacao + dias caiu entre o último cálculo e agora
+            limite = timedelta(days=dias)
+            condicao |= Q(
+                data_publicacao__lte=agora - limite,
+                data_publicacao__gt=F('relevancia_calculada_em') - limite,
+            )
+        return self.filter(condicao)
+
+
 class Noticia(models.Model):
     titulo = models.CharField(max_length=200, verbose_name='Título')
     resumo = models.TextField(max_length=500, verbose_name='Resumo')
     conteudo = models.TextField(verbose_name='Conteúdo')
     imagem = models.ImageField(upload_to='noticias/', verbose_name='Imagem da Notícia', blank=False, null=False)
+    imagem_derivados = models.JSONField(default=dict, blank=True, editable=False, verbose_name='Derivadas da Imagem')
     destaque = models.BooleanField(default=False, verbose_name='Notícia em Destaque')
     relevancia_score = models.FloatField(default=0.0, verbose_name='Score de Relevância')
     palavras_chave = models.TextField(blank=True, verbose_name='Palavras-chave Extraídas')
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name='Data de Criação')
     data_publicacao = models.DateTimeField(default=timezone.now, verbose_name='Data de Publicação')
+    data_atualizacao = models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data de Atualização')
     publicada = models.BooleanField(default=True, verbose_name='Publicada')
+    hash_conteudo = models.CharField(max_length=40, blank=True, editable=False, verbose_name='Hash do Conteúdo')
+    relevancia_pendente = models.BooleanField(default=True, editable=False, verbose_name='Relevância Pendente')
+    relevancia_calculada_em = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='Relevância Calculada em')
+
+    objects = NoticiaQuerySet.as_manager()
 
     def __str__(self):
         return self.titulo
@@ -20,16 +58,46 @@ class Noticia(models.Model):
     def get_absolute_url(self):
         return reverse('noticias:noticia_detalhe', args=[str(self.id)])
 
+    def save(self, *args, **kwargs):
+        # Marca a relevância como pendente quando o texto muda fora do cálculo
+        update_fields = kwargs.get('update_fields')
+        campos_texto = {'titulo', 'resumo', 'conteudo'}
+        if update_fields is None or campos_texto & set(update_fields):
+            if self.calcular_hash_conteudo() != self.hash_conteudo and not self.relevancia_pendente:
+                self.relevancia_pendente = True
+                if update_fields is not None:
+                    update_fields = set(update_fields) | {'relevancia_pendente'}
+        if update_fields:
+            # auto_now só é gravado se estiver em update_fields: entra apenas em
+            # edições do conteúdo, para não mudar lastmod e ETags à toa
+            if CAMPOS_EDITORIAIS & set(update_fields):
+                update_fields = set(update_fields) | {'data_atualizacao'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def calcular_hash_conteudo(self):
+        from .services import hash_conteudo
+        return hash_conteudo(self.titulo, self.resumo, self.conteudo)
+
     def calcular_relevancia(self):
         """Calcula automaticamente a relevância da notícia"""
-        from .services import RelevanciaService
+        from .palavras import formatar, gravar
+        from .services import CAMPOS_RELEVANCIA, RelevanciaService
         service = RelevanciaService()
         self.relevancia_score = service.calcular_relevancia(self)
-        self.palavras_chave = service.extrair_palavras_chave(self)
+        termos = service.extrair_termos(self)
+        self.palavras_chave = formatar(termos)
         
         # Marca como destaque se score > 7.0
         self.destaque = self.relevancia_score >= 7.0
-        self.save()
+        self.hash_conteudo = self.calcular_hash_conteudo()
+        self.relevancia_pendente = False
+        self.relevancia_calculada_em = timezone.now()
+        with transaction.atomic():
+            # Palavras-chave antes do save: o post_save invalida as páginas que as exibem
+            gravar({self.pk: termos})
+            # Grava só os campos de relevância para não sobrescrever edições concorrentes
+            self.save(update_fields=CAMPOS_RELEVANCIA)
 
     @property
     def tempo_atras(self):
@@ -52,3 +120,96 @@ class Noticia(models.Model):
         verbose_name = 'Notícia'
         verbose_name_plural = 'Notícias'
         ordering = ['-relevancia_score', '-data_publicacao']
+        indexes = [
+            # Caminhos de acesso das listagens públicas e do painel
+            # Inclui o id para a paginação por cursor (noticias/paginacao.py)
+            models.Index(fields=['publicada', 'data_publicacao', 'id'], name='noticia_pub_data_id_idx'),
+            models.Index(fields=['publicada', 'destaque', 'data_publicacao'], name='noticia_pub_dest_data_idx'),
+            models.Index(fields=['publicada', 'relevancia_score', 'data_publicacao'], name='noticia_pub_relev_idx'),
+            models.Index(fields=['data_publicacao'], name='noticia_data_idx'),
+        ]
+
+
+class TarefaRelevancia(models.Model):
+    """Recálculo de relevância pendente (uma tarefa por notícia; veja noticias/fila.py)"""
+    noticia = models.OneToOneField(Noticia, on_delete=models.CASCADE, related_name='tarefa_relevancia')
+    solicitada_em = models.DateTimeField(default=timezone.now, db_index=True, verbose_name='Solicitada em')
+    reservada_ate = models.DateTimeField(null=True, blank=True, verbose_name='Reservada até')
+    tentativas = models.PositiveSmallIntegerField(default=0, verbose_name='Tentativas')
+    erro = models.TextField(blank=True, verbose_name='Último erro')
+
+    def __str__(self):
+        return f'Relevância de #{self.noticia_id}'
+
+    class Meta:
+        verbose_name = 'Tarefa de Relevância'
+        verbose_name_plural = 'Tarefas de Relevância'
+        ordering = ['solicitada_em']
+
+
+class NoticiaRelacionada(models.Model):
+    """Vizinhos mais próximos de cada notícia por palavras-chave (veja noticias/relacionadas.py)"""
+    origem = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='relacionadas')
+    destino = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='relacionada_a')
+    similaridade = models.FloatField(verbose_name='Similaridade')
+    posicao = models.PositiveSmallIntegerField(verbose_name='Posição')
+
+    def __str__(self):
+        return f'#{self.origem_id} -> #{self.destino_id} ({self.similaridade:.2f})'
+
+    class Meta:
+        verbose_name = 'Notícia Relacionada'
+        verbose_name_plural = 'Notícias Relacionadas'
+        ordering = ['origem', 'posicao']
+        constraints = [
+            models.UniqueConstraint(fields=['origem', 'destino'], name='relacionada_origem_destino_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['origem', 'posicao'], name='relacionada_origem_pos_idx'),
+        ]
+
+
+class PalavraChave(models.Model):
+    """Palavra-chave normalizada (radical sem acento e sem plural; veja noticias/palavras.py)"""
+    radical = models.CharField(max_length=100, unique=True, verbose_name='Radical')
+    rotulo = models.CharField(max_length=100, verbose_name='Rótulo')
+
+    def __str__(self):
+        return self.rotulo
+
+    class Meta:
+        verbose_name = 'Palavra-chave'
+        verbose_name_plural = 'Palavras-chave'
+        ordering = ['rotulo']
+
+
+class NoticiaPalavraChave(models.Model):
+    noticia = models.ForeignKey(Noticia, on_delete=models.CASCADE, related_name='palavras')
+    palavra = models.ForeignKey(PalavraChave, on_delete=models.CASCADE, related_name='noticias')
+    peso = models.FloatField(verbose_name='Peso')
+
+    def __str__(self):
+        return f'#{self.noticia_id} {self.palavra_id} ({self.peso:.2f})'
+
+    class Meta:
+        verbose_name = 'Palavra-chave da Notícia'
+        verbose_name_plural = 'Palavras-chave das Notícias'
+        ordering = ['-peso']
+        constraints = [
+            # Também é o índice do filtro por palavra (palavra -> notícias)
+            models.UniqueConstraint(fields=['palavra', 'noticia'], name='palavra_noticia_uniq'),
+        ]
+
+
+class ContadorPainel(models.Model):
+    """Estatística materializada do painel (veja noticias/contadores.py)"""
+    nome = models.CharField(max_length=50, unique=True, verbose_name='Nome')
+    valor = models.FloatField(default=0, verbose_name='Valor')
+
+    def __str__(self):
+        return f'{self.nome} = {self.valor:g}'
+
+    class Meta:
+        verbose_name = 'Contador do Painel'
+        verbose_name_plural = 'Contadores do Painel'
+        ordering = ['nome']
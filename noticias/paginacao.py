@@ -0,0 +1,136 @@
+import base64
+import binascii
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import Http404
+
+_EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICRO = timedelta(microseconds=1)
+
+# Direções do cursor: depois (página seguinte) e antes (página anterior)
+DEPOIS = 'd'
+ANTES = 'a'
+
+
+def codificar_cursor(direcao, data, pk):
+    """Token opaco para a URL: a posição (data_publicacao, id) e a direção"""
+    bruto = f'{direcao}:{(data - _EPOCA) // _MICRO}:{pk}'.encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip('=')
+
+
+def decodificar_cursor(token):
+    try:
+        bruto = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        direcao, micros, pk = bruto.split(':')
+        if direcao not in (DEPOIS, ANTES):
+            raise ValueError(direcao)
+        return direcao, _EPOCA + int(micros) * _MICRO, int(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error, OverflowError):
+        raise Http404('Cursor de paginação inválido')
+
+
+class PaginaCursor:
+    """Página de uma listagem paginada por cursor (o que o template usa)"""
+
+    def __init__(self, itens, token_proxima, token_anterior, total_aproximado=None):
+        self.itens = itens
+        self.token_proxima = token_proxima
+        self.token_anterior = token_anterior
+        self.total_aproximado = total_aproximado
+
+    @property
+    def tem_proxima(self):
+        return self.token_proxima is not None
+
+    @property
+    def tem_anterior(self):
+        return self.token_anterior is not None
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
+
+
+class PaginadorCursor:
+    """Paginação por keyset em (data_publicacao, id), do mais recente para o mais antigo.
+
+    Cada página é uma leitura de `por_pagina + 1` linhas a partir da posição do
+    cursor no índice (publicada, data_publicacao, id), sem OFFSET nem COUNT(*):
+    a página 5000 custa o mesmo que a primeira.
+    """
+
+    def __init__(self, queryset, por_pagina, contar=False, ttl_contagem=300):
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        self.contar = contar
+        self.ttl_contagem = ttl_contagem
+
+    def _consulta(self, token):
+        """(direção, queryset já ordenado e limitado a por_pagina + 1 linhas)"""
+        queryset = self.queryset
+        direcao = None
+        if token:
+            direcao, data, pk = decodificar_cursor(token)
+            if direcao == DEPOIS:
+                # data <= d restringe a faixa do índice; o OR resolve os empates
+                queryset = queryset.filter(Q(data_publicacao__lt=data) | Q(id__lt=pk), data_publicacao__lte=data)
+            else:
+                queryset = queryset.filter(Q(data_publicacao__gt=data) | Q(id__gt=pk), data_publicacao__gte=data)
+
+        if direcao == ANTES:
+            return direcao, queryset.order_by('data_publicacao', 'id')[:self.por_pagina + 1]
+        return direcao, queryset.order_by('-data_publicacao', '-id')[:self.por_pagina + 1]
+
+    def _montar(self, direcao, itens, total):
+        mais = len(itens) > self.por_pagina
+        if direcao == ANTES:
+            itens = itens[:self.por_pagina][::-1]
+            tem_anterior, tem_proxima = mais, True
+        else:
+            itens = itens[:self.por_pagina]
+            tem_anterior, tem_proxima = direcao == DEPOIS, mais
+
+        token_proxima = token_anterior = None
+        if itens and tem_proxima:
+            token_proxima = codificar_cursor(DEPOIS, itens[-1].data_publicacao, itens[-1].pk)
+        if itens and tem_anterior:
+            token_anterior = codificar_cursor(ANTES, itens[0].data_publicacao, itens[0].pk)
+        return PaginaCursor(itens, token_proxima, token_anterior, total)
+
+    def pagina(self, token=None):
+        direcao, consulta = self._consulta(token)
+        itens = list(consulta)
+        total = self.total_aproximado() if self.contar else None
+        return self._montar(direcao, itens, total)
+
+    async def apagina(self, token=None):
+        """pagina() para views assíncronas"""
+        direcao, consulta = self._consulta(token)
+        itens = [item async for item in consulta.aiterator()]
+        total = await self.atotal_aproximado() if self.contar else None
+        return self._montar(direcao, itens, total)
+
+    def _chave_total(self):
+        return 'paginacao:total:' + hashlib.md5(str(self.queryset.query).encode()).hexdigest()
+
+    def total_aproximado(self):
+        """COUNT(*) guardado em cache por alguns minutos: pode ficar um pouco defasado"""
+        chave = self._chave_total()
+        total = cache.get(chave)
+        if total is None:
+            total = self.queryset.count()
+            cache.set(chave, total, self.ttl_contagem)
+        return total
+
+    async def atotal_aproximado(self):
+        chave = self._chave_total()
+        total = await cache.aget(chave)
+        if total is None:
+            total = await self.queryset.acount()
+            await cache.aset(chave, total, self.ttl_contagem)
+        return total
@@ -0,0 +1,130 @@
+"""
+Extração de palavras-chave e índice normalizado palavra <-> notícia.
+
+As palavras são agrupadas pelo radical (sem acento e sem plural), pesadas pela
+frequência, pelo campo em que aparecem e pela posição da primeira ocorrência,
+e gravadas em PalavraChave/NoticiaPalavraChave. O campo Noticia.palavras_chave
+continua existindo só como cópia legível; o índice full-text (busca.py) não o
+usa: indexa apenas título, resumo e conteúdo.
+"""
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+from django.db import transaction
+
+from .termos import normalizar, radical
+
+LIMITE_PALAVRAS = 10
+TAMANHO_MINIMO = 4
+
+# Peso de cada ocorrência por campo
+PESOS_CAMPOS = (('titulo', 3.0), ('resumo', 2.0), ('conteudo', 1.0))
+
+_PALAVRAS_COMUNS = (
+    'a', 'o', 'e', 'de', 'da', 'do', 'em', 'um', 'uma', 'com', 'para', 'por', 'que', 'se',
+    'não', 'mais', 'como', 'mas', 'foi', 'são', 'está', 'pode', 'ser', 'tem', 'ao', 'ele',
+    'das', 'à', 'seu', 'sua', 'ou', 'quando', 'muito', 'nos', 'já', 'eu', 'também', 'só',
+    'pelo', 'pela', 'até', 'isso', 'ela', 'entre', 'era', 'depois', 'sem', 'mesmo', 'aos',
+    'ter', 'seus', 'suas', 'minha', 'têm', 'naquele', 'neles', 'estavam', 'fosse', 'nessa',
+    'nesses', 'numa', 'disso', 'aquela', 'àquela', 'estivessem', 'fossem', 'estivesse',
+    'tivesse', 'tivessem', 'houvesse', 'houvessem', 'houver', 'haver', 'haveria',
+    'haveriam', 'haja', 'hajam', 'tenha', 'tenham', 'terei', 'terá', 'terão', 'teria',
+    'teriam', 'quero', 'quer', 'querem', 'queria', 'queriam', 'deseje', 'deseja', 'desejem',
+    'desejaria', 'desejariam', 'preciso', 'precisa', 'precisam', 'precisaria',
+    'precisariam', 'gostaria', 'gostariam', 'gosto', 'gosta', 'gostam', 'adoro', 'adora',
+    'adoram', 'adoraria', 'adorariam', 'detesto', 'detesta', 'detestam', 'detestaria',
+    'detestariam', 'odeio', 'odeia', 'odeiam', 'odearia', 'odeariam', 'amo', 'ama', 'amam',
+    'amaria', 'amariam',
+    # Palavras funcionais frequentes em texto jornalístico
+    'este', 'esta', 'estes', 'estas', 'esse', 'essa', 'esses', 'essas', 'aquele', 'aqueles',
+    'aquelas', 'isto', 'aquilo', 'onde', 'qual', 'quais', 'quem', 'cada', 'outro', 'outra',
+    'outros', 'outras', 'todo', 'toda', 'todos', 'todas', 'sobre', 'desde', 'contra', 'após',
+    'ainda', 'assim', 'então', 'porque', 'pois', 'segundo', 'durante', 'além', 'apenas',
+    'sempre', 'nunca', 'foram', 'será', 'seria', 'sendo', 'estão', 'estava',
+    'estar', 'tinha', 'tinham', 'fazer', 'feito', 'faz', 'disse', 'afirmou', 'nesta', 'neste',
+    'desta', 'deste', 'dessa', 'desse', 'pelos', 'pelas', 'num', 'nas', 'nós',
+    'eles', 'elas', 'lhe', 'lhes', 'muitos', 'muitas', 'pouco', 'bem', 'vez', 'vezes',
+    'ano', 'anos', 'dia', 'dias', 'hoje', 'ontem', 'agora',
+)
+
+# Comparadas já normalizadas (sem acento), como as palavras do texto
+STOPWORDS = frozenset(normalizar(palavra) for palavra in _PALAVRAS_COMUNS)
+
+_PALAVRA = re.compile(r'\w+')
+
+
+@lru_cache(maxsize=50000)
+def _radical(palavra):
+    """Radical da palavra em minúsculas; None se ela não serve como palavra-chave"""
+    normalizada = normalizar(palavra)
+    if not TAMANHO_MINIMO <= len(normalizada) <= 100 or normalizada in STOPWORDS or normalizada.isdigit():
+        return None
+    return radical(normalizada)
+
+
+def extrair(noticia, limite=LIMITE_PALAVRAS):
+    """[(radical, rótulo, peso)] das palavras-chave, do maior peso para o menor.
+
+    O peso soma as ocorrências ponderadas pelo campo e é multiplicado por até
+    2x conforme a primeira ocorrência aparece cedo no texto; o maior peso vale 1.
+    """
+    pesos = defaultdict(float)
+    primeira = {}
+    formas = defaultdict(Counter)
+    posicao = 0
+    for campo, peso_campo in PESOS_CAMPOS:
+        for palavra in _PALAVRA.findall((getattr(noticia, campo, '') or '').lower()):
+            chave = _radical(palavra)
+            posicao += 1
+            if chave is None:
+                continue
+            pesos[chave] += peso_campo
+            primeira.setdefault(chave, posicao)
+            formas[chave][palavra] += 1
+
+    if not pesos:
+        return []
+    for chave in pesos:
+        pesos[chave] *= 1 + 1 / (1 + primeira[chave] / 10)
+    melhores = sorted(pesos, key=lambda chave: (-pesos[chave], primeira[chave]))[:limite]
+    maior = pesos[melhores[0]]
+    return [
+        (chave, formas[chave].most_common(1)[0][0], round(pesos[chave] / maior, 4))
+        for chave in melhores
+    ]
+
+
+def formatar(termos):
+    """Texto de Noticia.palavras_chave ('economia, juros, ...')"""
+    return ', '.join(rotulo for _, rotulo, _ in termos)
+
+
+def gravar(termos_por_noticia):
+    """Substitui as palavras-chave das notícias: {noticia_id: [(radical, rótulo, peso)]}"""
+    from .models import NoticiaPalavraChave, PalavraChave
+
+    if not termos_por_noticia:
+        return
+    rotulos = {}
+    for termos in termos_por_noticia.values():
+        for chave, rotulo, _ in termos:
+            rotulos.setdefault(chave, rotulo)
+
+    with transaction.atomic():
+        PalavraChave.objects.bulk_create(
+            [PalavraChave(radical=chave, rotulo=rotulo) for chave, rotulo in rotulos.items()],
+            ignore_conflicts=True,
+        )
+        ids = dict(PalavraChave.objects.filter(radical__in=rotulos).values_list('radical', 'id'))
+        NoticiaPalavraChave.objects.filter(noticia_id__in=termos_por_noticia).delete()
+        NoticiaPalavraChave.objects.bulk_create([
+            NoticiaPalavraChave(noticia_id=noticia_id, palavra_id=ids[chave], peso=peso)
+            for noticia_id, termos in termos_por_noticia.items()
+            for chave, _, peso in termos
+        ])
+
+
+def buscar_palavra(texto):
+    """Radical usado no filtro ?palavra= ('Eleições' -> 'eleicao')"""
+    return radical(normalizar(texto))
@@ -0,0 +1,144 @@
+"""
+Profiling sob demanda de requisições em produção.
+
+O PerfilMiddleware roda o cProfile em uma fração PERFIL_AMOSTRAGEM das
+requisições (0 desliga) ou em uma requisição específica de um usuário staff
+que envie o cabeçalho X-Perfil ou ?perfil=1. Cada perfil vira um arquivo
+pstats em PERFIL_DIRETORIO com a view no nome; os mais antigos são apagados
+além de PERFIL_MAXIMO_ARQUIVOS. O comando relatorio_perfil junta os arquivos
+por view e lista as funções mais caras.
+"""
+import cProfile
+import itertools
+import os
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+SUFIXO = '.prof'
+_NOME = re.compile(r'[^A-Za-z0-9_.-]+')
+_sequencia = itertools.count()
+
+
+def diretorio():
+    return str(getattr(settings, 'PERFIL_DIRETORIO', settings.BASE_DIR / 'perfis'))
+
+
+def view_do_arquivo(nome):
+    """View gravada no nome do arquivo (noticias.home--20250101T120000-123-0.prof)"""
+    return os.path.basename(nome).split('--', 1)[0]
+
+
+def arquivos(caminho=None):
+    """[(mtime, caminho)] dos perfis gravados, dos mais antigos aos mais novos"""
+    caminho = caminho or diretorio()
+    try:
+        entradas = [entrada for entrada in os.scandir(caminho) if entrada.name.endswith(SUFIXO)]
+    except FileNotFoundError:
+        return []
+    itens = []
+    for entrada in entradas:
+        try:
+            itens.append((entrada.stat().st_mtime, entrada.path))
+        except FileNotFoundError:
+            # Apagado pela rotação de outro processo
+            continue
+    return sorted(itens)
+
+
+def _rotacionar(caminho, maximo):
+    itens = arquivos(caminho)
+    for _, antigo in itens[:max(0, len(itens) - maximo)]:
+        try:
+            os.remove(antigo)
+        except FileNotFoundError:
+            pass
+
+
+def gravar(perfil, view):
+    """Grava o perfil em PERFIL_DIRETORIO e aplica a rotação. Retorna o caminho"""
+    caminho = diretorio()
+    os.makedirs(caminho, exist_ok=True)
+    nome = (
+        f"{_NOME.sub('_', view.replace(':', '.')) or 'desconhecida'}--"
+        f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{next(_sequencia)}{SUFIXO}"
+    )
+    arquivo = os.path.join(caminho, nome)
+    perfil.dump_stats(arquivo)
+    _rotacionar(caminho, getattr(settings, 'PERFIL_MAXIMO_ARQUIVOS', 1000))
+    return arquivo
+
+
+class PerfilMiddleware:
+    """Perfila requisições amostradas ou pedidas por staff (depois do AuthenticationMiddleware).
+
+    Em ASGI o cProfile vê só a thread do event loop: inclui as outras requisições
+    atendidas no intervalo e não vê o que roda nas threads do sync_to_async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'PERFIL_AMOSTRAGEM', 0)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _marcado(self, request):
+        return 'HTTP_X_PERFIL' in request.META or request.GET.get('perfil') == '1'
+
+    def _sorteado(self):
+        return bool(self.amostragem and random.random() < self.amostragem)
+
+    def _iniciar(self):
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+        except ValueError:
+            # Outro profiler ativo nesta thread
+            return None
+        return perfil
+
+    def _concluir(self, request, response, perfil, pedido):
+        correspondencia = getattr(request, 'resolver_match', None)
+        arquivo = gravar(perfil, correspondencia.view_name if correspondencia else '')
+        if pedido:
+            response['X-Perfil'] = os.path.basename(arquivo)
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        usuario = getattr(request, 'user', None)
+        pedido = self._marcado(request) and bool(usuario and usuario.is_staff)
+        if not pedido and not self._sorteado():
+            return self.get_response(request)
+
+        perfil = self._iniciar()
+        if perfil is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            perfil.disable()
+        return self._concluir(request, response, perfil, pedido)
+
+    async def __acall__(self, request):
+        pedido = False
+        if self._marcado(request) and hasattr(request, 'auser'):
+            pedido = (await request.auser()).is_staff
+        if not pedido and not self._sorteado():
+            return await self.get_response(request)
+
+        perfil = self._iniciar()
+        if perfil is None:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            perfil.disable()
+        return self._concluir(request, response, perfil, pedido)
@@ -0,0 +1,228 @@
+"""
+Notícias relacionadas por similaridade de cosseno TF-IDF das palavras-chave
+(pesos de NoticiaPalavraChave multiplicados pelo idf de cada palavra).
+
+O resultado fica na tabela NoticiaRelacionada (top-k por notícia): a página de
+detalhe só faz uma consulta pelo índice (origem, posicao). A tabela é
+reconstruída pelo comando calcular_relacionadas e atualizada de forma
+incremental pelo worker da fila quando as palavras-chave de uma notícia mudam.
+A atualização incremental lê só as listas invertidas dos termos da notícia e
+usa as frequências (df) guardadas em cache na última reconstrução; a variação
+do idf desde então é corrigida na reconstrução seguinte.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import NoticiaPalavraChave, NoticiaRelacionada
+
+SIMILARIDADE_MINIMA = 0.02
+# Termos presentes em mais da metade das notícias não geram candidatos
+# (contribuem pouco para o cosseno e deixariam o cálculo quadrático)
+FRACAO_MAXIMA_DF = 0.5
+# Vizinhos cujas listas são revisadas na atualização incremental
+VIZINHOS_REVISADOS = 50
+# Na atualização incremental, candidatos (pelo produto escalar) cujos vetores
+# completos são carregados para calcular o cosseno
+CANDIDATOS_INCREMENTAL = 1000
+CHAVE_FREQUENCIAS = 'relacionadas:frequencias'
+
+
+def _k():
+    return getattr(settings, 'RELACIONADAS_K', 6)
+
+
+def carregar_corpus():
+    """{id: {palavra_id: peso}} das notícias publicadas que têm palavras-chave"""
+    linhas = NoticiaPalavraChave.objects.filter(noticia__publicada=True).values_list(
+        'noticia_id', 'palavra_id', 'peso',
+    )
+    corpus = defaultdict(dict)
+    for pk, palavra_id, peso in linhas.iterator(chunk_size=5000):
+        corpus[pk][palavra_id] = peso
+    return dict(corpus)
+
+
+def _idf(total, freq):
+    return math.log((total + 1) / (freq + 1)) + 1
+
+
+def _limite_df(total):
+    return max(2, total * FRACAO_MAXIMA_DF) if total >= 20 else total
+
+
+def _norma(termos, idf):
+    return math.sqrt(sum((peso * idf[termo]) ** 2 for termo, peso in termos.items()))
+
+
+def frequencias():
+    """(total de notícias, {palavra_id: df}) guardados pela última reconstrução.
+
+    Sem cache (primeira execução ou cache limpo) conta pelo banco, sem carregar as linhas.
+    """
+    guardadas = cache.get(CHAVE_FREQUENCIAS)
+    if guardadas is None:
+        publicadas = NoticiaPalavraChave.objects.filter(noticia__publicada=True).order_by()
+        df = dict(publicadas.values('palavra_id').annotate(df=Count('id')).values_list('palavra_id', 'df'))
+        guardadas = (publicadas.values('noticia_id').distinct().count(), df)
+        cache.set(CHAVE_FREQUENCIAS, guardadas, timeout=None)
+    return guardadas
+
+
+class IndiceTfIdf:
+    """Índice invertido em memória com pesos idf e normas dos vetores"""
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.df = Counter(termo for termos in corpus.values() for termo in termos)
+        total = self.total = len(corpus)
+        self.idf = {termo: _idf(total, freq) for termo, freq in self.df.items()}
+        self.normas = {pk: _norma(termos, self.idf) for pk, termos in corpus.items()}
+        limite_df = _limite_df(total)
+        self.invertido = defaultdict(list)
+        for pk, termos in corpus.items():
+            for termo in termos:
+                if self.df[termo] <= limite_df:
+                    self.invertido[termo].append(pk)
+
+    def similaridades(self, pk):
+        """{outro_id: cosseno} das notícias que compartilham termos com `pk`"""
+        termos = self.corpus[pk]
+        produtos = defaultdict(float)
+        for termo, peso in termos.items():
+            peso_idf = peso * self.idf[termo] ** 2
+            for outro in self.invertido.get(termo, ()):
+                if outro != pk:
+                    produtos[outro] += peso_idf * self.corpus[outro][termo]
+        norma = self.normas[pk]
+        return {
+            outro: produto / (norma * self.normas[outro])
+            for outro, produto in produtos.items()
+        }
+
+    def mais_similares(self, pk, k):
+        similaridades = self.similaridades(pk)
+        return _top(similaridades, k)
+
+
+def _top(similaridades, k):
+    """[(id, similaridade)] dos k maiores acima do mínimo, com desempate estável pelo id"""
+    acima = ((pk, valor) for pk, valor in similaridades.items() if valor >= SIMILARIDADE_MINIMA)
+    return heapq.nlargest(k, acima, key=lambda item: (item[1], -item[0]))
+
+
+def _linhas(origem, vizinhos):
+    return [
+        NoticiaRelacionada(origem_id=origem, destino_id=destino, similaridade=similaridade, posicao=posicao)
+        for posicao, (destino, similaridade) in enumerate(vizinhos)
+    ]
+
+
+def reconstruir():
+    """Recalcula a tabela inteira. Retorna a quantidade de pares gravados."""
+    from .cache import TAG_LISTAS, invalidar
+
+    indice = IndiceTfIdf(carregar_corpus())
+    k = _k()
+    linhas = []
+    for pk in indice.corpus:
+        linhas.extend(_linhas(pk, indice.mais_similares(pk, k)))
+
+    with transaction.atomic():
+        NoticiaRelacionada.objects.all().delete()
+        NoticiaRelacionada.objects.bulk_create(linhas, batch_size=1000)
+    cache.set(CHAVE_FREQUENCIAS, (indice.total, dict(indice.df)), timeout=None)
+    invalidar(TAG_LISTAS)
+    return len(linhas)
+
+
+def _vetores(ids):
+    """{id: {palavra_id: peso}} das notícias publicadas entre `ids`"""
+    vetores = defaultdict(dict)
+    ids = list(ids)
+    for inicio in range(0, len(ids), 500):
+        linhas = NoticiaPalavraChave.objects.filter(
+            noticia_id__in=ids[inicio:inicio + 500], noticia__publicada=True,
+        ).order_by().values_list('noticia_id', 'palavra_id', 'peso')
+        for pk, palavra_id, peso in linhas:
+            vetores[pk][palavra_id] = peso
+    return dict(vetores)
+
+
+def _similaridades(pk, termos, total, df):
+    """{outro_id: cosseno} de uma notícia lendo só as listas invertidas dos seus termos.
+
+    O produto escalar sai das listas; o cosseno é calculado para os
+    CANDIDATOS_INCREMENTAL maiores produtos, cujos vetores são carregados.
+    """
+    idf = {termo: _idf(total, df.get(termo, 1)) for termo in termos}
+    limite_df = _limite_df(total)
+    buscados = [termo for termo in termos if df.get(termo, 1) <= limite_df]
+
+    produtos = defaultdict(float)
+    linhas = NoticiaPalavraChave.objects.filter(
+        palavra_id__in=buscados, noticia__publicada=True,
+    ).exclude(noticia_id=pk).order_by().values_list('noticia_id', 'palavra_id', 'peso')
+    for outro, termo, peso in linhas.iterator(chunk_size=5000):
+        produtos[outro] += termos[termo] * idf[termo] ** 2 * peso
+
+    candidatos = _vetores(heapq.nlargest(CANDIDATOS_INCREMENTAL, produtos, key=produtos.get))
+    for vetor in candidatos.values():
+        for termo in vetor.keys() - idf.keys():
+            idf[termo] = _idf(total, df.get(termo, 1))
+    norma = _norma(termos, idf)
+    return {
+        outro: produtos[outro] / (norma * _norma(vetor, idf))
+        for outro, vetor in candidatos.items()
+    }
+
+
+def _regravar(origem, vizinhos):
+    NoticiaRelacionada.objects.filter(origem_id=origem).delete()
+    NoticiaRelacionada.objects.bulk_create(_linhas(origem, vizinhos))
+
+
+def atualizar_noticia(noticia_id):
+    """Atualiza as relacionadas de uma notícia e a posição dela nas listas dos vizinhos"""
+    from .cache import TAG_LISTAS, invalidar
+
+    total, df = frequencias()
+    k = _k()
+    termos = _vetores([noticia_id]).get(noticia_id)
+    with transaction.atomic():
+        similaridades = _similaridades(noticia_id, termos, total, df) if termos else {}
+        NoticiaRelacionada.objects.filter(origem_id=noticia_id).delete()
+        if termos:
+            NoticiaRelacionada.objects.bulk_create(_linhas(noticia_id, _top(similaridades, k)))
+
+        # Listas revisadas: as que já continham a notícia e as dos vizinhos mais
+        # próximos agora, com as similaridades gravadas
+        proximos = [pk for pk, _ in _top(similaridades, VIZINHOS_REVISADOS)]
+        revisar = NoticiaRelacionada.objects.filter(
+            Q(origem_id__in=NoticiaRelacionada.objects.filter(destino_id=noticia_id).values('origem_id')) |
+            Q(origem_id__in=proximos)
+        )
+        listas = defaultdict(list, {pk: [] for pk in proximos})
+        for origem, destino, similaridade in revisar.order_by('origem', 'posicao').values_list(
+            'origem_id', 'destino_id', 'similaridade',
+        ):
+            listas[origem].append((destino, similaridade))
+
+        for origem, atual in listas.items():
+            vizinhos = {destino: similaridade for destino, similaridade in atual if destino != noticia_id}
+            if origem in similaridades:
+                # O cosseno é simétrico
+                vizinhos[noticia_id] = similaridades[origem]
+            novos = _top(vizinhos, k)
+            if len(novos) < k and len(atual) >= k:
+                # A notícia saiu de uma lista cheia: outra ocupa a vaga
+                vetor = _vetores([origem]).get(origem)
+                novos = _top(_similaridades(origem, vetor, total, df), k) if vetor else []
+            if [destino for destino, _ in novos] != [destino for destino, _ in atual]:
+                _regravar(origem, novos)
+    invalidar(TAG_LISTAS)
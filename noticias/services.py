@@ -1,28 +1,106 @@
+import hashlib
+import os
 import re
-import requests
+import time
+from collections import deque
 from datetime import datetime, timedelta
+from multiprocessing import get_all_start_methods, get_context
+from types import SimpleNamespace
 from django.conf import settings
 from django.utils import timezone
 import json
+from .metricas import RELEVANCIA
+from .tendencias import obter_loja
+from .palavras import extrair, formatar, gravar
+from .termos import obter_matcher, preparar
+
+# Campos lidos e gravados pelo reprocessamento em lote
+CAMPOS_TEXTO = ('titulo', 'resumo', 'conteudo', 'data_publicacao')
+CAMPOS_RELEVANCIA = [
+    'relevancia_score', 'palavras_chave', 'destaque',
+    'hash_conteudo', 'relevancia_pendente', 'relevancia_calculada_em',
+]
+LIMITE_DESTAQUE = 7.0
+
+# Palavras de alta relevância
+PALAVRAS_IMPORTANTES = (
+    'urgente', 'breaking', 'exclusivo', 'política', 'economia',
+    'tecnologia', 'saúde', 'educação', 'meio ambiente', 'cultura',
+    'esporte', 'entretenimento', 'internacional', 'nacional',
+)
+
+# Faixas da análise temporal: (dias desde a publicação, score)
+FAIXAS_TEMPORAIS = ((1, 3.0), (7, 2.0), (30, 1.0))
+
+# Serviço reaproveitado por todas as notícias de um mesmo processo do pool
+_service_processo = None
+
+
+def hash_conteudo(titulo, resumo, conteudo):
+    """Hash do texto usado no cálculo de relevância (detecta edições de conteúdo)"""
+    texto = '\x00'.join((titulo or '', resumo or '', conteudo or ''))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def faixa_temporal(data_publicacao, referencia=None):
+    """Índice da faixa temporal da notícia (len(FAIXAS_TEMPORAIS) = mais antiga que 30 dias)"""
+    referencia = referencia or timezone.now()
+    for indice, (dias, _) in enumerate(FAIXAS_TEMPORAIS):
+        if data_publicacao >= referencia - timedelta(days=dias):
+            return indice
+    return len(FAIXAS_TEMPORAIS)
+
+
+def _inicializar_processo():
+    """Inicializa o Django nos processos do pool (necessário com spawn no Windows/macOS)"""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _calcular_lote(linhas):
+    """Calcula (id, score, palavras_chave, destaque, hash, termos) para um lote de linhas.
+
+    Executado nos processos do pool: recebe apenas tuplas simples, sem ORM.
+    """
+    global _service_processo
+    if _service_processo is None:
+        _service_processo = RelevanciaService()
+
+    resultados = []
+    for linha in linhas:
+        noticia = SimpleNamespace(**dict(zip(('id',) + CAMPOS_TEXTO, linha)))
+        score = _service_processo.calcular_relevancia(noticia)
+        termos = _service_processo.extrair_termos(noticia)
+        resultados.append((
+            noticia.id, score, formatar(termos), score >= LIMITE_DESTAQUE,
+            hash_conteudo(noticia.titulo, noticia.resumo, noticia.conteudo), termos,
+        ))
+    return resultados
+
 
 class RelevanciaService:
     """Serviço para calcular relevância automática das notícias"""
     
     def __init__(self):
-        self.tendencias_cache = {}
-        self.cache_expiry = None
-        self.tendencias_url = "https://trends.google.com/trends/api/dailytrends"
+        # Tendências compartilhadas pelo processo (veja noticias/tendencias.py)
+        self.tendencias = obter_loja()
         
     def calcular_relevancia(self, noticia):
         """Calcula score de relevância de 0 a 10"""
+        inicio = time.perf_counter()
         score = 0.0
         
+        # Uma única passada no texto para palavras-chave e tendências
+        ocorrencias = self._ocorrencias(noticia)
+        
         # 1. Análise de palavras-chave (30%)
-        palavras_score = self._analisar_palavras_chave(noticia)
+        palavras_score = self._analisar_palavras_chave(noticia, ocorrencias)
         score += palavras_score * 0.3
         
         # 2. Análise de tendências (40%)
-        tendencias_score = self._analisar_tendencias(noticia)
+        tendencias_score = self._analisar_tendencias(noticia, ocorrencias)
         score += tendencias_score * 0.4
         
         # 3. Análise de conteúdo (20%)
@@ -33,43 +111,44 @@ class RelevanciaService:
         temporal_score = self._analisar_temporal(noticia)
         score += temporal_score * 0.1
         
+        RELEVANCIA.observar(time.perf_counter() - inicio)
         return round(score, 2)
     
-    def _analisar_palavras_chave(self, noticia):
+    def _ocorrencias(self, noticia):
+        """Termos encontrados no título/resumo e no texto completo.
+
+        O texto é normalizado uma única vez e compartilhado pelos dois scorers;
+        os matchers são construídos uma vez por processo e reconstruídos apenas
+        quando o conjunto de palavras ou de tendências muda.
+        """
+        cabecalho = preparar(f"{noticia.titulo} {noticia.resumo}")
+        texto_completo = cabecalho + preparar(noticia.conteudo)
+        palavras = obter_matcher(PALAVRAS_IMPORTANTES).encontrar(texto_completo)
+        try:
+            tendencias = obter_matcher(self._termos_tendencias()).encontrar(cabecalho)
+        except Exception as e:
+            print(f"Erro ao analisar tendências: {e}")
+            tendencias = None
+        return palavras, tendencias
+    
+    def _analisar_palavras_chave(self, noticia, ocorrencias=None):
         """Analisa palavras-chave importantes"""
-        score = 0.0
-        
-        # Palavras de alta relevância
-        palavras_importantes = [
-            'urgente', 'breaking', 'exclusivo', 'política', 'economia',
-            'tecnologia', 'saúde', 'educação', 'meio ambiente', 'cultura',
-            'esporte', 'entretenimento', 'internacional', 'nacional'
-        ]
-        
-        texto_completo = f"{noticia.titulo} {noticia.resumo} {noticia.conteudo}".lower()
-        
-        for palavra in palavras_importantes:
-            if palavra in texto_completo:
-                score += 1.0
+        palavras, _ = ocorrencias or self._ocorrencias(noticia)
+        score = float(len(palavras))
         
         # Normaliza para 0-10
         return min(score, 10.0)
     
-    def _analisar_tendencias(self, noticia):
+    def _analisar_tendencias(self, noticia, ocorrencias=None):
         """Analisa tendências atuais do Google"""
         try:
-            if not self._cache_valido():
-                self._atualizar_tendencias()
-            
-            score = 0.0
-            texto_completo = f"{noticia.titulo} {noticia.resumo}".lower()
+            queries = self._termos_tendencias()
+            _, encontradas = ocorrencias or self._ocorrencias(noticia)
+            if encontradas is None:
+                raise ValueError('tendências indisponíveis')
             
             # Verifica se palavras da notícia estão nas tendências
-            for tendencia in self.tendencias_cache.get('trendingSearchesDays', []):
-                for search in tendencia.get('trendingSearches', []):
-                    query = search.get('title', {}).get('query', '').lower()
-                    if query in texto_completo:
-                        score += 2.0
+            score = sum(2.0 for query in queries if query in encontradas)
             
             return min(score, 10.0)
             
@@ -77,6 +156,10 @@ class RelevanciaService:
             print(f"Erro ao analisar tendências: {e}")
             return 5.0  # Score médio em caso de erro
     
+    def _termos_tendencias(self):
+        """Consultas das tendências atuais (nunca espera pela rede)"""
+        return self.tendencias.termos()
+    
     def _analisar_conteudo(self, noticia):
         """Analisa qualidade e extensão do conteúdo"""
         score = 0.0
@@ -109,17 +192,9 @@ class RelevanciaService:
     
     def _analisar_temporal(self, noticia):
         """Analisa relevância temporal"""
-        score = 0.0
-        
-        # Notícia muito recente (últimas 24h)
-        if noticia.data_publicacao >= timezone.now() - timedelta(days=1):
-            score += 3.0
-        # Notícia recente (última semana)
-        elif noticia.data_publicacao >= timezone.now() - timedelta(days=7):
-            score += 2.0
-        # Notícia do mês
-        elif noticia.data_publicacao >= timezone.now() - timedelta(days=30):
-            score += 1.0
+        # Notícia muito recente (24h) = 3, da semana = 2, do mês = 1
+        faixa = faixa_temporal(noticia.data_publicacao)
+        score = FAIXAS_TEMPORAIS[faixa][1] if faixa < len(FAIXAS_TEMPORAIS) else 0.0
         
         # Verifica se é notícia de fim de semana (menos relevante)
         if noticia.data_publicacao.weekday() >= 5:  # Sábado ou domingo
@@ -127,70 +202,116 @@ class RelevanciaService:
         
         return max(score, 0.0)
     
-    def _cache_valido(self):
-        """Verifica se o cache de tendências ainda é válido"""
-        if not self.cache_expiry:
-            return False
-        return timezone.now() < self.cache_expiry
-    
-    def _atualizar_tendencias(self):
-        """Atualiza cache de tendências do Google"""
-        try:
-            # Simula tendências (em produção, usar API real)
-            self.tendencias_cache = {
-                'trendingSearchesDays': [
-                    {
-                        'trendingSearches': [
-                            {'title': {'query': 'tecnologia'}},
-                            {'title': {'query': 'política'}},
-                            {'title': {'query': 'economia'}},
-                            {'title': {'query': 'saúde'}},
-                            {'title': {'query': 'educação'}},
-                            {'title': {'query': 'meio ambiente'}},
-                            {'title': {'query': 'cultura'}},
-                            {'title': {'query': 'esporte'}},
-                            {'title': {'query': 'internacional'}},
-                            {'title': {'query': 'nacional'}}
-                        ]
-                    }
-                ]
-            }
-            
-            # Cache válido por 1 hora
-            self.cache_expiry = timezone.now() + timedelta(hours=1)
-            
-        except Exception as e:
-            print(f"Erro ao atualizar tendências: {e}")
-            # Fallback para tendências básicas
-            self.tendencias_cache = {'trendingSearchesDays': []}
-    
     def extrair_palavras_chave(self, noticia):
-        """Extrai palavras-chave da notícia"""
-        texto = f"{noticia.titulo} {noticia.resumo}"
-        
-        # Remove palavras comuns
-        palavras_comuns = ['a', 'o', 'e', 'de', 'da', 'do', 'em', 'um', 'uma', 'com', 'para', 'por', 'que', 'se', 'não', 'mais', 'como', 'mas', 'foi', 'são', 'está', 'pode', 'ser', 'tem', 'ao', 'ele', 'das', 'tem', 'à', 'seu', 'sua', 'ou', 'quando', 'muito', 'nos', 'já', 'eu', 'também', 'só', 'pelo', 'pela', 'até', 'isso', 'ela', 'entre', 'era', 'depois', 'sem', 'mesmo', 'aos', 'ter', 'seus', 'suas', 'minha', 'têm', 'naquele', 'neles', 'estavam', 'fosse', 'nessa', 'nesses', 'nessa', 'numa', 'disso', 'aquela', 'àquela', 'estivessem', 'fossem', 'estivesse', 'tivesse', 'estivessem', 'tivessem', 'houvesse', 'houvessem', 'houver', 'haver', 'haveria', 'haveriam', 'haja', 'hajam', 'tenha', 'tenham', 'terei', 'terá', 'terão', 'teria', 'teriam', 'terei', 'terá', 'terão', 'teria', 'teriam', 'quero', 'quer', 'querem', 'queria', 'queriam', 'deseje', 'deseja', 'desejem', 'desejaria', 'desejariam', 'preciso', 'precisa', 'precisam', 'precisaria', 'precisariam', 'gostaria', 'gostariam', 'gosto', 'gosta', 'gostam', 'gostaria', 'gostariam', 'adoro', 'adora', 'adoram', 'adoraria', 'adorariam', 'detesto', 'detesta', 'detestam', 'detestaria', 'detestariam', 'odeio', 'odeia', 'odeiam', 'odearia', 'odeariam', 'amo', 'ama', 'amam', 'amaria', 'amariam', 'gosto', 'gosta', 'gostam', 'gostaria', 'gostariam', 'adoro', 'adora', 'adoram', 'adoraria', 'adorariam', 'detesto', 'detesta', 'detestam', 'detestaria', 'detestariam', 'odeio', 'odeia', 'odeiam', 'odearia', 'odeariam', 'amo', 'ama', 'amam', 'amaria', 'amariam']
-        
-        # Divide o texto em palavras
-        palavras = re.findall(r'\b\w+\b', texto.lower())
-        
-        # Filtra palavras relevantes
-        palavras_relevantes = []
-        for palavra in palavras:
-            if (len(palavra) > 3 and 
-                palavra not in palavras_comuns and 
-                palavra not in palavras_relevantes):
-                palavras_relevantes.append(palavra)
-        
-        # Retorna as 10 palavras mais relevantes
-        return ', '.join(palavras_relevantes[:10])
-    
-    def atualizar_relevancia_todas(self):
-        """Atualiza relevância de todas as notícias"""
+        """Extrai palavras-chave da notícia ('economia, juros, ...')"""
+        return formatar(self.extrair_termos(noticia))
+
+    def extrair_termos(self, noticia):
+        """Palavras-chave com radical e peso (veja noticias/palavras.py)"""
+        return extrair(noticia)
+
+    def atualizar_relevancia_todas(self, queryset=None, batch_size=500, workers=None):
+        """Atualiza relevância de todas as notícias publicadas em lotes.
+
+        As linhas são lidas em lotes pela chave primária, os scores são
+        calculados em um pool de processos e gravados com bulk_update apenas
+        nos campos de relevância (e só nas notícias cujo resultado mudou,
+        estavam pendentes ou mudaram de faixa temporal).
+        """
         from .models import Noticia
-        
-        noticias = Noticia.objects.filter(publicada=True)
-        for noticia in noticias:
-            noticia.calcular_relevancia()
-        
-        return f"Relevância atualizada para {noticias.count()} notícias"
+
+        if queryset is None:
+            queryset = Noticia.objects.filter(publicada=True)
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        inicio = time.perf_counter()
+        processadas, alteradas = self._reprocessar(queryset, batch_size, workers)
+        duracao = time.perf_counter() - inicio
+
+        if alteradas:
+            from . import contadores
+            from .cache import TAG_LISTAS, invalidar
+            invalidar(TAG_LISTAS)
+            # bulk_update não dispara sinais: destaques e relevância média são recalculados
+            contadores.reconciliar()
+
+        taxa = processadas / duracao if duracao else 0.0
+        return (
+            f"Relevância atualizada para {processadas} notícias ({alteradas} alteradas) "
+            f"em {duracao:.2f}s ({taxa:.0f} notícias/s)"
+        )
+
+    def _lotes(self, queryset, batch_size):
+        """Percorre o queryset em lotes ordenados por id (memória limitada)"""
+        ultimo_id = 0
+        campos = ('id',) + CAMPOS_TEXTO + tuple(CAMPOS_RELEVANCIA)
+        while True:
+            lote = list(
+                queryset.filter(id__gt=ultimo_id).order_by('id').values_list(*campos)[:batch_size]
+            )
+            if not lote:
+                return
+            ultimo_id = lote[-1][0]
+            yield lote
+
+    def _reprocessar(self, queryset, batch_size, workers):
+        processadas = alteradas = 0
+        atuais = {}
+
+        def separar(lote):
+            # Guarda data e valores atuais para gravar apenas o que mudou
+            n = 1 + len(CAMPOS_TEXTO)
+            for linha in lote:
+                atuais[linha[0]] = (linha[n - 1],) + tuple(linha[n:])
+            return [linha[:n] for linha in lote]
+
+        def gravar(resultados):
+            nonlocal processadas, alteradas
+            processadas += len(resultados)
+            alteradas += self._gravar_lote(resultados, atuais, batch_size)
+
+        if workers <= 1:
+            for lote in self._lotes(queryset, batch_size):
+                gravar(_calcular_lote(separar(lote)))
+            return processadas, alteradas
+
+        contexto = get_context('fork' if 'fork' in get_all_start_methods() else 'spawn')
+        with contexto.Pool(workers, initializer=_inicializar_processo) as pool:
+            # Lê o próximo lote enquanto os anteriores são calculados
+            pendentes = deque()
+            for lote in self._lotes(queryset, batch_size):
+                pendentes.append(pool.apply_async(_calcular_lote, (separar(lote),)))
+                if len(pendentes) >= workers * 2:
+                    gravar(pendentes.popleft().get())
+            while pendentes:
+                gravar(pendentes.popleft().get())
+        return processadas, alteradas
+
+    def _gravar_lote(self, resultados, atuais, batch_size):
+        from .models import Noticia
+
+        agora = timezone.now()
+        objetos = []
+        termos_alterados = {}
+        for id, score, palavras, destaque, hash_atual, termos in resultados:
+            data_publicacao, *valores, pendente, calculada_em = atuais.pop(id)
+            inalterada = (
+                tuple(valores) == (score, palavras, destaque, hash_atual)
+                and not pendente
+                and calculada_em is not None
+                and faixa_temporal(data_publicacao, calculada_em) == faixa_temporal(data_publicacao, agora)
+            )
+            if not inalterada:
+                objetos.append(Noticia(
+                    id=id, relevancia_score=score, palavras_chave=palavras, destaque=destaque,
+                    hash_conteudo=hash_atual, relevancia_pendente=False,
+                    relevancia_calculada_em=agora,
+                ))
+                termos_alterados[id] = termos
+        if objetos:
+            # bulk_update já executa cada lote dentro de uma transação.
+            # data_atualizacao fica de fora: relevância não é edição (veja Noticia.save)
+            Noticia.objects.bulk_update(objetos, CAMPOS_RELEVANCIA, batch_size=batch_size)
+            gravar(termos_alterados)
+        return len(objetos)
@@ -0,0 +1,93 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import contadores, sitemaps
+from .cache import invalidar_noticia
+from .fila import enfileirar
+from .imagens import atualizar_derivados
+from .models import Noticia
+
+logger = logging.getLogger('noticias.imagens')
+
+
+# Registrado antes da invalidação do cache para que as páginas já saiam com as derivadas
+@receiver(post_save, sender=Noticia)
+def gerar_derivados_imagem(sender, instance, raw=False, **kwargs):
+    """Gera thumb/card/hero em WebP e JPEG quando a imagem é enviada ou trocada
+
+    Roda dentro da requisição que salvou a notícia: um upload novo custa a
+    decodificação da original e seis encodes (algumas centenas de ms numa foto
+    grande). Saves que não trocam a imagem saem na comparação com 'origem'.
+    """
+    if raw:
+        return
+    try:
+        atualizar_derivados(instance)
+    except Exception:
+        # Sem derivadas os templates usam a imagem original
+        logger.exception('Erro ao gerar derivadas da imagem da notícia %s', instance.pk)
+
+
+@receiver(post_save, sender=Noticia)
+@receiver(post_delete, sender=Noticia)
+def invalidar_cache_noticia(sender, instance, **kwargs):
+    """Invalida as páginas públicas que exibem a notícia alterada"""
+    pk = instance.pk
+    # Depois do commit: antes dele uma requisição ainda lê (e guarda) o estado antigo
+    transaction.on_commit(lambda: invalidar_noticia(pk))
+
+
+@receiver(post_save, sender=Noticia)
+def enfileirar_relevancia(sender, instance, **kwargs):
+    """Agenda o cálculo de relevância quando o texto da notícia mudou"""
+    if instance.relevancia_pendente:
+        enfileirar(instance.pk)
+
+
+@receiver(pre_save, sender=Noticia)
+def guardar_estado_contadores(sender, instance, update_fields=None, **kwargs):
+    """Lê o estado anterior só quando o save pode alterar os contadores"""
+    instance._estado_contadores = None
+    if instance.pk and not instance._state.adding:
+        if update_fields is None or set(update_fields) & set(contadores.CAMPOS):
+            instance._estado_contadores = contadores.estado_salvo(instance.pk)
+
+
+@receiver(post_save, sender=Noticia)
+def atualizar_contadores(sender, instance, created, update_fields=None, **kwargs):
+    anterior = getattr(instance, '_estado_contadores', None)
+    if not created and anterior is None:
+        return
+    atual = contadores.estado(instance)
+    if anterior and update_fields is not None:
+        # Campos fora do update_fields podem estar desatualizados na instância
+        atual = tuple(
+            valor if campo in update_fields else antigo
+            for campo, valor, antigo in zip(contadores.CAMPOS, atual, anterior)
+        )
+    contadores.aplicar(anterior, atual)
+
+
+@receiver(pre_delete, sender=Noticia)
+def guardar_estado_exclusao(sender, instance, **kwargs):
+    # A instância pode estar desatualizada: vale o que está gravado
+    instance._estado_contadores = contadores.estado_salvo(instance.pk)
+
+
+@receiver(post_delete, sender=Noticia)
+def descontar_contadores(sender, instance, **kwargs):
+    contadores.aplicar(getattr(instance, '_estado_contadores', None), None)
+
+
+@receiver(post_save, sender=Noticia)
+@receiver(post_delete, sender=Noticia)
+def invalidar_sitemap(sender, instance, **kwargs):
+    """Invalida só a partição do sitemap da notícia (e a anterior, se a data mudou)"""
+    datas = [instance.data_publicacao]
+    anterior = getattr(instance, '_estado_contadores', None)
+    if anterior:
+        datas.append(anterior[contadores.CAMPOS.index('data_publicacao')])
+    sitemaps.invalidar_particoes(datas)
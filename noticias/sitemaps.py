@@ -0,0 +1,207 @@
+"""
+Sitemap das notícias publicadas: um índice e um sitemap por mês de publicação.
+
+Cada partição (mês) tem uma tag no cache, invalidada pelos signals de Noticia
+só para o mês da notícia alterada. O índice guarda por partição a quantidade e
+a última atualização; o sitemap de um mês é gerado percorrendo o índice
+(publicada, data_publicacao, id) por keyset em lotes, enviado em streaming e
+guardado no cache até a próxima alteração daquele mês. Meses com mais de
+SITEMAP_URLS_POR_ARQUIVO notícias são divididos em páginas.
+"""
+import hashlib
+import math
+from datetime import MAXYEAR, MINYEAR, datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+
+from .cache import gravar_ao_final, invalidar, versao_por_tag
+from .models import Noticia
+
+# Limite do protocolo: 50.000 URLs por arquivo
+URLS_POR_ARQUIVO = 50000
+TAMANHO_LOTE = 2000
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+CABECALHO_XML = '<?xml version="1.0" encoding="UTF-8"?>\n'
+NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def tag_particao(ano, mes):
+    return f'sitemap:{ano:04d}-{mes:02d}'
+
+
+def particao(data):
+    """(ano, mes) da partição de uma data de publicação (no fuso do site)"""
+    local = timezone.localtime(data)
+    return local.year, local.month
+
+
+def invalidar_particoes(datas):
+    """Invalida as partições das datas de publicação informadas"""
+    tags = {tag_particao(*particao(data)) for data in datas if data}
+    if tags:
+        invalidar(*tags)
+
+
+def _limites(ano, mes):
+    inicio = timezone.make_aware(datetime(ano, mes, 1))
+    fim = timezone.make_aware(datetime(ano + mes // 12, mes % 12 + 1, 1))
+    return inicio, fim
+
+
+def _urls_por_arquivo():
+    return getattr(settings, 'SITEMAP_URLS_POR_ARQUIVO', URLS_POR_ARQUIVO)
+
+
+def _timeout():
+    return getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 60 * 60 * 24)
+
+
+def _noticias_do_mes(ano, mes):
+    inicio, fim = _limites(ano, mes)
+    return Noticia.objects.publicadas().filter(data_publicacao__gte=inicio, data_publicacao__lt=fim)
+
+
+def _meses():
+    """[(ano, mes)] da primeira à última publicação (duas leituras nas pontas do índice)"""
+    datas = Noticia.objects.publicadas().order_by('data_publicacao').values_list('data_publicacao', flat=True)
+    primeira, ultima = datas.first(), datas.last()
+    if primeira is None:
+        return []
+    ano, mes = particao(primeira)
+    fim = particao(ultima)
+    meses = []
+    while (ano, mes) <= fim:
+        meses.append((ano, mes))
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    return meses
+
+
+def resumo_particoes():
+    """[(ano, mes, quantidade, ultima_atualizacao)] das partições com notícias.
+
+    O resumo de cada partição fica no cache com a versão da tag: depois de uma
+    alteração só a partição afetada é recontada.
+    """
+    meses = _meses()
+    versoes = versao_por_tag([tag_particao(ano, mes) for ano, mes in meses])
+    chaves = {
+        (ano, mes): f'sitemap:resumo:{tag_particao(ano, mes)}:{versoes[tag_particao(ano, mes)]}'
+        for ano, mes in meses
+    }
+    guardados = cache.get_many(chaves.values())
+    resumos = []
+    for (ano, mes), chave in chaves.items():
+        resumo = guardados.get(chave)
+        if resumo is None:
+            totais = _noticias_do_mes(ano, mes).aggregate(quantidade=Count('id'), ultima=Max('data_atualizacao'))
+            resumo = (totais['quantidade'], totais['ultima'])
+            cache.set(chave, resumo, _timeout())
+        if resumo[0]:
+            resumos.append((ano, mes, *resumo))
+    return resumos
+
+
+def _data_w3c(data):
+    return timezone.localtime(data).replace(microsecond=0).isoformat()
+
+
+def _url_particao(request, ano, mes, pagina):
+    argumentos = {'ano': f'{ano:04d}', 'mes': f'{mes:02d}'}
+    if pagina == 1:
+        caminho = reverse('noticias:sitemap_mes', kwargs=argumentos)
+    else:
+        caminho = reverse('noticias:sitemap_mes_pagina', kwargs={**argumentos, 'pagina': pagina})
+    return request.build_absolute_uri(caminho)
+
+
+@require_safe
+def indice(request):
+    """sitemap.xml: índice com um sitemap por mês (e página, nos meses grandes)"""
+    partes = [CABECALHO_XML, f'<sitemapindex xmlns="{NAMESPACE}">\n']
+    por_arquivo = _urls_por_arquivo()
+    for ano, mes, quantidade, ultima in resumo_particoes():
+        for pagina in range(1, math.ceil(quantidade / por_arquivo) + 1):
+            partes.append(
+                f'<sitemap><loc>{escape(_url_particao(request, ano, mes, pagina))}</loc>'
+                f'<lastmod>{_data_w3c(ultima)}</lastmod></sitemap>\n'
+            )
+    partes.append('</sitemapindex>\n')
+    return HttpResponse(''.join(partes), content_type=CONTENT_TYPE)
+
+
+def _percorrer(queryset, inicio, limite):
+    """Notícias a partir da posição `inicio` da partição, em lotes por keyset (memória limitada)"""
+    queryset = queryset.only('id', 'data_publicacao', 'data_atualizacao').order_by('data_publicacao', 'id')
+    if inicio:
+        # Só para páginas além da primeira: um OFFSET dentro do mês para achar o começo
+        primeira = queryset.values_list('data_publicacao', 'id')[inicio:inicio + 1].first()
+        if primeira is None:
+            return
+        data, pk = primeira
+        queryset = queryset.filter(Q(data_publicacao__gt=data) | Q(id__gte=pk), data_publicacao__gte=data)
+
+    restantes = limite
+    lote_queryset = queryset
+    while restantes > 0:
+        lote = list(lote_queryset[:min(TAMANHO_LOTE, restantes)])
+        if not lote:
+            return
+        yield from lote
+        restantes -= len(lote)
+        ultima = lote[-1]
+        lote_queryset = queryset.filter(
+            Q(data_publicacao__gt=ultima.data_publicacao) | Q(id__gt=ultima.pk),
+            data_publicacao__gte=ultima.data_publicacao,
+        )
+
+
+def _partes_sitemap(request, noticias):
+    base = request.build_absolute_uri('/')[:-1]
+    yield f'{CABECALHO_XML}<urlset xmlns="{NAMESPACE}">\n'.encode('utf-8')
+    linhas = []
+    for noticia in noticias:
+        linhas.append(
+            f'<url><loc>{escape(base + noticia.get_absolute_url())}</loc>'
+            f'<lastmod>{_data_w3c(noticia.data_atualizacao)}</lastmod></url>\n'
+        )
+        if len(linhas) == TAMANHO_LOTE:
+            yield ''.join(linhas).encode('utf-8')
+            linhas = []
+    linhas.append('</urlset>\n')
+    yield ''.join(linhas).encode('utf-8')
+
+
+@require_safe
+def sitemap_mes(request, ano, mes, pagina=1):
+    """Sitemap das notícias publicadas em um mês"""
+    ano, mes, pagina = int(ano), int(mes), int(pagina)
+    # Os limites do mês (e a conversão para UTC) precisam caber em um datetime
+    if not MINYEAR < ano < MAXYEAR or not 1 <= mes <= 12 or pagina < 1:
+        raise Http404('Sitemap inexistente')
+
+    tag = tag_particao(ano, mes)
+    host = hashlib.md5(request.get_host().encode('utf-8')).hexdigest()
+    chave = f'sitemap:{host}:{tag}:{pagina}:{versao_por_tag([tag])[tag]}'
+    documento = cache.get(chave)
+    if documento is not None:
+        response = HttpResponse(documento, content_type=CONTENT_TYPE)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    queryset = _noticias_do_mes(ano, mes)
+    por_arquivo = _urls_por_arquivo()
+    inicio = (pagina - 1) * por_arquivo
+    if not queryset.order_by('data_publicacao', 'id')[inicio:inicio + 1].exists():
+        raise Http404('Sitemap inexistente')
+
+    partes = _partes_sitemap(request, _percorrer(queryset, inicio, por_arquivo))
+    response = StreamingHttpResponse(gravar_ao_final(partes, chave, _timeout()), content_type=CONTENT_TYPE)
+    response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,94 @@
+from django import template
+from django.utils.html import format_html
+
+from noticias.imagens import TAMANHOS
+
+register = template.Library()
+
+
+def _derivadas(noticia):
+    """[(largura, derivada)] sem larguras repetidas, da menor para a maior.
+
+    Vazio quando a imagem ainda não tem derivadas (os tags usam a original).
+    """
+    derivados = noticia.imagem_derivados or {}
+    if not noticia.imagem or derivados.get('origem') != noticia.imagem.name:
+        return []
+    por_largura = {}
+    for nome in sorted(TAMANHOS, key=TAMANHOS.get, reverse=True):
+        derivada = derivados.get('tamanhos', {}).get(nome)
+        if derivada:
+            por_largura[derivada['largura']] = derivada
+    return sorted(por_largura.items())
+
+
+def _srcset(noticia, derivadas, formato):
+    url = noticia.imagem.storage.url
+    return ', '.join(f"{url(d[formato])} {largura}w" for largura, d in derivadas if d.get(formato))
+
+
+def _escolher(derivadas, tamanho):
+    """Derivada usada como src: a do tamanho pedido ou a maior disponível abaixo dele"""
+    limite = TAMANHOS.get(tamanho, max(TAMANHOS.values()))
+    candidatas = [d for largura, d in derivadas if largura <= limite] or [derivadas[0][1]]
+    return candidatas[-1]
+
+
+@register.simple_tag
+def imagem_responsiva(noticia, tamanho='card', sizes='100vw', classe='img-fluid', carregamento='lazy'):
+    """<picture> com srcset WebP/JPEG, dimensões e placeholder borrado.
+
+    Uso: {% imagem_responsiva noticia 'card' sizes='(min-width: 768px) 33vw, 100vw' %}
+    """
+    if not noticia.imagem:
+        return ''
+    derivadas = _derivadas(noticia)
+    if not derivadas:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            noticia.imagem.url, noticia.titulo, classe, carregamento,
+        )
+
+    principal = _escolher(derivadas, tamanho)
+    fonte_webp = ''
+    srcset_webp = _srcset(noticia, derivadas, 'webp')
+    if srcset_webp:
+        fonte_webp = format_html('<source type="image/webp" srcset="{}" sizes="{}">', srcset_webp, sizes)
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" '
+        'loading="{}" decoding="async" style="background: url({}) center / cover no-repeat"></picture>',
+        fonte_webp,
+        noticia.imagem.storage.url(principal['jpeg']),
+        _srcset(noticia, derivadas, 'jpeg'),
+        sizes,
+        principal['largura'],
+        principal['altura'],
+        noticia.titulo,
+        classe,
+        carregamento,
+        noticia.imagem_derivados['placeholder'],
+    )
+
+
+@register.simple_tag
+def imagem_fundo(noticia, tamanho='hero'):
+    """Declarações CSS de background-image com a derivada (WebP via image-set, JPEG como fallback).
+
+    Uso: <div style="{% imagem_fundo noticia 'hero' %}">
+    """
+    if not noticia.imagem:
+        return ''
+    derivadas = _derivadas(noticia)
+    if not derivadas:
+        return format_html("background-image: url('{}')", noticia.imagem.url)
+
+    derivada = _escolher(derivadas, tamanho)
+    url = noticia.imagem.storage.url
+    jpeg = url(derivada['jpeg'])
+    if not derivada.get('webp'):
+        return format_html("background-image: url('{}')", jpeg)
+    return format_html(
+        "background-image: url('{}'); "
+        "background-image: image-set(url('{}') type('image/webp'), url('{}') type('image/jpeg'))",
+        jpeg, url(derivada['webp']), jpeg,
+    )
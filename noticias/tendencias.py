@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Tendências usadas offline e enquanto a primeira busca remota não termina
+TENDENCIAS_PADRAO = (
+    'tecnologia', 'política', 'economia', 'saúde', 'educação',
+    'meio ambiente', 'cultura', 'esporte', 'internacional', 'nacional',
+)
+
+
+def _consultas_google(dados):
+    """Extrai as consultas do formato dailytrends do Google"""
+    dados = dados.get('default', dados)
+    return [
+        search.get('title', {}).get('query', '')
+        for tendencia in dados.get('trendingSearchesDays', [])
+        for search in tendencia.get('trendingSearches', [])
+    ]
+
+
+class ProvedorTendencias:
+    """Interface dos provedores: obter() retorna a lista de consultas em alta"""
+
+    # Provedores remotos nunca são consultados no caminho do cálculo
+    remoto = False
+
+    def obter(self):
+        raise NotImplementedError
+
+
+class ProvedorEstatico(ProvedorTendencias):
+    def __init__(self, termos=TENDENCIAS_PADRAO):
+        self.termos = tuple(termos)
+
+    def obter(self):
+        return list(self.termos)
+
+
+class ProvedorArquivo(ProvedorTendencias):
+    """Lê um JSON (lista de termos ou formato do Google) ou um texto com um termo por linha"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def obter(self):
+        with open(self.caminho, encoding='utf-8') as arquivo:
+            conteudo = arquivo.read()
+        if self.caminho.endswith('.json'):
+            dados = json.loads(conteudo)
+            return list(dados) if isinstance(dados, list) else _consultas_google(dados)
+        return [linha.strip() for linha in conteudo.splitlines() if linha.strip()]
+
+
+class ProvedorHTTP(ProvedorTendencias):
+    """Busca as tendências diárias do Google Trends"""
+
+    remoto = True
+
+    def __init__(self, url, timeout=5, geo='BR'):
+        self.url = url
+        self.timeout = timeout
+        self.geo = geo
+
+    def obter(self):
+        import requests
+
+        resposta = requests.get(self.url, params={'geo': self.geo, 'hl': 'pt-BR'}, timeout=self.timeout)
+        resposta.raise_for_status()
+        # A API prefixa o JSON com ")]}'," para evitar JSON hijacking
+        texto = resposta.text
+        return _consultas_google(json.loads(texto[texto.find('{'):]))
+
+
+class LojaTendencias:
+    """Cache de tendências compartilhado pelo processo, com TTL.
+
+    Enquanto os dados estão válidos, termos() responde da memória. Depois do
+    TTL a versão antiga continua sendo usada e uma thread em segundo plano
+    busca a nova (stale-while-revalidate), de modo que o cálculo de relevância
+    nunca espera pela rede.
+    """
+
+    def __init__(self, provedor, ttl=3600, fallback=TENDENCIAS_PADRAO):
+        self.provedor = provedor
+        self.ttl = ttl
+        self.fallback = tuple(fallback)
+        self._termos = None
+        self._expira_em = 0.0
+        self._lock = threading.Lock()
+        self._atualizando = False
+        self.hits = 0
+        self.misses = 0
+        self.atualizacoes = 0
+        self.erros = 0
+
+    def termos(self):
+        """Tupla com as consultas em alta (a mesma tupla até a próxima atualização)"""
+        if self._termos is not None and time.monotonic() < self._expira_em:
+            self.hits += 1
+            return self._termos
+
+        self.misses += 1
+        if self._termos is None and not self.provedor.remoto:
+            # Provedor local: a primeira carga é barata e pode ser síncrona
+            self.atualizar()
+        else:
+            self._atualizar_em_segundo_plano()
+        return self._termos if self._termos is not None else self.fallback
+
+    def atualizar(self):
+        """Busca as tendências no provedor; em caso de erro mantém os termos atuais"""
+        try:
+            termos = tuple(termo for termo in self.provedor.obter() if termo)
+        except Exception as e:
+            self.erros += 1
+            print(f"Erro ao atualizar tendências: {e}")
+            with self._lock:
+                # Evita repetir a falha a cada chamada: tenta de novo em um minuto
+                self._expira_em = time.monotonic() + min(self.ttl, 60)
+            return
+        with self._lock:
+            self._termos = termos
+            self._expira_em = time.monotonic() + self.ttl
+            self.atualizacoes += 1
+
+    def _atualizar_em_segundo_plano(self):
+        with self._lock:
+            if self._atualizando:
+                return
+            self._atualizando = True
+
+        def executar():
+            try:
+                self.atualizar()
+            finally:
+                with self._lock:
+                    self._atualizando = False
+
+        threading.Thread(target=executar, name='atualizar-tendencias', daemon=True).start()
+
+    def estatisticas(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'atualizacoes': self.atualizacoes,
+            'erros': self.erros,
+            'termos': len(self._termos or ()),
+        }
+
+    def _reiniciar_apos_fork(self):
+        # O lock pode ter sido copiado travado por uma thread que não existe no filho
+        self._lock = threading.Lock()
+        self._atualizando = False
+
+
+def criar_provedor():
+    """Provedor configurado em settings.TENDENCIAS_PROVEDOR ('estatico', 'arquivo' ou 'http')"""
+    tipo = getattr(settings, 'TENDENCIAS_PROVEDOR', 'estatico')
+    if tipo == 'arquivo':
+        return ProvedorArquivo(str(settings.TENDENCIAS_ARQUIVO))
+    if tipo == 'http':
+        return ProvedorHTTP(
+            getattr(settings, 'TENDENCIAS_URL', 'https://trends.google.com/trends/api/dailytrends'),
+            timeout=getattr(settings, 'TENDENCIAS_TIMEOUT', 5),
+        )
+    return ProvedorEstatico()
+
+
+_loja = None
+_loja_lock = threading.Lock()
+
+
+def obter_loja():
+    """Loja de tendências única do processo"""
+    global _loja
+    if _loja is None:
+        with _loja_lock:
+            if _loja is None:
+                _loja = LojaTendencias(criar_provedor(), ttl=getattr(settings, 'TENDENCIAS_TTL', 3600))
+    return _loja
+
+
+def _apos_fork():
+    global _loja_lock
+    _loja_lock = threading.Lock()
+    if _loja is not None:
+        _loja._reiniciar_apos_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_apos_fork)
@@ -0,0 +1,145 @@
+import os
+import unicodedata
+from functools import lru_cache
+
+
+def _tabela_normalizacao():
+    """Tabela latin-1 -> minúscula sem acento; o que não é letra/dígito vira espaço"""
+    origem = bytes(range(256))
+    destino = bytearray()
+    for caractere in origem.decode('latin-1'):
+        if caractere.isalnum():
+            base = unicodedata.normalize('NFKD', caractere.lower())[0]
+            destino.append(ord(base) if ord(base) < 256 else ord(caractere))
+        else:
+            destino.append(ord(' '))
+    return bytes.maketrans(origem, bytes(destino))
+
+
+_TABELA = _tabela_normalizacao()
+
+# Até esta quantidade de termos cada um é procurado direto nos bytes do texto;
+# acima dela é mais barato cruzar as palavras do texto com o conjunto de termos
+_LIMITE_BUSCA_DIRETA = 32
+
+
+def preparar(texto):
+    """Normaliza o texto para o matcher: 'Saúde, Educação!' -> b' saude  educacao  '
+
+    Usa apenas operações em C (encode + translate), sem laço Python por caractere.
+    """
+    return b' ' + texto.encode('latin-1', 'replace').translate(_TABELA) + b' '
+
+
+def normalizar(texto):
+    """Minúsculas, sem acentos e sem pontuação ('Saúde!' -> 'saude')"""
+    return preparar(texto).decode('latin-1').strip()
+
+
+def _variantes(palavra):
+    """Formas de plural mais comuns do português (já sem acentos)"""
+    variantes = {palavra, palavra + b's'}
+    if palavra.endswith((b'r', b'z', b's')):
+        variantes.add(palavra + b'es')
+    if palavra.endswith((b'al', b'el', b'ol', b'ul')):
+        variantes.add(palavra[:-1] + b'is')
+    if palavra.endswith(b'ao'):
+        variantes.update((palavra[:-2] + b'oes', palavra[:-2] + b'aes'))
+    if palavra.endswith(b'm'):
+        variantes.add(palavra[:-1] + b'ns')
+    return variantes
+
+
+def radical(palavra):
+    """Radical leve de uma palavra normalizada: remove as formas de plural.
+
+    É o inverso aproximado de `_variantes` ('noticias' -> 'noticia',
+    'eleicoes' -> 'eleicao', 'nacionais' -> 'nacional', 'homens' -> 'homem').
+    """
+    if len(palavra) <= 4:
+        return palavra
+    if palavra.endswith(('oes', 'aes')):
+        return palavra[:-3] + 'ao'
+    if palavra.endswith(('ais', 'eis', 'ois', 'uis')) and len(palavra) > 5:
+        return palavra[:-2] + 'l'
+    if palavra.endswith('ns'):
+        return palavra[:-2] + 'm'
+    if palavra.endswith(('res', 'zes')):
+        return palavra[:-2]
+    if palavra.endswith(('as', 'es', 'os')):
+        return palavra[:-1]
+    return palavra
+
+
+def _ocorre(buffer, raiz, sufixos):
+    """Procura `raiz` no início de uma palavra, seguida de um dos sufixos e de espaço"""
+    inicio = buffer.find(raiz)
+    while inicio != -1:
+        if buffer[inicio - 1] == 32:
+            fim = inicio + len(raiz)
+            if buffer[fim:buffer.index(b' ', fim)] in sufixos:
+                return True
+        inicio = buffer.find(raiz, inicio + 1)
+    return False
+
+
+class MatcherTermos:
+    """Localiza um conjunto fixo de termos em textos, sem diferenciar acentos ou maiúsculas.
+
+    Um termo casa com palavras inteiras do texto ou com suas formas de plural:
+    'esporte' casa com 'esportes', mas 'nacional' não casa com 'internacional'.
+    O texto é normalizado uma única vez (veja `preparar`); com poucos termos
+    cada raiz é procurada direto nos bytes, com muitos termos as palavras do
+    texto são cruzadas com o conjunto de variantes.
+    """
+
+    def __init__(self, termos):
+        self.termos = frozenset(termos)
+        self._originais = {}
+        self._buscas = []
+        self._frases = []
+        for termo in sorted(self.termos):
+            partes = preparar(termo).split()
+            if len(partes) == 1:
+                variantes = _variantes(partes[0])
+                for variante in variantes:
+                    self._originais.setdefault(variante, set()).add(termo)
+                raiz = os.path.commonprefix(sorted(variantes))
+                self._buscas.append((termo, raiz, frozenset(v[len(raiz):] for v in variantes)))
+            elif partes:
+                self._frases.append((termo, b' '.join(partes), frozenset([b''])))
+        self._simples = frozenset(self._originais)
+        self._busca_direta = len(self._buscas) <= _LIMITE_BUSCA_DIRETA
+
+    def encontrar(self, texto):
+        """Conjunto dos termos (na grafia original) presentes no texto.
+
+        Aceita o texto original ou o resultado de `preparar`.
+        """
+        if not texto:
+            return set()
+        buffer = texto if isinstance(texto, bytes) else preparar(texto)
+
+        encontrados = set()
+        if self._busca_direta:
+            for termo, raiz, sufixos in self._buscas:
+                if _ocorre(buffer, raiz, sufixos):
+                    encontrados.add(termo)
+        else:
+            for variante in self._simples.intersection(buffer.split()):
+                encontrados.update(self._originais[variante])
+
+        for termo, frase, sufixos in self._frases:
+            if _ocorre(buffer, frase, sufixos):
+                encontrados.add(termo)
+        return encontrados
+
+
+@lru_cache(maxsize=8)
+def _matcher(termos):
+    return MatcherTermos(termos)
+
+
+def obter_matcher(termos):
+    """Matcher compartilhado no processo; só é reconstruído quando o conjunto de termos muda"""
+    return _matcher(frozenset(termos))
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from PIL import Image
+
+from . import cache as cache_paginas
+from . import fila, imagens, midia, relacionadas, sitemaps
+from .busca import BuscaService
+from .models import Noticia, NoticiaPalavraChave, NoticiaRelacionada, PalavraChave, TarefaRelevancia
+from .paginacao import PaginadorCursor, decodificar_cursor
+from .services import RelevanciaService
+
+SEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def criar_noticia(titulo='Notícia', resumo='Resumo', conteudo='Conteúdo', **campos):
+    campos.setdefault('imagem', 'noticias/teste.jpg')
+    # O arquivo não existe: marca as derivadas como já geradas para o sinal não tentar abri-lo
+    campos.setdefault('imagem_derivados', {'origem': campos['imagem']})
+    return Noticia.objects.create(titulo=titulo, resumo=resumo, conteudo=conteudo, **campos)
+
+
+@override_settings(CACHES=SEM_CACHE)
+class BuscaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.no_titulo = criar_noticia('Economia em alta', conteudo='Mercado reage bem.')
+        cls.no_texto = criar_noticia('Mercado', conteudo='O setor de economia cresceu no trimestre.')
+        cls.casamento = criar_noticia('Casamento real', conteudo='Festa no palácio.')
+
+    def buscar(self, consulta):
+        return list(BuscaService().buscar(Noticia.objects.all(), consulta).order_by('-busca_rank'))
+
+    def test_consulta_sem_termos_nao_quebra_as_paginas(self):
+        for consulta in ('"', '!', 'de a o'):
+            with self.subTest(consulta=consulta):
+                self.assertEqual(self.client.get(reverse('noticias:lista_noticias'), {'q': consulta}).status_code, 200)
+                self.assertEqual(self.client.get(reverse('noticias:api_busca'), {'q': consulta}).status_code, 200)
+
+    def test_consulta_sem_termos_e_vazia_e_anotada(self):
+        resultado = BuscaService().buscar(Noticia.objects.all(), '!')
+        self.assertEqual(list(resultado.order_by('-busca_rank')), [])
+
+    def test_ordena_por_relevancia(self):
+        self.assertEqual(self.buscar('economia'), [self.no_titulo, self.no_texto])
+
+    def test_termos_combinados_com_e(self):
+        self.assertEqual(self.buscar('economia trimestre'), [self.no_texto])
+
+    def test_prefixo_so_a_partir_de_tres_letras(self):
+        self.assertEqual(self.buscar('cas'), [self.casamento])
+        self.assertEqual(self.buscar('ca'), [])
+
+    def test_ignora_stopwords(self):
+        self.assertEqual(BuscaService().termos('O setor de Economia'), ['setor', 'economia'])
+
+    def test_busca_na_lista_usa_indice_atualizado(self):
+        noticia = criar_noticia('Outro título', data_publicacao=timezone.now() - timedelta(days=1))
+        noticia.titulo = 'Eleições municipais'
+        noticia.save()
+        response = self.client.get(reverse('noticias:lista_noticias'), {'q': 'eleicoes'})
+        self.assertContains(response, 'Eleições municipais')
+
+
+class RelacionadasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.palavras = {nome: PalavraChave.objects.create(radical=nome, rotulo=nome) for nome in 'abcdef'}
+        vetores = ['ab', 'abc', 'bcd', 'cde', 'def', 'ef']
+        self.noticias = [criar_noticia(f'Notícia {i}') for i in range(len(vetores))]
+        for noticia, termos in zip(self.noticias, vetores):
+            self.definir(noticia, termos)
+
+    def definir(self, noticia, termos):
+        NoticiaPalavraChave.objects.filter(noticia=noticia).delete()
+        NoticiaPalavraChave.objects.bulk_create(
+            NoticiaPalavraChave(noticia=noticia, palavra=self.palavras[termo], peso=1.0) for termo in termos
+        )
+
+    def tabela(self):
+        return list(NoticiaRelacionada.objects.order_by('origem', 'posicao').values_list('origem_id', 'destino_id'))
+
+    def test_atualizacao_incremental_igual_a_reconstrucao(self):
+        relacionadas.reconstruir()
+        self.definir(self.noticias[0], 'ef')
+        relacionadas.atualizar_noticia(self.noticias[0].pk)
+        incremental = self.tabela()
+        relacionadas.reconstruir()
+        self.assertEqual(incremental, self.tabela())
+
+    def test_despublicada_sai_das_listas(self):
+        relacionadas.reconstruir()
+        Noticia.objects.filter(pk=self.noticias[1].pk).update(publicada=False)
+        relacionadas.atualizar_noticia(self.noticias[1].pk)
+        self.assertFalse(NoticiaRelacionada.objects.filter(destino=self.noticias[1]).exists())
+        self.assertFalse(NoticiaRelacionada.objects.filter(origem=self.noticias[1]).exists())
+
+
+class PaginacaoCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        agora = timezone.now()
+        # Três notícias com a mesma data: o id desempata
+        datas = [agora, agora - timedelta(hours=1), agora - timedelta(hours=1), agora - timedelta(hours=1),
+                 agora - timedelta(hours=2), agora - timedelta(hours=3), agora - timedelta(hours=4)]
+        for i, data in enumerate(datas):
+            criar_noticia(f'Notícia {i}', data_publicacao=data)
+        cls.ordem = list(Noticia.objects.order_by('-data_publicacao', '-id').values_list('pk', flat=True))
+
+    def setUp(self):
+        self.paginador = PaginadorCursor(Noticia.objects.all(), por_pagina=2)
+
+    def ids(self, pagina):
+        return [noticia.pk for noticia in pagina]
+
+    def test_avanca_e_volta_com_empates(self):
+        paginas = [self.paginador.pagina()]
+        while paginas[-1].tem_proxima:
+            paginas.append(self.paginador.pagina(paginas[-1].token_proxima))
+        self.assertEqual([pk for pagina in paginas for pk in self.ids(pagina)], self.ordem)
+        self.assertFalse(paginas[0].tem_anterior)
+
+        pagina = paginas[-1]
+        for esperada in reversed(paginas[:-1]):
+            pagina = self.paginador.pagina(pagina.token_anterior)
+            self.assertEqual(self.ids(pagina), self.ids(esperada))
+        self.assertFalse(pagina.tem_anterior)
+
+    def test_cursor_invalido(self):
+        for token in ('lixo', 'eDoxOjI', '!!!'):
+            with self.subTest(token=token):
+                with self.assertRaises(Http404):
+                    decodificar_cursor(token)
+
+    @override_settings(CACHES=SEM_CACHE)
+    def test_cursor_invalido_na_lista_e_404(self):
+        response = self.client.get(reverse('noticias:lista_noticias'), {'cursor': 'lixo'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=SEM_CACHE)
+class SitemapTests(TestCase):
+    def test_mes_fora_do_intervalo_e_404(self):
+        for caminho in ('/sitemap-0000-01.xml', '/sitemap-0001-01.xml', '/sitemap-9999-12.xml',
+                        '/sitemap-2024-13.xml', '/sitemap-2024-00.xml', '/sitemap-2024-01-0.xml'):
+            with self.subTest(caminho=caminho):
+                self.assertEqual(self.client.get(caminho).status_code, 404)
+
+    def test_mes_com_noticias(self):
+        noticia = criar_noticia()
+        ano, mes = sitemaps.particao(noticia.data_publicacao)
+        response = self.client.get(f'/sitemap-{ano:04d}-{mes:02d}.xml')
+        self.assertIn(noticia.get_absolute_url(), b''.join(response.streaming_content).decode())
+
+
+class FilaRelevanciaTests(TestCase):
+    def setUp(self):
+        self.noticia = criar_noticia()
+        TarefaRelevancia.objects.all().delete()
+
+    def test_sem_worker_processa_ao_fim_da_transacao(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            noticia = criar_noticia('Economia em alta')
+        self.assertFalse(TarefaRelevancia.objects.exists())
+        noticia.refresh_from_db()
+        self.assertFalse(noticia.relevancia_pendente)
+
+    @override_settings(RELEVANCIA_WORKER=True)
+    def test_com_worker_so_enfileira(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            fila.enfileirar(self.noticia.pk)
+        self.assertEqual(callbacks, [])
+        self.assertTrue(TarefaRelevancia.objects.filter(noticia=self.noticia).exists())
+
+    def test_enfileirar_agrupa_e_renova(self):
+        fila.enfileirar(self.noticia.pk)
+        TarefaRelevancia.objects.update(tentativas=3, solicitada_em=timezone.now() - timedelta(hours=1))
+        fila.enfileirar(self.noticia.pk)
+        tarefa = TarefaRelevancia.objects.get()
+        self.assertEqual(tarefa.tentativas, 0)
+        self.assertGreater(tarefa.solicitada_em, timezone.now() - timedelta(minutes=1))
+
+    def test_reserva_nao_e_pega_de_novo(self):
+        fila.enfileirar(self.noticia.pk)
+        self.assertEqual(len(fila._reservar(10)), 1)
+        self.assertEqual(fila._reservar(10), [])
+        # Reserva vencida: o worker que a pegou morreu
+        TarefaRelevancia.objects.update(reservada_ate=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(len(fila._reservar(10)), 1)
+
+    def test_processar_remove_a_tarefa(self):
+        fila.enfileirar(self.noticia.pk)
+        self.assertEqual(fila.processar(), (1, 0))
+        self.assertFalse(TarefaRelevancia.objects.exists())
+        self.noticia.refresh_from_db()
+        self.assertFalse(self.noticia.relevancia_pendente)
+
+    def test_edicao_durante_o_calculo_volta_para_a_fila(self):
+        fila.enfileirar(self.noticia.pk)
+        calcular = Noticia.calcular_relevancia
+
+        def editar_durante(noticia):
+            calcular(noticia)
+            fila.enfileirar(noticia.pk)
+
+        with mock.patch.object(Noticia, 'calcular_relevancia', editar_durante):
+            self.assertEqual(fila.processar(), (1, 0))
+        tarefa = TarefaRelevancia.objects.get()
+        self.assertIsNone(tarefa.reservada_ate)
+
+    def test_palavras_gravadas_antes_do_post_save(self):
+        noticia = criar_noticia('Economia em alta', conteudo='Mercado e economia crescem.')
+        vistas = []
+
+        def registrar(sender, instance, **kwargs):
+            vistas.append(NoticiaPalavraChave.objects.filter(noticia=instance).exists())
+
+        post_save.connect(registrar, sender=Noticia)
+        self.addCleanup(post_save.disconnect, registrar, sender=Noticia)
+        noticia.calcular_relevancia()
+        self.assertEqual(vistas, [True])
+
+    def test_falha_adia_nova_tentativa(self):
+        fila.enfileirar(self.noticia.pk)
+        with mock.patch.object(Noticia, 'calcular_relevancia', side_effect=RuntimeError('falhou')):
+            self.assertEqual(fila.processar(), (0, 1))
+        tarefa = TarefaRelevancia.objects.get()
+        self.assertEqual((tarefa.tentativas, tarefa.erro), (1, 'falhou'))
+        self.assertEqual(fila._reservar(10), [])
+
+
+class MetricasAcessoTests(TestCase):
+    url = '/metrics'
+
+    def test_anonimo_local_bloqueado_por_padrao(self):
+        # Atrás de um Nginx no mesmo host todas as requisições vêm de 127.0.0.1
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+
+    def test_staff(self):
+        self.client.force_login(get_user_model().objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_usuario_comum_bloqueado(self):
+        self.client.force_login(get_user_model().objects.create_user('leitor'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    @override_settings(METRICAS_TOKEN='segredo')
+    def test_token(self):
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer segredo').status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer errado').status_code, 403)
+
+    @override_settings(METRICAS_IPS_PERMITIDOS=['10.0.0.5'])
+    def test_ip_permitido(self):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.0.0.5').status_code, 200)
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR='10.0.0.6').status_code, 403)
+
+
+class DataAtualizacaoTests(TestCase):
+    def setUp(self):
+        self.noticia = criar_noticia()
+        self.antes = timezone.now() - timedelta(days=1)
+        Noticia.objects.filter(pk=self.noticia.pk).update(data_atualizacao=self.antes)
+        self.noticia.refresh_from_db()
+
+    def data(self):
+        return Noticia.objects.values_list('data_atualizacao', flat=True).get(pk=self.noticia.pk)
+
+    def test_campos_internos_nao_atualizam(self):
+        self.noticia.publicada = False
+        self.noticia.save(update_fields=['publicada'])
+        self.assertEqual(self.data(), self.antes)
+
+    def test_campos_editoriais_atualizam(self):
+        self.noticia.titulo = 'Novo título'
+        self.noticia.save(update_fields=['titulo'])
+        self.assertGreater(self.data(), self.antes)
+
+    def test_update_fields_vazio_nao_grava(self):
+        with self.assertNumQueries(0):
+            self.noticia.save(update_fields=[])
+
+
+class DerivadosImagemTests(TestCase):
+    def test_falha_vai_para_o_log(self):
+        with self.assertLogs('noticias.imagens', 'ERROR') as registro:
+            noticia = criar_noticia(imagem_derivados={})
+        self.assertIn(f'notícia {noticia.pk}', registro.output[0])
+
+
+class DerivadasImutaveisTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+
+    def gravar_imagem(self, cor):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600), cor).save(buffer, 'JPEG')
+        nome = 'noticias/foto.jpg'
+        if default_storage.exists(nome):
+            default_storage.delete(nome)
+        return default_storage.save(nome, ContentFile(buffer.getvalue()))
+
+    def caminhos(self, noticia):
+        return sorted(imagens._arquivos(noticia.imagem_derivados))
+
+    def test_nome_muda_com_o_conteudo(self):
+        noticia = criar_noticia(imagem=self.gravar_imagem('red'), imagem_derivados={})
+        antes = self.caminhos(noticia)
+        self.assertTrue(antes)
+        self.assertTrue(all(midia._cache_control(caminho).endswith('immutable') for caminho in antes))
+
+        # Regerar com os mesmos bytes mantém os nomes
+        imagens.atualizar_derivados(noticia, forcar=True)
+        self.assertEqual(self.caminhos(noticia), antes)
+
+        # Imagem substituída sob o mesmo nome: derivadas novas, as antigas apagadas
+        self.gravar_imagem('blue')
+        imagens.atualizar_derivados(noticia, forcar=True)
+        depois = self.caminhos(noticia)
+        self.assertFalse(set(antes) & set(depois))
+        self.assertFalse(any(default_storage.exists(caminho) for caminho in antes))
+
+    def test_comando_invalida_paginas_da_noticia(self):
+        noticia = criar_noticia(imagem=self.gravar_imagem('red'))
+        antes = timezone.now() - timedelta(days=1)
+        Noticia.objects.filter(pk=noticia.pk).update(data_atualizacao=antes)
+        tags = [cache_paginas.tag_noticia(noticia.pk), sitemaps.tag_particao(*sitemaps.particao(noticia.data_publicacao))]
+        versoes = cache_paginas.versao_por_tag(tags)
+
+        call_command('gerar_derivados_imagens', '--forcar', stdout=io.StringIO())
+
+        noticia.refresh_from_db()
+        self.assertEqual(noticia.imagem_derivados['origem'], noticia.imagem.name)
+        self.assertEqual(noticia.data_atualizacao, antes)
+        novas = cache_paginas.versao_por_tag(tags)
+        for tag in tags:
+            self.assertGreater(novas[tag], versoes[tag])
+
+    def test_so_derivadas_com_hash_sao_imutaveis(self):
+        for caminho in ('noticias/casa_praia01.jpg', 'noticias/foto_AbC1234.png',
+                        'noticias/derivados/foto-png-card.webp'):
+            with self.subTest(caminho=caminho):
+                self.assertNotIn('immutable', midia._cache_control(caminho))
+
+
+class ReprocessarTests(TestCase):
+    def test_nao_muda_data_atualizacao(self):
+        noticia = criar_noticia('Economia e mercado', conteudo='Mercado de ações sobe.')
+        antes = timezone.now() - timedelta(days=1)
+        Noticia.objects.filter(pk=noticia.pk).update(data_atualizacao=antes, relevancia_pendente=True)
+        RelevanciaService().atualizar_relevancia_todas(workers=1)
+        noticia.refresh_from_db()
+        self.assertFalse(noticia.relevancia_pendente)
+        self.assertEqual(noticia.data_atualizacao, antes)
@@ -1,13 +1,37 @@
-from django.urls import path
-from . import views
+from django.conf import settings
+from django.urls import path, re_path
+from . import api, feeds, metricas, sitemaps, views
+
+if getattr(settings, 'NOTICIAS_VIEWS_ASYNC', False):
+    # Perfil ASGI: páginas públicas com o ORM assíncrono
+    from . import views_async as paginas
+else:
+    paginas = views
 
 app_name = 'noticias'
 
 urlpatterns = [
     # URLs públicas
-    path('', views.home, name='home'),
-    path('noticias/', views.NoticiaListView.as_view(), name='lista_noticias'),
-    path('noticia/<int:pk>/', views.NoticiaDetailView.as_view(), name='noticia_detalhe'),
+    path('', paginas.home, name='home'),
+    path('noticias/', paginas.NoticiaListView.as_view(), name='lista_noticias'),
+    path('noticia/<int:pk>/', paginas.NoticiaDetailView.as_view(), name='noticia_detalhe'),
+    path('feed/rss/', feeds.feed, {'formato': 'rss'}, name='feed_rss'),
+    path('feed/atom/', feeds.feed, {'formato': 'atom'}, name='feed_atom'),
+    path('feed/json/', feeds.feed, {'formato': 'json'}, name='feed_json'),
+    path('sitemap.xml', sitemaps.indice, name='sitemap'),
+    re_path(r'^sitemap-(?P<ano>\d{4})-(?P<mes>\d{2})\.xml$', sitemaps.sitemap_mes, name='sitemap_mes'),
+    re_path(
+        r'^sitemap-(?P<ano>\d{4})-(?P<mes>\d{2})-(?P<pagina>\d+)\.xml$',
+        sitemaps.sitemap_mes, name='sitemap_mes_pagina',
+    ),
+    
+    # Métricas para o Prometheus (staff, METRICAS_TOKEN ou METRICAS_IPS_PERMITIDOS)
+    path('metrics', metricas.metricas, name='metricas'),
+    
+    # API JSON somente leitura
+    path('api/noticias/', api.lista, name='api_lista'),
+    path('api/noticias/busca/', api.busca, name='api_busca'),
+    path('api/noticias/<int:pk>/', api.detalhe, name='api_detalhe'),
     
     # URLs do painel administrativo personalizado
     path('painel/login/', views.login_admin, name='login_admin'),
@@ -1,64 +1,148 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import aget_object_or_404, render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.http import HttpResponseRedirect
 from django.urls import reverse
-from django.db.models import Q
-from .models import Noticia
+from django.conf import settings
+from django.utils.decorators import method_decorator
+from .models import Noticia, PalavraChave
 from .forms import NoticiaForm
+from . import contadores
+from .busca import BuscaService
+from .cache import TAG_LISTAS, cache_publico, condicional_publico, tag_noticia
+from .paginacao import PaginadorCursor
+from .palavras import buscar_palavra
 from django.utils import timezone
 
+
+def _tags_listas(request, **kwargs):
+    return [TAG_LISTAS]
+
+
+def _tags_detalhe(request, pk, **kwargs):
+    # A página de detalhe também exibe as notícias relacionadas
+    return [TAG_LISTAS, tag_noticia(pk)]
+
+
+def _aplicar_filtros(palavra, q):
+    queryset = Noticia.objects.publicadas().cards()
+
+    # Filtro por palavra-chave pela tabela normalizada (índice palavra -> notícia)
+    if palavra:
+        queryset = queryset.filter(palavras__palavra=palavra)
+
+    # Pesquisa pelo índice full-text, ordenada por relevância
+    if q:
+        queryset = BuscaService().buscar(queryset, q)
+        return queryset.order_by('-busca_rank', '-data_publicacao')
+
+    return queryset.order_by('-data_publicacao')
+
+
+def filtrar_noticias(parametros):
+    """Queryset público da listagem (também usado pela API): (queryset, palavra).
+
+    Aplica o filtro ?palavra= e a busca ?q= dos parâmetros da requisição.
+    """
+    palavra = None
+    if parametros.get('palavra'):
+        palavra = get_object_or_404(PalavraChave, radical=buscar_palavra(parametros['palavra']))
+    return _aplicar_filtros(palavra, parametros.get('q')), palavra
+
+
+async def afiltrar_noticias(parametros):
+    """filtrar_noticias() para views assíncronas"""
+    palavra = None
+    if parametros.get('palavra'):
+        palavra = await aget_object_or_404(PalavraChave, radical=buscar_palavra(parametros['palavra']))
+    return _aplicar_filtros(palavra, parametros.get('q')), palavra
+
+
+@method_decorator(condicional_publico(_tags_listas), name='dispatch')
+@method_decorator(cache_publico(_tags_listas), name='dispatch')
 class NoticiaListView(ListView):
     model = Noticia
     template_name = 'noticias/lista_noticias.html'
     context_object_name = 'noticias'
     paginate_by = 10
 
+    def get_paginate_by(self, queryset):
+        return getattr(settings, 'NOTICIAS_POR_PAGINA', self.paginate_by)
+
+    def paginate_queryset(self, queryset, page_size):
+        # A busca é ordenada por relevância e continua com páginas numeradas;
+        # a listagem completa usa cursor em (data_publicacao, id)
+        if self.request.GET.get('q') or getattr(settings, 'NOTICIAS_PAGINACAO', 'cursor') != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+
+        paginador = PaginadorCursor(
+            queryset, page_size, contar=getattr(settings, 'NOTICIAS_CONTAGEM_APROXIMADA', True),
+        )
+        self.pagina_cursor = paginador.pagina(self.request.GET.get('cursor'))
+        return None, None, self.pagina_cursor.itens, False
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['pagina_cursor'] = getattr(self, 'pagina_cursor', None)
+        context['palavra'] = self.palavra
+        return context
+
     def get_queryset(self):
-        queryset = Noticia.objects.filter(publicada=True)
-        
-        # Implementar pesquisa
-        q = self.request.GET.get('q')
-        if q:
-            queryset = queryset.filter(
-                Q(titulo__icontains=q) |
-                Q(resumo__icontains=q) |
-                Q(conteudo__icontains=q)
-            )
-        
-        return queryset.order_by('-data_publicacao')
+        queryset, self.palavra = filtrar_noticias(self.request.GET)
+        return queryset
 
+@method_decorator(condicional_publico(_tags_detalhe), name='dispatch')
+@method_decorator(cache_publico(_tags_detalhe), name='dispatch')
 class NoticiaDetailView(DetailView):
     model = Noticia
     template_name = 'noticias/detalhe_noticia.html'
     context_object_name = 'noticia'
 
     def get_queryset(self):
-        return Noticia.objects.filter(publicada=True)
+        return Noticia.objects.publicadas()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Adicionar notícias relacionadas (excluindo a atual)
-        context['noticias_relacionadas'] = Noticia.objects.filter(
-            publicada=True
-        ).exclude(
-            id=self.object.id
-        ).order_by('-data_publicacao')[:3]
+        precalculadas, recentes, palavras = consultas_detalhe(self.object)
+        relacionadas = list(precalculadas)
+        if not relacionadas:
+            relacionadas = recentes
+        context['noticias_relacionadas'] = relacionadas
+        context['palavras'] = palavras
         return context
 
-def home(request):
+
+def consultas_detalhe(noticia):
+    """(relacionadas, alternativa, palavras) da página de detalhe, ainda não executadas"""
+    # Vizinhos pré-calculados por palavras-chave (noticias/relacionadas.py)
+    precalculadas = Noticia.objects.publicadas().cards().filter(
+        relacionada_a__origem=noticia
+    ).order_by('relacionada_a__posicao')[:3]
+    # Ainda não calculadas (notícia recém-criada): as mais recentes
+    recentes = Noticia.objects.publicadas().cards().exclude(
+        id=noticia.id
+    ).order_by('-data_publicacao')[:3]
+    return precalculadas, recentes, noticia.palavras.select_related('palavra')
+
+
+def consultas_home():
+    """(destaques, recentes) da página inicial, ainda não executadas"""
     # Buscar notícias em destaque (marcadas manualmente como destaque)
-    noticias_destaque = Noticia.objects.filter(
-        publicada=True,
+    noticias_destaque = Noticia.objects.publicadas().cards().filter(
         destaque=True
     ).order_by('-data_publicacao')[:3]
-    
+
     # Buscar notícias recentes (todas as mais recentes, incluindo novas)
-    noticias_recentes = Noticia.objects.filter(
-        publicada=True
-    ).order_by('-data_publicacao')[:6]
+    noticias_recentes = Noticia.objects.publicadas().cards().order_by('-data_publicacao')[:6]
+    return noticias_destaque, noticias_recentes
+
+
+@condicional_publico(_tags_listas)
+@cache_publico(_tags_listas)
+def home(request):
+    noticias_destaque, noticias_recentes = consultas_home()
     
     context = {
         'noticias_destaque': noticias_destaque,
@@ -101,16 +185,19 @@ def painel_admin(request):
         messages.error(request, 'Você não tem permissão para acessar o painel administrativo.')
         return redirect('noticias:home')
     
-    noticias = Noticia.objects.all().order_by('-data_publicacao')
-    total_noticias = noticias.count()
-    noticias_publicadas = noticias.filter(publicada=True).count()
-    noticias_rascunho = noticias.filter(publicada=False).count()
+    # Só as colunas exibidas na tabela
+    noticias = Noticia.objects.only(
+        'id', 'titulo', 'publicada', 'destaque', 'relevancia_score', 'data_publicacao',
+    ).order_by('-data_publicacao')
+    # Contadores materializados: tempo constante, independente do tamanho do acervo
+    estatisticas = contadores.estatisticas()
     
     context = {
         'noticias': noticias[:10],  # Últimas 10 notícias
-        'total_noticias': total_noticias,
-        'noticias_publicadas': noticias_publicadas,
-        'noticias_rascunho': noticias_rascunho,
+        'total_noticias': estatisticas['total'],
+        'noticias_publicadas': estatisticas['publicadas'],
+        'noticias_rascunho': estatisticas['rascunhos'],
+        'estatisticas': estatisticas,
     }
     return render(request, 'noticias/painel_admin.html', context)
 
@@ -122,12 +209,10 @@ def criar_noticia(request):
             noticia = form.save(commit=False)
             noticia.data_publicacao = timezone.now()  # Define a data automaticamente
             noticia.publicada = True  # Por padrão, publica a notícia
+            # A relevância é calculada pela fila (manage.py processar_relevancia)
             noticia.save()
             
-            # Calcula relevância automaticamente
-            noticia.calcular_relevancia()
-            
-            messages.success(request, f'Notícia "{noticia.titulo}" criada com sucesso! Score de relevância: {noticia.relevancia_score}/10')
+            messages.success(request, f'Notícia "{noticia.titulo}" criada com sucesso! O score de relevância será calculado em instantes.')
             return redirect('noticias:painel_admin')
     else:
         form = NoticiaForm()
@@ -143,10 +228,8 @@ def editar_noticia(request, pk):
         if form.is_valid():
             noticia = form.save()  # Não altera a data de publicação
             
-            # Recalcula relevância
-            noticia.calcular_relevancia()
-            
-            messages.success(request, f'Notícia "{noticia.titulo}" atualizada com sucesso! Score de relevância: {noticia.relevancia_score}/10')
+            # Se o texto mudou, a relevância é recalculada pela fila
+            messages.success(request, f'Notícia "{noticia.titulo}" atualizada com sucesso!')
             return redirect('noticias:painel_admin')
     else:
         form = NoticiaForm(instance=noticia)
@@ -186,7 +269,8 @@ def toggle_publicacao(request, pk):
     
     noticia = get_object_or_404(Noticia, pk=pk)
     noticia.publicada = not noticia.publicada
-    noticia.save()
+    # Os sinais ajustam os contadores do painel e o cache das páginas
+    noticia.save(update_fields=['publicada'])
     
     status = "publicada" if noticia.publicada else "despublicada"
     messages.success(request, f'Notícia "{noticia.titulo}" {status} com sucesso!')
@@ -0,0 +1,111 @@
+"""
+Versões assíncronas das páginas públicas (home, lista e detalhe) para o perfil ASGI.
+
+Com NOTICIAS_VIEWS_ASYNC (portal_noticias/settings_asgi.py) as URLs públicas
+apontam para estas views. Elas montam os mesmos querysets das views síncronas,
+executam tudo pelo ORM assíncrono antes de renderizar (o template roda no
+event loop e não pode consultar o banco) e passam pelos mesmos decorators de
+cache e GET condicional.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, render
+from django.utils.decorators import method_decorator
+from django.views import View
+
+from .cache import cache_publico, condicional_publico
+from .models import Noticia
+from .paginacao import PaginadorCursor
+from .views import _tags_detalhe, _tags_listas, afiltrar_noticias, consultas_detalhe, consultas_home
+
+
+async def _listar(queryset):
+    return [item async for item in queryset.aiterator()]
+
+
+def _executar_e_liberar(queryset):
+    try:
+        return list(queryset)
+    finally:
+        # Fora da thread da requisição o request_finished não fecha a conexão:
+        # aplica aqui a mesma política de CONN_MAX_AGE
+        close_old_connections()
+
+
+def _em_paralelo(queryset):
+    # O ORM assíncrono executa as consultas de uma requisição em uma única
+    # thread, uma depois da outra; no executor padrão cada consulta usa a
+    # conexão da sua thread e elas de fato se sobrepõem
+    return sync_to_async(_executar_e_liberar, thread_sensitive=False)(queryset)
+
+
+@condicional_publico(_tags_listas)
+@cache_publico(_tags_listas)
+async def home(request):
+    destaques, recentes = consultas_home()
+    noticias_destaque, noticias_recentes = await asyncio.gather(_em_paralelo(destaques), _em_paralelo(recentes))
+    return render(request, 'noticias/home.html', {
+        'noticias_destaque': noticias_destaque,
+        'noticias_recentes': noticias_recentes,
+    })
+
+
+async def _pagina_numerada(queryset, por_pagina, numero):
+    """Page do Paginator com a contagem e os itens buscados pelo ORM assíncrono"""
+    paginador = Paginator(queryset, por_pagina)
+    # count é uma cached_property: preenchida aqui, o Paginator não consulta o banco
+    paginador.count = await queryset.acount()
+    try:
+        pagina = paginador.page(paginador.num_pages if numero == 'last' else int(numero))
+    except (ValueError, InvalidPage):
+        raise Http404('Página inválida')
+    pagina.object_list = await _listar(pagina.object_list)
+    return pagina
+
+
+@method_decorator(condicional_publico(_tags_listas), name='get')
+@method_decorator(cache_publico(_tags_listas), name='get')
+class NoticiaListView(View):
+    template_name = 'noticias/lista_noticias.html'
+
+    async def get(self, request, *args, **kwargs):
+        queryset, palavra = await afiltrar_noticias(request.GET)
+        por_pagina = getattr(settings, 'NOTICIAS_POR_PAGINA', 10)
+        context = {'palavra': palavra, 'pagina_cursor': None, 'page_obj': None, 'is_paginated': False}
+
+        # Mesma regra da NoticiaListView: busca e paginação 'offset' usam páginas numeradas
+        if request.GET.get('q') or getattr(settings, 'NOTICIAS_PAGINACAO', 'cursor') != 'cursor':
+            pagina = await _pagina_numerada(queryset, por_pagina, request.GET.get('page') or 1)
+            context.update(
+                noticias=pagina.object_list, page_obj=pagina, paginator=pagina.paginator,
+                is_paginated=pagina.has_other_pages(),
+            )
+        else:
+            paginador = PaginadorCursor(
+                queryset, por_pagina, contar=getattr(settings, 'NOTICIAS_CONTAGEM_APROXIMADA', True),
+            )
+            pagina_cursor = await paginador.apagina(request.GET.get('cursor'))
+            context.update(noticias=pagina_cursor.itens, pagina_cursor=pagina_cursor)
+        return render(request, self.template_name, context)
+
+
+@method_decorator(condicional_publico(_tags_detalhe), name='get')
+@method_decorator(cache_publico(_tags_detalhe), name='get')
+class NoticiaDetailView(View):
+    template_name = 'noticias/detalhe_noticia.html'
+
+    async def get(self, request, pk, *args, **kwargs):
+        noticia = await aget_object_or_404(Noticia.objects.publicadas(), pk=pk)
+        precalculadas, recentes, palavras = consultas_detalhe(noticia)
+        relacionadas = await _listar(precalculadas) or await _listar(recentes)
+        return render(request, self.template_name, {
+            'noticia': noticia,
+            'object': noticia,
+            'noticias_relacionadas': relacionadas,
+            'palavras': await _listar(palavras),
+        })
@@ -0,0 +1,11 @@
+"""
+ASGI config for portal_noticias project for Render deployment.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portal_noticias.settings_asgi')
+
+application = get_asgi_application()
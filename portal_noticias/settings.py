@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,11 +42,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'noticias.metricas.MetricasMiddleware',
+    'noticias.instrumentacao.InstrumentacaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'noticias.banco.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'noticias.perfil.PerfilMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,9 +83,80 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Transações de escrita pegam o lock no BEGIN e esperam o busy_timeout,
+        # em vez de falhar com 'database is locked' ao passar de leitura a escrita
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# Cada conexão SQLite recebe WAL, synchronous=NORMAL, mmap, cache e
+# busy_timeout (noticias/banco.py); SQLITE_PRAGMAS sobrescreve valores
+SQLITE_PRAGMAS = {}
+
+# Réplica de leitura (BANCO_REPLICAS + noticias.banco.RoteadorReplica): só nos
+# settings de produção, com SQLITE_REPLICA=1 ou DATABASE_REPLICA_URL
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portal-noticias',
+    }
+}
+
+# Tempo (s) das páginas públicas em cache para visitantes anônimos
+CACHE_PAGINAS_TIMEOUT = 60 * 15
+
+# Listagem de notícias: 'cursor' (keyset em data_publicacao/id) ou 'offset' (?page=N)
+NOTICIAS_PAGINACAO = 'cursor'
+NOTICIAS_POR_PAGINA = 10
+
+# True quando há um processo rodando `manage.py processar_relevancia`; sem ele
+# a relevância de cada notícia salva é calculada ao fim da própria requisição
+RELEVANCIA_WORKER = False
+
+# Tendências usadas no cálculo de relevância: 'estatico', 'arquivo'
+# (TENDENCIAS_ARQUIVO) ou 'http' (Google Trends, atualizado em segundo plano)
+TENDENCIAS_PROVEDOR = 'estatico'
+TENDENCIAS_TTL = 60 * 60
+
+# Instrumentação por requisição (Server-Timing + log 'noticias.instrumentacao'):
+# fração das requisições medidas e limites que geram um WARNING com as consultas mais lentas
+INSTRUMENTACAO_AMOSTRAGEM = 1.0 if DEBUG else 0.1
+INSTRUMENTACAO_LIMITE_CONSULTAS = 50
+INSTRUMENTACAO_LIMITE_MS = 500
+# Também as linhas INFO de cada requisição medida (sem isso, só os WARNINGs):
+# NOTICIAS_LOG_REQUISICOES=1 no ambiente
+NOTICIAS_LOG_REQUISICOES = os.environ.get('NOTICIAS_LOG_REQUISICOES') == '1'
+
+# Profiling (cProfile) de uma fração das requisições; staff pode pedir um perfil
+# com o cabeçalho X-Perfil ou ?perfil=1. Relatório: manage.py relatorio_perfil
+PERFIL_AMOSTRAGEM = 0
+PERFIL_DIRETORIO = BASE_DIR / 'perfis'
+PERFIL_MAXIMO_ARQUIVOS = 1000
+
+# Métricas em /metrics (formato Prometheus). Com vários workers (gunicorn), aponte
+# METRICAS_DIRETORIO para um diretório local esvaziado ao iniciar o servidor
+METRICAS_DIRETORIO = None
+# Além de staff: o Prometheus envia 'Authorization: Bearer <METRICAS_TOKEN>'. A
+# lista de IPs compara o REMOTE_ADDR e não serve atrás de um proxy no mesmo host
+METRICAS_TOKEN = ''
+METRICAS_IPS_PERMITIDOS = []
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'noticias.instrumentacao': {'handlers': ['console'], 'level': 'INFO' if NOTICIAS_LOG_REQUISICOES else 'WARNING'},
+        'noticias.imagens': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -122,11 +198,10 @@ STATICFILES_DIRS = [
 ]
 
 # Configurações para produção (Render)
-import os
 if not DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
     # Adicionar whitenoise para servir arquivos estáticos
-    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+    MIDDLEWARE.insert(3, 'whitenoise.middleware.WhiteNoiseMiddleware')
     STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
@@ -0,0 +1,11 @@
+"""
+Perfil ASGI (uvicorn) para o Render: as páginas públicas usam as views assíncronas
+"""
+from .settings_render_simple import *  # noqa: F401,F403
+
+NOTICIAS_VIEWS_ASYNC = True
+
+# Em ASGI o Django não deve reaproveitar conexões entre requisições
+# (cada requisição tem a sua thread para o ORM assíncrono)
+for _banco in DATABASES.values():  # noqa: F405
+    _banco['CONN_MAX_AGE'] = 0
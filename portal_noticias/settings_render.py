@@ -27,17 +27,21 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'noticias.metricas.MetricasMiddleware',
+    'noticias.instrumentacao.InstrumentacaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Adicionar whitenoise
+    'noticias.banco.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'noticias.perfil.PerfilMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'portal_noticias.urls'
+ROOT_URLCONF = 'portal_noticias.urls_render'
 
 TEMPLATES = [
     {
@@ -76,9 +80,81 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Escritas pegam o lock no BEGIN e esperam o busy_timeout em vez de 'database is locked'
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
         }
     }
 
+# WAL e demais PRAGMAs em cada conexão SQLite (noticias/banco.py)
+SQLITE_PRAGMAS = {}
+
+# Réplica de leitura opcional para as páginas públicas; o painel grava no 'default'.
+# DATABASE_REPLICA_URL aponta para uma réplica do Postgres; sem Postgres,
+# SQLITE_REPLICA=1 abre um segundo handle, somente leitura, do mesmo arquivo
+if os.environ.get('DATABASE_URL') and os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['leitura'] = dj_database_url.parse(os.environ['DATABASE_REPLICA_URL'], conn_max_age=600)
+    DATABASES['leitura']['TEST'] = {'MIRROR': 'default'}
+elif not os.environ.get('DATABASE_URL') and os.environ.get('SQLITE_REPLICA') == '1':
+    DATABASES['leitura'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+if 'leitura' in DATABASES:
+    BANCO_REPLICAS = ['leitura']
+    DATABASE_ROUTERS = ['noticias.banco.RoteadorReplica']
+
+# Cache compartilhado entre os workers do gunicorn: Redis quando disponível,
+# senão arquivos locais (a invalidação precisa ser vista por todos os processos)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(BASE_DIR, '.cache'),
+        }
+    }
+
+# Tempo (s) das páginas públicas em cache para visitantes anônimos
+CACHE_PAGINAS_TIMEOUT = 60 * 15
+
+# Listagem de notícias: 'cursor' (keyset em data_publicacao/id) ou 'offset' (?page=N)
+NOTICIAS_PAGINACAO = 'cursor'
+NOTICIAS_POR_PAGINA = 10
+
+# '1' só com um worker (processar_relevancia) rodando em outro serviço
+RELEVANCIA_WORKER = os.environ.get('RELEVANCIA_WORKER') == '1'
+
+# Tendências usadas no cálculo de relevância: 'estatico', 'arquivo' ou 'http'
+TENDENCIAS_PROVEDOR = os.environ.get('TENDENCIAS_PROVEDOR', 'estatico')
+TENDENCIAS_ARQUIVO = os.environ.get('TENDENCIAS_ARQUIVO', os.path.join(BASE_DIR, 'tendencias.json'))
+TENDENCIAS_TTL = 60 * 60
+TENDENCIAS_TIMEOUT = 5
+
+# Mídia enviada pelo painel (noticias/midia.py): 'x-accel-redirect' (Nginx) ou
+# 'x-sendfile' (Apache) entregam o arquivo pelo servidor web em vez do gunicorn
+MIDIA_OFFLOAD = os.environ.get('MIDIA_OFFLOAD') or None
+MIDIA_ACCEL_PREFIXO = os.environ.get('MIDIA_ACCEL_PREFIXO', '/_midia/')
+MIDIA_STAT_TTL = 60
+
+# Instrumentação (Server-Timing + log) de 10% das requisições; profiling só sob demanda
+INSTRUMENTACAO_AMOSTRAGEM = float(os.environ.get('INSTRUMENTACAO_AMOSTRAGEM', 0.1))
+PERFIL_AMOSTRAGEM = float(os.environ.get('PERFIL_AMOSTRAGEM', 0))
+PERFIL_DIRETORIO = os.environ.get('PERFIL_DIRETORIO', os.path.join(BASE_DIR, 'perfis'))
+
+# /metrics: com vários workers do gunicorn cada processo grava seu instantâneo em
+# METRICAS_DIRETORIO (esvaziar ao iniciar, ex.: rm -rf $METRICAS_DIRETORIO antes do gunicorn)
+METRICAS_DIRETORIO = os.environ.get('METRICAS_DIRETORIO') or None
+# Acesso sem login: token do Prometheus ou IPs (o Nginx local faz tudo vir de 127.0.0.1)
+METRICAS_TOKEN = os.environ.get('METRICAS_TOKEN', '')
+METRICAS_IPS_PERMITIDOS = [ip for ip in os.environ.get('METRICAS_IPS_PERMITIDOS', '').split(',') if ip]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -5,9 +5,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
 from django.urls import re_path
 
+from noticias.midia import servir_midia
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('noticias.urls')),
@@ -15,9 +16,9 @@ urlpatterns = [
 
 # Configuração para servir arquivos de mídia no Render
 if not settings.DEBUG:
-    # Em produção, usar whitenoise para servir mídia
+    # Em produção: ETag/Last-Modified, Range e offload opcional (MIDIA_OFFLOAD)
     urlpatterns += [
-        re_path(r'^media/(?P<path>.*)$', serve, {
+        re_path(r'^media/(?P<path>.*)$', servir_midia, {
             'document_root': settings.MEDIA_ROOT,
         }),
     ]